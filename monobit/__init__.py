@@ -11,10 +11,10 @@ assert _sys.version_info >= (3, 9)
 from .constants import VERSION as __version__
 from .core import Pack, Font, Glyph, Char, Codepoint, Tag
 from .base import FileFormatError, UnsupportedError
-from .storage import load, save, loaders, savers
+from .storage import load, iter_load, save, loaders, savers
 from .plumbing import scriptables as _operations
 from .encoding import encoder, encodings
-from .renderer import render_text, render, chart
+from .renderer import render_text, render, chart, Renderer
 
 
 # inject font operations into main module namespace
@@ -7,7 +7,7 @@ licence: https://opensource.org/licenses/MIT
 
 from .basetypes import *
 from .properties import reverse_dict, extend_string, Props
-from .cachedprops import HasProps, checked_property, writable_property
+from .cachedprops import HasProps, checked_property, writable_property, cached
 from . import struct
 from . import binary
 from .imports import import_all, safe_import
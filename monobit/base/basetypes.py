@@ -37,7 +37,7 @@ def to_int(int_str):
     """Convert from int-like or string in any representation."""
     if isinstance(int_str, int):
         return int_str
-    if isinstance(int_str, str) and any(ord(_c)>127 for _c in int_str):
+    if isinstance(int_str, str) and not int_str.isascii():
         # avoid unintentiaonally decoding non-ascii numerals (Python does this)
         raise ValueError(
             f"Non-ASCII '{int_str}' "
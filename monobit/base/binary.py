@@ -5,6 +5,9 @@ monobit.base.binary - binary utilities
 licence: https://opensource.org/licenses/MIT
 """
 
+from array import array
+from functools import cache
+
 
 def ceildiv(num, den):
     """Integer division, rounding up."""
@@ -45,9 +48,64 @@ def reverse_by_group(bitseq, fill='0', group_size=8):
     Bit sequence is extended to end on byte boundary.
     """
     bitseq = bitseq.ljust(ceildiv(len(bitseq), group_size) * group_size, fill)
-    args = [iter(bitseq)] * group_size
-    bitseq = ''.join(''.join(_chunk[::-1]) for _chunk in zip(*args))
-    return bitseq
+    return ''.join(
+        bitseq[_i:_i+group_size][::-1]
+        for _i in range(0, len(bitseq), group_size)
+    )
+
+
+###############################################################################
+# bit and byte order kernels
+
+@cache
+def _get_reverse_table(bits_per_pixel):
+    """Translation table reversing the order of pixels in a byte."""
+    pixels_per_byte = 8 // bits_per_pixel
+    mask = (1 << bits_per_pixel) - 1
+    return bytes(
+        sum(
+            ((_byte >> (_i * bits_per_pixel)) & mask)
+            << ((pixels_per_byte - 1 - _i) * bits_per_pixel)
+            for _i in range(pixels_per_byte)
+        )
+        for _byte in range(256)
+    )
+
+
+def reverse_pixels(byteseq, bits_per_pixel=1):
+    """
+    Reverse the order of pixels within each byte.
+    With 1 bit per pixel, this reverses the bit order of every byte.
+    """
+    return bytes(byteseq).translate(_get_reverse_table(bits_per_pixel))
+
+
+# array typecodes for byte swapping, by item size
+_SWAP_TYPECODES = {
+    array(_tc).itemsize: _tc
+    for _tc in reversed('bhilq')
+}
+
+
+def swap_bytes(byteseq, group_size):
+    """
+    Reverse the order of bytes in groups of a given size.
+    Byte sequence is padded with nulls to end on a group boundary.
+    """
+    if group_size <= 1:
+        return bytes(byteseq)
+    byteseq = bytes(byteseq)
+    byteseq = byteseq.ljust(ceildiv(len(byteseq), group_size)*group_size, b'\0')
+    try:
+        swapped = array(_SWAP_TYPECODES[group_size], byteseq)
+    except KeyError:
+        # no native integer of this size: move each byte position in one slice
+        swapped = bytearray(len(byteseq))
+        for _i in range(group_size):
+            swapped[_i::group_size] = byteseq[group_size-1-_i::group_size]
+        return bytes(swapped)
+    swapped.byteswap()
+    return swapped.tobytes()
 
 
 ###############################################################################
@@ -6,20 +6,22 @@ licence: https://opensource.org/licenses/MIT
 """
 
 import logging
-from functools import wraps, partial, cache, cached_property
+from functools import wraps, partial, cached_property
 from itertools import chain
+from collections import OrderedDict
 from pathlib import PurePath
 from unicodedata import normalize
 
 from monobit.plumbing.scripting import scriptable
 from monobit.base import Coord, Bounds, NOT_SET, RGBTable
 from monobit.base import to_int, Any
-from monobit.encoding import encoder, EncodingName, Encoder, Indexer, Charmap
+from monobit.encoding import encoder, encodings, EncodingName, Encoder, Indexer, Charmap, Unicode
+from monobit.encoding.unicode import is_blank, is_graphical
 from monobit.base.binary import ceildiv
 from monobit.base import extend_string
-from monobit.base import HasProps, writable_property, checked_property
+from monobit.base import HasProps, writable_property, checked_property, cached
 
-from .labels import Tag, Char, Codepoint, Label, to_label
+from .labels import Tag, Char, Codepoint, Label, LabelTrie, to_label, to_labels
 from .glyph import Glyph, KernTable
 from .raster import turn_method
 
@@ -663,10 +665,10 @@ class Font(HasProps):
     @writable_property
     def default_char(self):
         """Label for default character."""
-        repl = '\ufffd'
-        if repl not in self.get_chars():
-            repl = ''
-        return Char(repl)
+        repl = Char('\ufffd')
+        if repl not in self._labels:
+            repl = Char('')
+        return repl
 
 
     ###########################################################################
@@ -683,64 +685,34 @@ class Font(HasProps):
             self._comment.update(comment)
         self._glyphs = tuple(glyphs)
         # update glyph list, apply globally specified metrics
-        self._glyphs, properties = self._apply_metrics(self._glyphs, properties)
+        self._glyphs, properties = apply_global_metrics(self._glyphs, properties)
         # update properties
         # NOTE - we must be careful NOT TO ACCESS CACHED PROPERTIES
         #        until the constructor is complete
         self._set_properties(properties)
 
+    # lookup tables built on first use, left out when pickling
+    _lazy_state = ('_cache', '_labels', '_label_tries', '_composed_glyphs')
+
+    def __getstate__(self):
+        """Get state for pickling, without lazily built lookup tables."""
+        return {
+            _k: _v for _k, _v in vars(self).items()
+            if _k not in self._lazy_state
+        }
+
+    def __setstate__(self, state):
+        """Restore pickled state; tables stored by older versions are dropped."""
+        self.__dict__.update(
+            (_k, _v) for _k, _v in state.items()
+            if _k not in self._lazy_state
+        )
+        self._cache = {}
+
     @cached_property
     def _labels(self):
         """Label lookup table."""
-        label_map = {
-            _label: _index
-            for _index, _glyph in enumerate(self._glyphs)
-            for _label in _glyph.get_labels()
-        }
-        font_encoder = encoder(self.encoding)
-        if not font_encoder:
-            return label_map
-        char_label_map = {
-            font_encoder.char(_label): _index
-            for _label, _index in label_map.items()
-        }
-        char_label_map.pop(Char(''), None)
-        codepoint_label_map = {
-            font_encoder.codepoint(_label): _index
-            for _label, _index in label_map.items()
-        }
-        codepoint_label_map.pop(Codepoint(b''), None)
-        return char_label_map | codepoint_label_map | label_map
-
-    @staticmethod
-    def _apply_metrics(glyphs, props):
-        """Apply globally specified glyph metrics."""
-        glyph_metrics = {
-            _k: props[_k]
-            for _k in (
-                'shift_up', 'left_bearing', 'right_bearing',
-                'shift_left', 'top_bearing', 'bottom_bearing',
-                'tracking', 'offset',
-            )
-            if _k in props
-        }
-        props = {
-            _k: _v
-            for _k, _v in props.items()
-            if _k not in glyph_metrics
-        }
-        if glyph_metrics:
-            # create a dummy glyph to ensure values get converted to right type
-            glob = Glyph(**glyph_metrics)
-            # localise glyph metrics
-            glyphs = tuple(
-                _g.modify(**{
-                    _k: _g._get_property(_k) + _v
-                    for _k, _v in glob.get_properties().items()
-                })
-                for _g in glyphs
-            )
-        return glyphs, props
+        return _LabelIndex(self._glyphs, self.encoding)
 
 
     ##########################################################################
@@ -852,7 +824,7 @@ class Font(HasProps):
 
         return FontFormatter().format(template, **kwargs)
 
-    @cache
+    @cached
     def has_vertical_metrics(self):
         """Check if this font has vertical metrics."""
         if any(
@@ -869,8 +841,34 @@ class Font(HasProps):
     def glyphs(self):
         return self._glyphs
 
-    @cache
+    # maximum number of composed glyphs to keep per font
+    compose_cache_size = 1024
+
+    @cached_property
+    def _composed_glyphs(self):
+        """Recently composed glyphs by char, least recently used first."""
+        return OrderedDict()
+
     def _compose_glyph(self, char):
+        """Compose glyph by overlaying components; raise KeyError if not possible."""
+        composed = self._composed_glyphs
+        try:
+            composed.move_to_end(char)
+            glyph = composed[char]
+        except KeyError:
+            try:
+                glyph = self._overlay_components(char)
+            except KeyError:
+                # remember that the glyph could not be composed
+                glyph = None
+            composed[char] = glyph
+            while len(composed) > self.compose_cache_size:
+                composed.popitem(last=False)
+        if glyph is None:
+            raise KeyError(f'Cannot compose glyph for char {char}')
+        return glyph
+
+    def _overlay_components(self, char):
         """Compose glyph by overlaying components."""
         # first check if a canonical equivalent is stored
         nfc = Char(normalize('NFC', char))
@@ -884,6 +882,25 @@ class Font(HasProps):
         indices = tuple(indices)
         return Glyph.overlay(*(self._glyphs[_i] for _i in indices))
 
+    def compose_glyphs(self, chars):
+        """
+        Compose glyphs for chars not in the font from the glyphs of their components.
+        Composed glyphs are kept for use by get_glyph(), up to compose_cache_size.
+
+        chars: chars to compose, as an iterable or a range such as 'u+00c0-u+017f'
+        returns: dict of char to composed glyph, for all chars that could be composed
+        """
+        if isinstance(chars, str):
+            chars = (_l for _l in to_labels(chars) if isinstance(_l, Char))
+        composed = {}
+        for char in dict.fromkeys(map(Char, chars)):
+            if char and self.get_index(char, raise_missing=False) < 0:
+                try:
+                    composed[char] = self._compose_glyph(char)
+                except KeyError:
+                    pass
+        return composed
+
     def get_glyph(
             self, label=None, *,
             char=None, codepoint=None, tag=None,
@@ -948,7 +965,7 @@ class Font(HasProps):
             raise KeyError(f'No glyph found matching label={label}')
         return -1
 
-    @cache
+    @cached
     def get_default_glyph(self):
         """Get default glyph; empty if not defined."""
         try:
@@ -957,7 +974,7 @@ class Font(HasProps):
             # use fully inked space-sized block if default glyph undefined
             return self.get_space_glyph().invert()
 
-    @cache
+    @cached
     def get_space_glyph(self):
         """Get blank glyph with advance width defined by word-space property."""
         if self.glyphs and self.spacing in ('character-cell', 'multi-cell'):
@@ -971,7 +988,7 @@ class Font(HasProps):
             shift_up=-self.descent, levels=self.levels,
         )
 
-    @cache
+    @cached
     def get_empty_glyph(self):
         """Get blank glyph with zero advance_width and advance_height."""
         return Glyph.blank(levels=self.levels)
@@ -980,22 +997,48 @@ class Font(HasProps):
     ##########################################################################
     # label access
 
-    @cache
+    @cached
     def get_chars(self):
         """Get tuple of characters covered by this font."""
-        return tuple(_c for _c in self._labels if isinstance(_c, Char))
+        return self._labels.get_labels(Char)
 
-    @cache
+    @cached
     def get_codepoints(self):
         """Get tuple of codepage codepoints covered by this font."""
-        return tuple(_c for _c in self._labels if isinstance(_c, Codepoint))
+        return self._labels.get_labels(Codepoint)
 
-    @cache
+    @cached
     def get_tags(self):
         """Get tuple of tags covered by this font."""
-        return tuple(_c for _c in self._labels if isinstance(_c, Tag))
+        return self._labels.get_labels(Tag)
 
-    @cache
+    @cached_property
+    def _label_tries(self):
+        """Prefix trees of multi-element labels, by label type and split function."""
+        return {}
+
+    def get_label_trie(self, labeltype=Char, split=tuple):
+        """
+        Get prefix tree of multi-element char or codepoint labels.
+        Single elements are not included as they always form a label.
+
+        labeltype: Char or Codepoint (default: Char)
+        split: function to split a label's value into elements (default: tuple)
+        """
+        try:
+            return self._label_tries[labeltype, split]
+        except KeyError:
+            pass
+        if labeltype is Char:
+            labels = self.get_chars()
+        else:
+            labels = self.get_codepoints()
+        items = ((split(_l.value), _l) for _l in labels)
+        trie = LabelTrie(_item for _item in items if len(_item[0]) > 1)
+        self._label_tries[labeltype, split] = trie
+        return trie
+
+    @cached
     def get_charmap(self):
         """Implied character map based on defined chars."""
         return Charmap({
@@ -1055,21 +1098,105 @@ class Font(HasProps):
                 and not isinstance(codepoint_from, Indexer)
             ):
                 encoding = codepoint_from.name
-        glyphs = tuple(
-            _glyph.label(
-                overwrite=overwrite,
-                match_whitespace=match_whitespace,
-                match_graphical=match_graphical,
-                char_from=char_from,
-                codepoint_from=codepoint_from,
-                tag_from=tag_from,
-                comment_from=comment_from,
+        # charmaps convert codepoints and chars independently of other labels
+        if isinstance(char_from, (Charmap, Unicode)):
+            glyphs = self._label_chars(
+                char_from, overwrite, match_whitespace, match_graphical
+            )
+        elif isinstance(codepoint_from, (Charmap, Unicode)):
+            glyphs = self._label_codepoints(codepoint_from, overwrite)
+        # taggers with bulk conversion tag all glyphs in one pass
+        elif hasattr(tag_from, 'tag_all'):
+            glyphs = self._label_tags(tag_from, overwrite)
+        elif hasattr(comment_from, 'tag_all'):
+            glyphs = self._label_comments(comment_from)
+        else:
+            glyphs = tuple(
+                _glyph.label(
+                    overwrite=overwrite,
+                    match_whitespace=match_whitespace,
+                    match_graphical=match_graphical,
+                    char_from=char_from,
+                    codepoint_from=codepoint_from,
+                    tag_from=tag_from,
+                    comment_from=comment_from,
+                )
+                for _glyph in self.glyphs
             )
-            for _glyph in self.glyphs
-        )
         glyphs, references = self._relink_glyphs(glyphs)
         return self.modify(glyphs=glyphs, encoding=encoding, **references)
 
+    def _label_chars(self, char_from, overwrite, match_whitespace, match_graphical):
+        """Set char labels from codepoints for all glyphs in one pass."""
+        targets = tuple(
+            _index for _index, _glyph in enumerate(self._glyphs)
+            if overwrite or not _glyph.char
+        )
+        codepoints = tuple(self._glyphs[_index].codepoint for _index in targets)
+        glyphs = list(self._glyphs)
+        for index, char in zip(targets, char_from.decode_all(codepoints)):
+            glyph = glyphs[index]
+            if char:
+                if glyph.is_blank():
+                    if match_whitespace and not is_blank(char):
+                        continue
+                elif match_graphical and not is_graphical(char):
+                    continue
+            glyphs[index] = _replace_label(glyph, Char, char)
+        return tuple(glyphs)
+
+    def _label_codepoints(self, codepoint_from, overwrite):
+        """Set codepoint labels from chars for all glyphs in one pass."""
+        targets = tuple(
+            _index for _index, _glyph in enumerate(self._glyphs)
+            if overwrite or not _glyph.codepoint
+        )
+        chars = tuple(self._glyphs[_index].char for _index in targets)
+        glyphs = list(self._glyphs)
+        for index, codepoint in zip(targets, codepoint_from.encode_all(chars)):
+            glyphs[index] = _replace_label(glyphs[index], Codepoint, codepoint)
+        return tuple(glyphs)
+
+    def _label_tags(self, tag_from, overwrite):
+        """Set tag labels from chars for all glyphs in one pass."""
+        targets = tuple(
+            _index for _index, _glyph in enumerate(self._glyphs)
+            if overwrite or not _glyph.tags
+        )
+        chars = tuple(self._glyphs[_index].char for _index in targets)
+        glyphs = list(self._glyphs)
+        for index, tag in zip(targets, tag_from.tag_all(chars)):
+            glyphs[index] = _replace_label(glyphs[index], Tag, tag)
+        return tuple(glyphs)
+
+    def _label_comments(self, comment_from):
+        """Set comments from chars for all glyphs in one pass."""
+        tags = comment_from.tag_all(_glyph.char for _glyph in self._glyphs)
+        return tuple(
+            _glyph if _glyph.comment == _tag.value
+            else _glyph.modify(comment=_tag.value)
+            for _glyph, _tag in zip(self._glyphs, tags)
+        )
+
+
+    @scriptable
+    def detect_encoding(self, *, overwrite:bool=False):
+        """
+        Set the encoding to the registered charmap that best fits the codepoint and character labels.
+
+        overwrite: replace an encoding that is already set (default: False)
+        """
+        if self.encoding and not overwrite:
+            return self
+        charmap = self.get_charmap()
+        matches = encodings.match(charmap)
+        logging.debug('Best-fit encodings for `%s`: %s', self.name, matches)
+        # accept the closest match, as in encodings.fit(), but without loading it
+        for name, distance in matches[:1]:
+            if distance < len(charmap) or not distance:
+                return self.modify(encoding=name)
+        logging.info('Could not detect encoding of `%s`.', self.name)
+        return self
 
     def _relink_glyphs(self, glyphs):
         """Update label and kerning table references after relabelling."""
@@ -1084,27 +1211,29 @@ class Font(HasProps):
                 return None
             return labels[0]
 
+        def _update_kerning(glyph):
+            if (
+                    glyph.get_defined('left_kerning') is None
+                    and glyph.get_defined('right_kerning') is None
+                ):
+                return glyph
+            left_kerning = KernTable({
+                _update_label(_k): _v for _k, _v in glyph.left_kerning.items()
+            })
+            right_kerning = KernTable({
+                _update_label(_k): _v for _k, _v in glyph.right_kerning.items()
+            })
+            return glyph.modify(
+                left_kerning=left_kerning or None,
+                right_kerning=right_kerning or None,
+            )
+
         references = {
             _k: _update_label(_v)
             for _k, _v in self._props.items()
             if isinstance(_v, Label)
         }
-        left_kerning = (
-            KernTable({
-                _update_label(_k): _v for _k, _v in _glyph.left_kerning.items()
-            })
-            for _glyph in glyphs
-        )
-        right_kerning = (
-            KernTable({
-                _update_label(_k): _v for _k, _v in _glyph.right_kerning.items()
-            })
-            for _glyph in glyphs
-        )
-        glyphs = tuple(
-            _g.modify(left_kerning=_l or None, right_kerning=_r or None)
-            for _g, _l, _r in zip(glyphs, left_kerning, right_kerning)
-        )
+        glyphs = tuple(_update_kerning(_g) for _g in glyphs)
         return glyphs, references
 
     @scriptable
@@ -1188,6 +1317,77 @@ class Font(HasProps):
         return font
 
 
+    @scriptable
+    def transcode(
+            self, *,
+            encoding:encoder=None, source:encoder=None, missing:Any='default',
+        ):
+        """
+        Convert the font to another encoding in one pass.
+
+        encoding: character map to convert to
+        source: encoding to convert codepoints from. Default: use font encoding.
+        missing: how to deal with target codepoints not in the font. 'default', 'empty', 'raise', None, or a user-defined Glyph
+        """
+        encoding = encoder(encoding)
+        if not isinstance(encoding, Charmap):
+            raise ValueError(
+                f'Can only transcode to a character map, not `{encoding}`.'
+            )
+        if source is None:
+            source = encoder(self.encoding)
+        # convert codepoints directly through a plan cached on the source charmap
+        if isinstance(source, Charmap):
+            plan = source.transcoding(encoding)
+        elif isinstance(source, Unicode):
+            codepoints = self.get_codepoints()
+            plan = dict(zip(
+                codepoints, encoding.encode_all(source.decode_all(codepoints))
+            ))
+        else:
+            plan = {}
+        # index of the glyph for each target codepoint
+        # glyphs are matched by char where they have one, by codepoint otherwise
+        targets = {}
+        labelled = []
+        for index, glyph in enumerate(self._glyphs):
+            if glyph.char:
+                labelled.append(index)
+            else:
+                codepoint = plan.get(glyph.codepoint)
+                if codepoint:
+                    targets[codepoint] = index
+        # chars take precedence and the last glyph wins, as for label lookup
+        chars = tuple(self._glyphs[_index].char for _index in labelled)
+        for index, codepoint in zip(labelled, encoding.encode_all(chars)):
+            if codepoint:
+                targets[codepoint] = index
+        selected, glyphs, filled = [], [], 0
+        for codepoint, char in encoding.mapping.items():
+            codepoint, char = Codepoint(codepoint), Char(char)
+            try:
+                glyph = self._glyphs[targets[codepoint]]
+            except KeyError:
+                glyph = self.get_glyph(char, missing=missing)
+                if glyph is None:
+                    continue
+                filled += 1
+                # don't copy tags of e.g. the default glyph to filled codepoints
+                tags = ()
+            else:
+                tags = glyph.tags
+            selected.append(glyph)
+            glyphs.append(glyph.modify(labels=(char, codepoint, *tags)))
+        logging.info(
+            'Transcoded %d glyphs to `%s`: %d glyphs not in target, %d target codepoints filled.',
+            len(targets), encoding.name,
+            len(self._glyphs) - len(set(targets.values())), filled,
+        )
+        font = self.modify(selected)
+        glyphs, references = font._relink_glyphs(glyphs)
+        return font.modify(glyphs, encoding=encoding.name, **references)
+
+
     @scriptable
     def exclude(
             self, labels:tuple[Label]=(), *,
@@ -1567,3 +1767,162 @@ class Font(HasProps):
             Glyph.outline,
             thickness = thickness
         )
+
+
+def apply_global_metrics(glyphs, props):
+    """
+    Apply globally specified glyph metrics.
+
+    glyphs: sequence of glyphs
+    props: font properties, which may include global glyph metrics
+    returns: glyphs with metrics applied, and the remaining properties
+    """
+    glyph_metrics = {
+        _k: props[_k]
+        for _k in (
+            'shift_up', 'left_bearing', 'right_bearing',
+            'shift_left', 'top_bearing', 'bottom_bearing',
+            'tracking', 'offset',
+        )
+        if _k in props
+    }
+    props = {
+        _k: _v
+        for _k, _v in props.items()
+        if _k not in glyph_metrics
+    }
+    if glyph_metrics:
+        # create a dummy glyph to ensure values get converted to right type
+        glob = Glyph(**glyph_metrics)
+        # localise glyph metrics
+        glyphs = tuple(
+            _g.modify(**{
+                _k: _g._get_property(_k) + _v
+                for _k, _v in glob.get_properties().items()
+            })
+            for _g in glyphs
+        )
+    return glyphs, props
+
+
+def _replace_label(glyph, labeltype, label):
+    """Replace labels of a type as Glyph.modify does; keep the glyph if unchanged."""
+    labels = tuple(glyph.get_labels())
+    new_labels = tuple(_l for _l in labels if not isinstance(_l, labeltype))
+    if label:
+        new_labels += (label,)
+    if new_labels == labels:
+        return glyph
+    return glyph.modify(labels=new_labels)
+
+
+class _LabelIndex:
+    """
+    Glyph index by label.
+
+    Labels converted through the font encoding are only indexed when a lookup
+    of their type misses the glyphs' own labels, and only as far as needed.
+    """
+
+    # encoder method converting labels to each label type
+    _converters = {Char: 'char', Codepoint: 'codepoint'}
+
+    def __init__(self, glyphs, encoding):
+        """Set up index; nothing is indexed until first used."""
+        self._glyphs = glyphs
+        self._encoding = encoding
+        # index of converted labels, by label type
+        self._converted = {}
+        # labels not yet converted, by label type
+        self._pending = {}
+        # keys of converted labels in order of conversion, by label type
+        self._keys = {}
+
+    @cached_property
+    def _direct(self):
+        """Index of the glyphs' own labels; the last glyph with a label wins."""
+        return {
+            _label: _index
+            for _index, _glyph in enumerate(self._glyphs)
+            for _label in _glyph.get_labels()
+        }
+
+    @cached_property
+    def _encoder(self):
+        """Font encoder."""
+        return encoder(self._encoding)
+
+    def _convert(self, labeltype, label=None):
+        """
+        Index converted labels of a type until a label is found.
+
+        labeltype: type of converted labels
+        label: label to look for; None to convert all labels
+        returns: index of converted labels
+        """
+        if labeltype not in self._converted:
+            convert = getattr(self._encoder, self._converters[labeltype])
+            if isinstance(self._encoder, Indexer):
+                # indexers are stateful and must see the labels in order
+                keys = reversed(tuple(map(convert, self._direct)))
+            else:
+                keys = map(convert, reversed(self._direct))
+            # convert the last labels first, so that the first conversion of a key wins
+            self._pending[labeltype] = zip(keys, reversed(self._direct.values()))
+            self._converted[labeltype] = {}
+            self._keys[labeltype] = []
+        converted = self._converted[labeltype]
+        keys = self._keys[labeltype]
+        for key, index in self._pending[labeltype]:
+            # empty conversions are not indexed
+            if key:
+                keys.append(key)
+                converted.setdefault(key, index)
+                if key == label:
+                    break
+        return converted
+
+    def _get_labeltype(self, label):
+        """Type of converted labels that could match a label; None if none."""
+        if not self._encoder:
+            return None
+        if isinstance(label, str):
+            return Char
+        if isinstance(label, bytes):
+            return Codepoint
+        return None
+
+    def __getitem__(self, label):
+        """Get index of glyph with given label."""
+        try:
+            return self._direct[label]
+        except KeyError:
+            pass
+        labeltype = self._get_labeltype(label)
+        if labeltype is None:
+            raise KeyError(label)
+        try:
+            return self._converted[labeltype][label]
+        except KeyError:
+            return self._convert(labeltype, label)[label]
+
+    def __contains__(self, label):
+        """Label is in the index."""
+        try:
+            self[label]
+        except KeyError:
+            return False
+        return True
+
+    def get_labels(self, labeltype):
+        """Labels of a type in the index; converted labels first."""
+        if labeltype not in self._converters or not self._encoder:
+            keys = ()
+        else:
+            self._convert(labeltype)
+            # keys were collected in reverse order
+            keys = reversed(self._keys[labeltype])
+        return tuple(
+            _label for _label in dict.fromkeys(chain(keys, self._direct))
+            if isinstance(_label, labeltype)
+        )
@@ -208,7 +208,11 @@ class Glyph(HasProps):
         """Create glyph from tuple of tuples."""
         super().__init__()
         if _trustme:
-            self._pixels = Raster(pixels, inklevels=inklevels)
+            if isinstance(pixels, Raster):
+                # rasters are immutable, so they can be shared between glyphs
+                self._pixels = pixels
+            else:
+                self._pixels = Raster(pixels, inklevels=inklevels)
             self._labels = labels
             self._comment = comment
             self._set_properties(properties)
@@ -301,6 +305,13 @@ class Glyph(HasProps):
                 labels.append(Char(char))
         if comment is NOT_SET:
             comment = self._comment
+        if not kwargs:
+            # properties have already been converted
+            glyph = type(self)(
+                pixels, labels=labels, comment=comment or '', _trustme=True,
+            )
+            glyph._props = {**self._props}
+            return glyph
         properties = {**self._props}
         properties.update(kwargs)
         return type(self)(
@@ -977,8 +988,8 @@ class Glyph(HasProps):
         #self = glyphs[0]
         # bring on common raster
         common = Glyph._get_common_raster(*glyphs)
-        glyphs = tuple(
-            _g.expand(
+        paddings = tuple(
+            dict(
                 left=_g.raster.left-common.left,
                 bottom=_g.raster.bottom-common.bottom,
                 right=common.right-_g.raster.right,
@@ -986,7 +997,22 @@ class Glyph(HasProps):
             )
             for _g in glyphs
         )
-        pixels = Raster.overlay(
-            *(_g._pixels for _g in glyphs), operator=operator
-        )
-        return glyphs[0].modify(pixels)
+        first = glyphs[0].expand(**paddings[0])
+        if operator in (any, all) and first.width:
+            # combine the components' inked rows without expanding their rasters
+            pixels = first._pixels._overlay_inked_rows(
+                tuple(
+                    _g._pixels._pad_inked_rows(**_padding)
+                    for _g, _padding in zip(glyphs, paddings)
+                ),
+                operator
+            )
+        else:
+            glyphs = (first,) + tuple(
+                _g.expand(**_padding)
+                for _g, _padding in zip(glyphs[1:], paddings[1:])
+            )
+            pixels = Raster.overlay(
+                *(_g._pixels for _g in glyphs), operator=operator
+            )
+        return first.modify(pixels)
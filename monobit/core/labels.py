@@ -36,6 +36,12 @@ def strip_matching(from_str, char, allow_no_match=True):
 class Label:
     """Label."""
 
+    __slots__ = ()
+
+
+# first characters of strings that may convert to a codepoint
+_CODEPOINT_START = frozenset(digits + '+- \t\n\r\v\f')
+
 
 def to_label(value):
     """Convert to codepoint/unicode/tag label from yaff file."""
@@ -46,56 +52,60 @@ def to_label(value):
         return Codepoint(value)
     if not value:
         return Char()
+    first = value[0]
     # protect commas, pluses etc. if enclosed
-    try:
+    if len(value) >= 2 and first == value[-1]:
         # strip matching double quotes
         # this allows to set a label starting with a digit by quoting it
-        return Tag(strip_matching(value, '"', allow_no_match=False))
-    except ValueError:
-        pass
-    try:
-        return Char(strip_matching(value, "'", allow_no_match=False))
-    except ValueError:
-        pass
+        if first == '"':
+            return Tag(value[1:-1])
+        if first == "'":
+            return Char(value[1:-1])
     # codepoints start with an ascii digit
-    try:
-        return Codepoint(value)
-    except ValueError:
-        pass
+    if first in _CODEPOINT_START:
+        codepoint = _convert_codepoint(value)
+        if codepoint is not None:
+            return codepoint
     # length-one -> always a character
     if len(value) == 1:
         return Char(value)
     # unquoted non-ascii -> always a character (this is to cover grapheme sequences)
     # note that this includes non-printables such as controls but these should not be used.
-    if any(ord(_c) > 0x7f for _c in value):
+    if not value.isascii():
         return Char(value)
     # deal with other options such as u+codepoint and comma-separated sequences
-    try:
-        return Char(''.join(
-            _convert_char_element(_elem)
-            for _elem in value.split(',') if _elem
-        ))
-    except ValueError:
-        pass
+    char = _convert_char(value)
+    if char is not None:
+        return char
     return Tag(value.strip())
 
 
-def _convert_char_element(element):
-    """Convert character label element to char if possible."""
-    # string delimited by single quotes denotes a character or sequence
-    element = element.strip()
+def _convert_codepoint(value):
+    """Convert str to codepoint label if possible, None otherwise."""
     try:
-        return strip_matching(element, "'", allow_no_match=False)
+        return Codepoint(value)
     except ValueError:
-        pass
-    # not a delimited char
-    element = element.lower()
-    if not element.startswith('u+'):
-        raise ValueError(element)
-    # convert to sequence of chars
-    # this will raise ValueError if not possible
-    cp_ord = int(element.strip()[2:], 16)
-    return chr(cp_ord)
+        return None
+
+
+def _convert_char(value):
+    """Convert comma-separated char label elements to char if possible, None otherwise."""
+    elements = (_elem.strip() for _elem in value.split(',') if _elem)
+    chars = []
+    for element in elements:
+        # string delimited by single quotes denotes a character or sequence
+        if is_enclosed(element, "'"):
+            chars.append(element[1:-1])
+        # not a delimited char
+        elif element[:2].lower() == 'u+':
+            # convert to sequence of chars
+            try:
+                chars.append(chr(int(element[2:], 16)))
+            except ValueError:
+                return None
+        else:
+            return None
+    return Char(''.join(chars))
 
 # register converter
 CONVERTERS[Label] = to_label
@@ -104,9 +114,15 @@ CONVERTERS[Label] = to_label
 ##############################################################################
 # character labels
 
+# interned single-char labels
+_chars = {}
+
+
 class Char(str, Label):
     """Character label."""
 
+    __slots__ = ()
+
     def __new__(cls, value=''):
         """Convert char or char sequence to char label."""
         if isinstance(value, Char):
@@ -119,6 +135,12 @@ class Char(str, Label):
             raise ValueError(
                 f'Can only convert `str` to character label, not `{type(value)}`.'
             )
+        if len(value) == 1 and cls is Char:
+            # single-char labels are interned
+            char = _chars.get(value)
+            if char is None:
+                char = _chars[value] = super().__new__(cls, value)
+            return char
         return super().__new__(cls, value)
 
     def __repr__(self):
@@ -143,34 +165,30 @@ class Char(str, Label):
 ##############################################################################
 # codepoints
 
+# interned single- and double-byte codepoint labels, by the value they were created from
+_codepoints = {}
+
+
 class Codepoint(bytes, Label):
     """Codepoint label."""
 
+    __slots__ = ()
+
     def __new__(cls, value=b''):
         """Convert to codepoint label if possible."""
         if isinstance(value, Codepoint):
             return value
-        elif isinstance(value, bytes):
-            pass
-        elif value is None:
-            value = b''
-        elif isinstance(value, int):
-            value = int_to_bytes(value)
-        else:
-            if isinstance(value, str):
-                # handle composite labels
-                # codepoint sequences (MBCS) "0xf5,0x02" etc.
-                value = value.split(',')
-            # deal with other iterables, e.g. tuple of int
-            try:
-                value = b''.join(int_to_bytes(to_int(_i)) for _i in value)
-            except (TypeError, OverflowError):
-                raise ValueError(
-                    f'Cannot convert value {repr(value)} of type `{type(value)}` to codepoint label.'
-                ) from None
-        if len(value) > 1:
-            value = value.lstrip(b'\0') or b'\0'
-        return super().__new__(cls, value)
+        # single- and double-byte codepoint labels are interned, by the value given
+        if cls is Codepoint and (
+                type(value) is bytes and len(value) <= 2
+                or type(value) is int and 0 <= value <= 0xffff
+            ):
+            codepoint = _codepoints.get(value)
+            if codepoint is None:
+                codepoint = super().__new__(cls, _convert_codepoint_value(value))
+                _codepoints[value] = codepoint
+            return codepoint
+        return super().__new__(cls, _convert_codepoint_value(value))
 
     def __repr__(self):
         """Represent label."""
@@ -207,6 +225,34 @@ class Codepoint(bytes, Label):
 
 
 
+def _convert_codepoint_value(value):
+    """Convert to bytes value of codepoint label if possible."""
+    if isinstance(value, bytes):
+        pass
+    elif value is None:
+        value = b''
+    elif isinstance(value, int):
+        value = int_to_bytes(value)
+    else:
+        if isinstance(value, str):
+            # handle composite labels
+            # codepoint sequences (MBCS) "0xf5,0x02" etc.
+            value = value.split(',')
+        # deal with other iterables, e.g. tuple of int
+        try:
+            if isinstance(value, list) and len(value) == 1:
+                value = int_to_bytes(to_int(value[0]))
+            else:
+                value = b''.join(int_to_bytes(to_int(_i)) for _i in value)
+        except (TypeError, OverflowError):
+            raise ValueError(
+                f'Cannot convert value {repr(value)} of type `{type(value)}` to codepoint label.'
+            ) from None
+    if len(value) > 1:
+        value = value.lstrip(b'\0') or b'\0'
+    return value
+
+
 ##############################################################################
 # tags
 
@@ -303,6 +349,40 @@ def label_range(lower, upper):
     raise TypeError(f'Bounds must be Char or Codepoint, not {type(lower)}')
 
 
+##############################################################################
+# prefix tree
+
+class LabelTrie:
+    """Prefix tree of labels, for greedy longest-match segmentation of text."""
+
+    # key of the label stored at a node
+    _leaf = object()
+
+    def __init__(self, items=()):
+        """Build tree from (sequence of elements, label) pairs."""
+        self._root = {}
+        for seq, label in items:
+            node = self._root
+            for element in seq:
+                node = node.setdefault(element, {})
+            node[self._leaf] = label
+
+    def match(self, seq, start=0):
+        """
+        Find the longest label that is a prefix of seq[start:].
+        Returns the number of elements matched and the label; (0, None) if none.
+        """
+        node = self._root
+        length, label = 0, None
+        for index in range(start, len(seq)):
+            node = node.get(seq[index])
+            if node is None:
+                break
+            if self._leaf in node:
+                length, label = index - start + 1, node[self._leaf]
+        return length, label
+
+
 CONVERTERS[tuple[Label]] = to_labels
 CONVERTERS[tuple[Char]] = to_chars
 CONVERTERS[tuple[Codepoint]] = to_codepoints
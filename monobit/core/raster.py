@@ -9,10 +9,11 @@ import logging
 import string
 from itertools import zip_longest
 from collections import deque
-from functools import cache
+from functools import cache, cached_property, reduce
+from operator import or_, and_
 
 from monobit.base.binary import (
-    ceildiv, reverse_by_group, bytes_to_pixels,
+    ceildiv, reverse_by_group, bytes_to_pixels, reverse_pixels, swap_bytes,
 )
 from monobit.base import Bounds, Coord, NOT_SET, blockstr
 
@@ -281,24 +282,19 @@ class Raster:
             else:
                 stride = width
         if byte_swap:
-            orig_length = len(byteseq)
-            byteseq = byteseq.ljust(ceildiv(len(byteseq), byte_swap)*byte_swap, b'\0')
-            # grouper
-            args = [iter(byteseq)] * byte_swap
-            byteseq = b''.join(bytes(_chunk[::-1]) for _chunk in zip(*args))
-            byteseq = byteseq[:orig_length]
+            byteseq = swap_bytes(byteseq, byte_swap)[:len(byteseq)]
         # byte matrix order. no effect for bit alignment
         if order == 'column-major' and align != 'bit':
             byteseq = b''.join(
                 byteseq[_offs::height]
                 for _offs in range(height)
             )
+        # per-byte bit swap.
+        if bit_order == 'little':
+            byteseq = reverse_pixels(byteseq, bits_per_pixel)
         # convert bytes to pixels
         bitseq = bytes_to_pixels(byteseq, levels)
         inklevels = get_inklevels(levels)
-        # per-byte bit swap.
-        if bit_order == 'little':
-            bitseq = reverse_by_group(bitseq, group_size=pixels_per_byte)
         return cls.from_vector(
             bitseq, width=width, height=height, stride=stride, align=align,
             inklevels=inklevels,
@@ -327,7 +323,9 @@ class Raster:
             rows = (_row.ljust(stride, inklevels[0]) for _row in rows)
         else:
             rows = (_row.rjust(stride, inklevels[0]) for _row in rows)
-        if bit_order == 'little':
+        # per-byte bit swap on whole bytes for 1-bit pixels; otherwise by group of 8 pixels
+        reverse_bytes = bit_order == 'little' and base == 2
+        if bit_order == 'little' and not reverse_bytes:
             rows = (reverse_by_group(_row) for _row in rows)
         if base == 256:
             byterows = tuple(_row.encode('latin-1') for _row in rows)
@@ -335,6 +333,8 @@ class Raster:
             byterows = tuple(
                 int(_row, base).to_bytes(bytewidth, 'big') for _row in rows
             )
+        if reverse_bytes:
+            byterows = tuple(reverse_pixels(_row) for _row in byterows)
         return byterows
 
     def as_bytes(
@@ -384,17 +384,16 @@ class Raster:
             # left align the bits to byte boundary
             bits = bits.ljust(bytesize * pixels_per_byte, inklevels[0])
             # per-byte bit swap.
-            if bit_order == 'little':
+            if bit_order == 'little' and base != 2:
                 bits = reverse_by_group(bits)
             byterows = (int(bits, base).to_bytes(bytesize, 'big'),)
+            if bit_order == 'little' and base == 2:
+                byterows = (reverse_pixels(byterows[0]),)
         else:
             byterows = raster.as_byterows(align=align, bit_order=bit_order)
         byteseq = b''.join(byterows)
         if byte_swap:
-            # grouper
-            byteseq = byteseq.ljust(ceildiv(len(byteseq), byte_swap)*byte_swap, b'\0')
-            args = [iter(byteseq)] * byte_swap
-            byteseq = b''.join(bytes(_chunk[::-1]) for _chunk in zip(*args))
+            byteseq = swap_bytes(byteseq, byte_swap)
         return byteseq
 
     def get_byte_size(self, *, align='left', stride=NOT_SET):
@@ -724,6 +723,13 @@ class Raster:
                   Use any for additive, all for masking.
         """
         self = others[0]
+        if operator in (any, all) and self._width and all(
+                (_r._width, _r.height) == (self._width, self.height)
+                for _r in others
+            ):
+            return self._overlay_inked_rows(
+                tuple(_r._inked_rows for _r in others), operator
+            )
         # use as instance method or class method
         matrices = tuple(_r.as_matrix() for _r in others)
         rows = tuple(zip(*_row) for _row in zip(*matrices))
@@ -734,6 +740,39 @@ class Raster:
         )
         return type(self)(combined, inklevels=self._inklevels)
 
+    @cached_property
+    def _inked_rows(self):
+        """Rows as integers with a bit set for each inked pixel, leftmost pixel highest."""
+        if not self._width:
+            return (0,) * self.height
+        translator = str.maketrans(
+            ''.join(self._inklevels), '0' + '1' * (self._levels - 1)
+        )
+        return tuple(int(_row.translate(translator), 2) for _row in self._pixels)
+
+    def _pad_inked_rows(self, left=0, bottom=0, right=0, top=0):
+        """Inked rows as integers, with blank space added as in expand()."""
+        return (
+            (0,) * top
+            + tuple(_row << right for _row in self._inked_rows)
+            + (0,) * bottom
+        )
+
+    def _overlay_inked_rows(self, rowsets, operator):
+        """
+        Raster with our size and inklevels, from combined inked rows.
+
+        rowsets: inked rows as integers, for each raster to overlay
+        operator: any to combine additively, all for masking
+        """
+        combine = or_ if operator is any else and_
+        translator = str.maketrans('01', self._paper + self._inklevels[-1])
+        pixels = tuple(
+            format(reduce(combine, _rows), f'0{self._width}b').translate(translator)
+            for _rows in zip(*rowsets)
+        )
+        return type(self)(pixels, inklevels=self._inklevels)
+
     def invert(self):
         """Reverse video."""
         return type(self)(self._pixels, inklevels=self._inklevels[::-1])
@@ -6,15 +6,17 @@ licence: https://opensource.org/licenses/MIT
 """
 
 from pathlib import Path
+from functools import lru_cache
 from string import digits as ascii_digits
 
 from .base import NotFoundError, EncodingName
 from .registry import EncodingRegistry
-from .charmaps import Charmap, Unicode, EncoderLoader
+from .charmaps import Charmap, Unicode, EncoderLoader, resolve_table
+from .store import get_stamp
 from .base import Encoder
 from .indexers import Indexer
 from .taggers import Tagmap
-from .definitions import encodings
+from .definitions import encodings, compile_charmaps
 from ..core.labels import to_labels
 
 
@@ -42,6 +44,13 @@ def encoder(initialiser):
     try:
         if format == 'tbl':
             return Indexer.load(filename)
-        return EncoderLoader(filename, format=format)()
+        path, _, _ = resolve_table(filename, format)
+        return _load_encoder(filename, format, str(path), *get_stamp(path))
     except (EnvironmentError, NotFoundError):
         return None
+
+
+@lru_cache(maxsize=32)
+def _load_encoder(filename, format, path, size, mtime):
+    """Load encoder from file; resolved path, size and mtime key the cache."""
+    return EncoderLoader(filename, format=format)()
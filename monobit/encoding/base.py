@@ -98,9 +98,13 @@ class EncoderBuilder:
 
     def __init__(self, callable):
         self._callable = callable
+        self._encoder = None
 
     def __call__(self):
-        return self._callable()
+        """Build the encoder on first call; later calls return the same encoder."""
+        if self._encoder is None:
+            self._encoder = self._callable()
+        return self._encoder
 
     # delayed operations
 
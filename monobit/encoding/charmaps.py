@@ -6,11 +6,16 @@ licence: https://opensource.org/licenses/MIT
 """
 
 import logging
+import operator
 import unicodedata
+from array import array
+from bisect import bisect_left
 from pathlib import Path
+from collections.abc import Mapping
 from html.parser import HTMLParser
 from importlib.resources import files
 from functools import cached_property, wraps, partial
+from itertools import repeat
 
 from ..base.binary import align, int_to_bytes
 from ..base import reverse_dict
@@ -19,7 +24,7 @@ from .unicode import is_printable, is_fullwidth, unicode_name
 from .base import (
     Encoder, EncoderBuilder, NotFoundError, register_reader, encoding_readers
 )
-from . import tables
+from . import tables, store
 
 
 class Unicode(Encoder):
@@ -35,17 +40,7 @@ class Unicode(Encoder):
         for label in labels:
             codepoint = to_label(label)
             if isinstance(codepoint, bytes):
-                # ensure codepoint length is a multiple of 4
-                codepoint = codepoint.rjust(align(len(codepoint), 2), b'\0')
-                # convert as utf-32 chunks
-                chars = tuple(
-                    chr(int.from_bytes(codepoint[_start:_start+4], 'big'))
-                    for _start in range(0, len(codepoint), 4)
-                )
-                try:
-                    return Char(''.join(chars))
-                except ValueError:
-                    return Char('')
+                return _utf32_to_char(codepoint)
 
     @staticmethod
     def codepoint(*labels):
@@ -53,17 +48,207 @@ class Unicode(Encoder):
         for label in labels:
             char = to_label(label)
             if isinstance(char, str):
-                # we used to normalise to NFC here, presumably to reduce multi-codepoint situations
-                # but it leads to inconsistency between char and codepoint for canonically equivalent chars
-                #char = unicodedata.normalize('NFC', char)
-                return Codepoint(b''.join(ord(_c).to_bytes(4, 'big') for _c in char))
+                return _char_to_utf32(char)
         return Codepoint()
 
+    @staticmethod
+    def decode_all(codepoints):
+        """Convert codepoints to characters; empty string where not convertible."""
+        return tuple(map(_utf32_to_char, codepoints))
+
+    @staticmethod
+    def encode_all(chars):
+        """Convert characters to codepoints."""
+        return tuple(map(_char_to_utf32, chars))
+
     def __repr__(self):
         """Representation."""
         return type(self).__name__ + '()'
 
 
+def _utf32_to_char(codepoint):
+    """Convert UTF-32 codepoint to character; empty string if not convertible."""
+    if 0 < len(codepoint) <= 4:
+        try:
+            return Char(chr(int.from_bytes(codepoint, 'big')))
+        except ValueError:
+            return Char('')
+    # ensure codepoint length is a multiple of 4
+    codepoint = codepoint.rjust(align(len(codepoint), 2), b'\0')
+    # convert as utf-32 chunks
+    chars = tuple(
+        chr(int.from_bytes(codepoint[_start:_start+4], 'big'))
+        for _start in range(0, len(codepoint), 4)
+    )
+    try:
+        return Char(''.join(chars))
+    except ValueError:
+        return Char('')
+
+
+def _char_to_utf32(char):
+    """Convert character to UTF-32 codepoint."""
+    # we used to normalise to NFC here, presumably to reduce multi-codepoint situations
+    # but it leads to inconsistency between char and codepoint for canonically equivalent chars
+    #char = unicodedata.normalize('NFC', char)
+    return Codepoint(b''.join(ord(_c).to_bytes(4, 'big') for _c in char))
+
+
+# marks undefined entries in dense tables; lone surrogates do not occur in charmaps
+_UNDEFINED = '\udfff'
+# least number of double-byte codepoints for which a dense table is smaller than a dict
+_MIN_DENSE_DBCS = 2048
+# offsets of integer codepoint keys, by codepoint length
+# single-byte codepoints come first; the empty codepoint points at the end of the table
+_KEY_OFFSETS = (-1, 0, 0x100)
+
+
+def _codepoint_keys(codepoints):
+    """Integer keys for single- and double-byte codepoints."""
+    return map(
+        operator.add,
+        map(int.from_bytes, codepoints, repeat('big')),
+        map(_KEY_OFFSETS.__getitem__, map(len, codepoints)),
+    )
+
+
+def _key_codepoint(key):
+    """Codepoint for an integer key."""
+    if key < 0x100:
+        return bytes((key,))
+    return (key - 0x100).to_bytes(2, 'big')
+
+
+class _DenseMapping(Mapping):
+    """
+    Read-only mapping from single- and double-byte codepoints to single chars.
+    Chars are stored in a string indexed by codepoint key.
+    """
+
+    def __init__(self, mapping):
+        """Build table from a dict codepoint -> char."""
+        # codepoint keys in order of definition
+        self._keys = array('I', _codepoint_keys(mapping.keys()))
+        size = 0x100
+        if self._keys and max(self._keys) >= 0x100:
+            size += 0x10000
+        # with a final undefined entry for the empty codepoint
+        table = [_UNDEFINED] * (size + 1)
+        for key, char in zip(self._keys, mapping.values()):
+            table[key] = char
+        self._table = ''.join(table)
+
+    @staticmethod
+    def fits(mapping):
+        """Mapping can be stored in a dense table, and takes less memory that way."""
+        lengths = set(map(len, mapping.keys()))
+        if not lengths <= {1, 2} or set(map(len, mapping.values())) != {1}:
+            return False
+        if _UNDEFINED in mapping.values():
+            return False
+        return 2 not in lengths or len(mapping) >= _MIN_DENSE_DBCS
+
+    def get(self, codepoint, default=None):
+        """Get char for codepoint, or default if not defined."""
+        try:
+            char = self._table[
+                int.from_bytes(codepoint, 'big') + _KEY_OFFSETS[len(codepoint)]
+            ]
+        except IndexError:
+            # codepoint longer than covered by the table
+            return default
+        if char == _UNDEFINED:
+            return default
+        return char
+
+    def get_all(self, codepoints, default=None):
+        """Get chars for a sequence of codepoints, or default where not defined."""
+        codepoints = tuple(codepoints)
+        try:
+            if set(map(len, codepoints)) == {1}:
+                # single-byte codepoints index the table directly
+                chars = list(map(self._table.__getitem__, b''.join(codepoints)))
+            else:
+                chars = list(map(self._table.__getitem__, _codepoint_keys(codepoints)))
+        except IndexError:
+            chars = list(map(self.get, codepoints, repeat(_UNDEFINED)))
+        return map({_UNDEFINED: default}.get, chars, chars)
+
+    def __getitem__(self, codepoint):
+        char = self.get(codepoint)
+        if char is None:
+            raise KeyError(codepoint)
+        return char
+
+    def __contains__(self, codepoint):
+        return self.get(codepoint) is not None
+
+    def items(self):
+        """Iterate over codepoint, char pairs in order of definition."""
+        return zip(
+            map(_key_codepoint, self._keys),
+            map(self._table.__getitem__, self._keys)
+        )
+
+    def __iter__(self):
+        return map(_key_codepoint, self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class _SortedReverseMapping(Mapping):
+    """
+    Read-only reverse of a _DenseMapping, from single chars to codepoints.
+    Codepoints are stored in order of the character ordinal.
+    """
+
+    def __init__(self, dense):
+        """Build sorted tables from dense mapping."""
+        # where chars are defined more than once, the last definition counts
+        ordinals = dict(zip(map(dense._table.__getitem__, dense._keys), dense._keys))
+        self._ordinals = array('I', sorted(map(ord, ordinals)))
+        self._keys = array('I', map(ordinals.__getitem__, map(chr, self._ordinals)))
+
+    def get(self, char, default=None):
+        """Get codepoint for char, or default if not defined."""
+        if len(char) != 1:
+            return default
+        ordinal = ord(char)
+        index = bisect_left(self._ordinals, ordinal)
+        if index == len(self._ordinals) or self._ordinals[index] != ordinal:
+            return default
+        return _key_codepoint(self._keys[index])
+
+    def get_all(self, chars, default=None):
+        """Get codepoints for a sequence of chars, or default where not defined."""
+        ordinals, keys = self._ordinals, self._keys
+        size = len(ordinals)
+        for char in chars:
+            if len(char) == 1:
+                ordinal = ord(char)
+                index = bisect_left(ordinals, ordinal)
+                if index < size and ordinals[index] == ordinal:
+                    yield _key_codepoint(keys[index])
+                    continue
+            yield default
+
+    def __getitem__(self, char):
+        codepoint = self.get(char)
+        if codepoint is None:
+            raise KeyError(char)
+        return codepoint
+
+    def __contains__(self, char):
+        return self.get(char) is not None
+
+    def __iter__(self):
+        return map(chr, self._ordinals)
+
+    def __len__(self):
+        return len(self._ordinals)
+
+
 class Charmap(Encoder):
     """Convert between unicode and ordinals using stored dictionary."""
 
@@ -73,11 +258,19 @@ class Charmap(Encoder):
         if not mapping:
             mapping = {}
             name = ''
-        # copy dict
-        self._ord2chr = {**mapping}
+        # single- and double-byte charmaps are stored compactly
+        if _DenseMapping.fits(mapping):
+            self._ord2chr = _DenseMapping(mapping)
+        else:
+            # copy dict
+            self._ord2chr = {**mapping}
+        # transcoding plans to other encoders, by id of the target
+        self._transcodings = {}
 
     @cached_property
     def _chr2ord(self):
+        if isinstance(self._ord2chr, _DenseMapping):
+            return _SortedReverseMapping(self._ord2chr)
         return reverse_dict(self._ord2chr)
 
     def char(self, *labels):
@@ -85,24 +278,46 @@ class Charmap(Encoder):
         for label in labels:
             codepoint = to_label(label)
             if isinstance(codepoint, bytes):
-                try:
-                    return Char(self._ord2chr[codepoint])
-                except KeyError as e:
-                    return Char('')
+                return Char(self._ord2chr.get(codepoint, ''))
 
     def codepoint(self, *labels):
         """Convert character to codepoint sequence, return empty tuple if missing."""
         for label in labels:
             char = to_label(label)
             if isinstance(char, str):
-                try:
-                    return Codepoint(self._chr2ord[char])
-                except KeyError as e:
-                    return Codepoint()
+                return Codepoint(self._chr2ord.get(char, b''))
+
+    def decode_all(self, codepoints):
+        """Convert codepoints to characters; empty string where missing."""
+        return tuple(map(Char, _get_all(self._ord2chr, codepoints, '')))
+
+    def encode_all(self, chars):
+        """Convert characters to codepoints; empty codepoint where missing."""
+        return tuple(map(Codepoint, _get_all(self._chr2ord, chars, b'')))
+
+    def transcoding(self, other):
+        """
+        Map codepoints to the codepoints for the same characters in another encoder.
+
+        other: encoder to convert to; must convert chars with encode_all()
+        returns: dict of codepoint to target codepoint; unconvertible codepoints are left out
+        """
+        # keep the target with its plan, so that its id is not reused while cached
+        target, plan = self._transcodings.get(id(other), (None, None))
+        if target is not other:
+            plan = {
+                _cp: _target
+                for _cp, _target in zip(
+                    self._ord2chr.keys(), other.encode_all(self._ord2chr.values())
+                )
+                if _target
+            }
+            self._transcodings[id(other)] = (other, plan)
+        return plan
 
     @property
     def mapping(self):
-        return {**self._ord2chr}
+        return dict(self._ord2chr.items())
 
     def __len__(self):
         """Number of defined codepoints."""
@@ -125,7 +340,7 @@ class Charmap(Encoder):
         """Return encoding overlaid with all characters defined in right-hand side."""
         if not isinstance(other, Charmap):
             return NotImplemented
-        return Charmap(mapping=self._ord2chr | other._ord2chr, name=f'{self.name}')
+        return Charmap(mapping=self.mapping | other.mapping, name=f'{self.name}')
 
     def distance(self, other):
         """Return number of different code points."""
@@ -224,29 +439,44 @@ class Charmap(Encoder):
         )
 
 
+def _get_all(mapping, keys, default):
+    """Look up a sequence of keys in a dict or dense mapping."""
+    try:
+        get_all = mapping.get_all
+    except AttributeError:
+        return map(mapping.get, keys, repeat(default))
+    return get_all(keys, default)
+
+
 class EncoderLoader(EncoderBuilder):
     """Lazily create new encoder from file."""
 
     def __init__(self, filename, *, format=None, name='', **kwargs):
         if not name:
             name = Path(filename).stem
-        filename = str(filename)
-        # inputs that look like explicit paths used directly
-        # otherwise it's relative to the tables package
-        if filename.startswith('/') or filename.startswith('.'):
-            path = Path(filename)
-        else:
-            path = files(tables) / filename
-        if not path.exists():
-            raise NotFoundError(f'Charmap file `{filename}` does not exist')
-        format = format or path.suffix[1:].lower()
-        try:
-            reader, format_kwargs = encoding_readers[format]
-        except KeyError as exc:
-            raise NotFoundError(f'Undefined charmap file format {format}.') from exc
+        path, reader, format_kwargs = resolve_table(filename, format)
         super().__init__(partial(reader, name, path, **format_kwargs, **kwargs))
 
 
+def resolve_table(filename, format=None):
+    """Get path, reader and reader arguments for a charmap file."""
+    filename = str(filename)
+    # inputs that look like explicit paths used directly
+    # otherwise it's relative to the tables package
+    if filename.startswith('/') or filename.startswith('.'):
+        path = Path(filename)
+    else:
+        path = files(tables) / filename
+    if not path.exists():
+        raise NotFoundError(f'Charmap file `{filename}` does not exist')
+    format = format or path.suffix[1:].lower()
+    try:
+        reader, format_kwargs = encoding_readers[format]
+    except KeyError as exc:
+        raise NotFoundError(f'Undefined charmap file format {format}.') from exc
+    return path, reader, format_kwargs
+
+
 ###############################################################################
 # charmap loaders
 
@@ -254,17 +484,27 @@ class EncoderLoader(EncoderBuilder):
 def _charmap_loader(fn):
     """Decorator for the shared parts of charmap loaders."""
 
-    @wraps(fn)
-    def _load(name, path, *args, **kwargs):
+    def _read(path, *args, **kwargs):
+        """Parse charmap file into a mapping."""
         try:
             data = path.read_bytes()
         except EnvironmentError as exc:
             raise NotFoundError(f'Could not load charmap file `{str(path)}`: {exc}')
         if not data:
             raise NotFoundError(f'No data in charmap file `{str(path)}`')
-        mapping = fn(data, *args, **kwargs)
+        return fn(data, *args, **kwargs)
+
+    @wraps(fn)
+    def _load(name, path, *args, **kwargs):
+        # use the precompiled table if available
+        key = store.get_store_key(path, fn.__name__, kwargs)
+        mapping = store.charmap_store.get(key, path)
+        if mapping is None:
+            mapping = _read(path, *args, **kwargs)
         return Charmap(mapping, name=name)
 
+    # parser without the charmap store, for compiling the store
+    _load.read = _read
     return _load
 
 
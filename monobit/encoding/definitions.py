@@ -11,7 +11,9 @@ from pathlib import Path
 from importlib.resources import files
 
 from .registry import EncodingRegistry
-from .charmaps import Unicode, EncoderLoader, Charmap
+from .charmaps import Unicode, EncoderLoader, Charmap, resolve_table
+from .store import get_store_path, get_store_key, get_stamp, write_store
+from .detect import get_index_path, get_table_stamps
 from .taggers import (
     Tagmap, CharTagger, CodepointTagger,
     UnicodeNameTagger, DescriptionTagger,
@@ -20,9 +22,14 @@ from .taggers import (
 from . import tables
 
 
+def _read_charmap_definitions():
+    """Read charmap definitions from package data."""
+    return json.loads((files(tables) / 'charmaps.json').read_text())
+
+
 def register_charmaps(charmaps):
     """Register charmap files"""
-    for _name, _dict in json.loads((files(tables) / 'charmaps.json').read_text()).items():
+    for _name, _dict in _read_charmap_definitions().items():
         if 'filename' in _dict:
             charmap = EncoderLoader(
                 name=_name, filename=_dict['filename'],
@@ -40,6 +47,40 @@ def register_charmaps(charmaps):
         charmaps[aliases] = charmap
 
 
+def compile_charmaps(path=None):
+    """
+    Parse all registered charmap files and write them to the binary charmap store.
+    Also write the index for best-fit encoding detection next to the store.
+
+    path: location of the store (default: in the user cache)
+    returns: location of the store
+    """
+    path = path or get_store_path()
+    if not path:
+        raise ValueError('No location available for the charmap store.')
+    entries = {}
+    filenames = {'charmaps.json'}
+    for _dict in _read_charmap_definitions().values():
+        if 'filename' not in _dict:
+            continue
+        filenames.add(_dict['filename'])
+        table_path, reader, kwargs = resolve_table(
+            _dict['filename'], _dict.get('format', None)
+        )
+        kwargs = kwargs | _dict.get('kwargs', {})
+        key = get_store_key(table_path, reader.__name__, kwargs)
+        # tagmap readers don't produce charmaps
+        if key is None or key in entries or not hasattr(reader, 'read'):
+            continue
+        entries[key] = get_stamp(table_path), reader.read(table_path, **kwargs)
+    write_store(path, entries)
+    registry = create_encoding_registry()
+    registry.build_fit_index().write(
+        get_index_path(path), registry.get_names(), get_table_stamps(sorted(filenames))
+    )
+    return path
+
+
 def create_encoding_registry():
     # unicode aliases
     encodings = EncodingRegistry()
@@ -0,0 +1,274 @@
+"""
+monobit.encoding.detect - index for best-fit encoding detection
+
+(c) 2026 Rob Hagemans
+licence: https://opensource.org/licenses/MIT
+"""
+
+import os
+import sys
+import json
+import heapq
+import logging
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from itertools import accumulate
+from collections import Counter
+from importlib.resources import files
+
+from .store import STORE_VERSION, get_store_path, get_stamp
+from . import tables
+
+
+# file signature
+_MAGIC = b'monobit fit index\x1a'
+# size of header length field
+_HEADER_SIZE_LENGTH = 4
+# longest codepoint that fits in an index key
+_MAX_CODEPOINT_LENGTH = 7
+
+
+def get_index_path(store_path=None):
+    """Location of the fit index, next to the charmap store; None if not available."""
+    store_path = store_path or get_store_path()
+    if not store_path:
+        return None
+    return Path(store_path).with_suffix('.fit')
+
+
+def get_table_stamps(filenames):
+    """Stamps of packaged charmap tables, by filename."""
+    table_path = files(tables)
+    return {_name: get_stamp(table_path / _name) for _name in filenames}
+
+
+def _codepoint_key(codepoint):
+    """Sortable integer key for a codepoint; the leading 1 preserves its length."""
+    return int.from_bytes(b'\1' + codepoint, 'big')
+
+
+class FitIndex:
+    """
+    Inverted index of charmaps by codepoint and by codepoint-char pair.
+
+    The charmaps that define a codepoint or pair are stored as a group number;
+    most codepoints and pairs share their group with many others.
+    """
+
+    # arrays in the index, with their typecodes
+    _arrays = {
+        # codepoint keys, sorted
+        '_keys': 'Q',
+        # group of charmaps defining each codepoint
+        '_codepoint_groups': 'I',
+        # start of each codepoint's pairs in the pair arrays; one more than keys
+        '_pair_starts': 'I',
+        # start of each pair's char in the chars string; one more than pairs
+        '_char_starts': 'I',
+        # group of charmaps mapping each pair
+        '_pair_groups': 'I',
+    }
+
+    # width of per-charmap counter fields in packed counts
+    _field_bits = 64
+
+    def __init__(self, names=(), sizes=(), groups=(), chars='', **arrays):
+        """Set up index from stored lists and arrays."""
+        # names and number of codepoints of indexed charmaps
+        self._names = list(names)
+        self._sizes = list(sizes)
+        # groups of charmap ids
+        self._groups = list(groups)
+        # chars of all pairs, concatenated
+        self._chars = chars
+        for name, typecode in self._arrays.items():
+            setattr(self, name, array(typecode, arrays.get(name[1:], ())))
+        if not self._pair_starts:
+            self._pair_starts.append(0)
+        if not self._char_starts:
+            self._char_starts.append(0)
+        # groups as packed counters
+        self._counters = {}
+
+    @classmethod
+    def from_charmaps(cls, charmaps):
+        """Build index from an iterable of (name, Charmap) pairs."""
+        names, sizes, codepoints = [], [], {}
+        for index, (name, charmap) in enumerate(charmaps):
+            names.append(name)
+            sizes.append(len(charmap))
+            for codepoint, char in charmap.mapping.items():
+                if len(codepoint) > _MAX_CODEPOINT_LENGTH:
+                    raise ValueError(
+                        f'Codepoint {codepoint.hex()} in charmap `{name}` too long to index.'
+                    )
+                codepoints.setdefault(codepoint, {}).setdefault(char, []).append(index)
+        groups = {}
+        arrays = dict(
+            keys=[], codepoint_groups=[], pair_starts=[0],
+            char_starts=[0], pair_groups=[],
+        )
+        chars = []
+        for key, codepoint in sorted(
+                (_codepoint_key(_cp), _cp) for _cp in codepoints
+            ):
+            pairs = codepoints[codepoint]
+            defining = sorted(set().union(*pairs.values()))
+            arrays['keys'].append(key)
+            arrays['codepoint_groups'].append(
+                groups.setdefault(tuple(defining), len(groups))
+            )
+            for char, mapping in pairs.items():
+                chars.append(char)
+                arrays['char_starts'].append(arrays['char_starts'][-1] + len(char))
+                arrays['pair_groups'].append(
+                    groups.setdefault(tuple(mapping), len(groups))
+                )
+            arrays['pair_starts'].append(len(arrays['pair_groups']))
+        return cls(names, sizes, map(list, groups), ''.join(chars), **arrays)
+
+    def __len__(self):
+        """Number of indexed charmaps."""
+        return len(self._names)
+
+    def _find(self, codepoint, char):
+        """Groups of charmaps that define the codepoint and that map it to char."""
+        key = _codepoint_key(codepoint)
+        index = bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            return None, None
+        for pair in range(self._pair_starts[index], self._pair_starts[index+1]):
+            start, end = self._char_starts[pair], self._char_starts[pair+1]
+            if self._chars[start:end] == char:
+                return self._codepoint_groups[index], self._pair_groups[pair]
+        return self._codepoint_groups[index], None
+
+    def _get_fields(self, packed):
+        """Unpack per-charmap counter fields from an int."""
+        return array('Q', packed.to_bytes(
+            len(self._sizes) * self._field_bits // 8, sys.byteorder
+        ))
+
+    def _get_counter(self, group):
+        """Group as packed counters, with a 1 in the field of each charmap in it."""
+        try:
+            return self._counters[group]
+        except KeyError:
+            pass
+        fields = self._get_fields(0)
+        for index in self._groups[group]:
+            fields[index] = 1
+        counter = int.from_bytes(fields.tobytes(), sys.byteorder)
+        self._counters[group] = counter
+        return counter
+
+    def match(self, charmap, count=1):
+        """
+        Find the charmaps closest to a given charmap.
+        Distances are as in Charmap.distance; ties go to the earliest indexed.
+
+        charmap: Charmap to match
+        count: maximum number of matches to return
+        returns: tuple of (name, distance) pairs, closest first
+        """
+        mapping = charmap.mapping
+        groups = Counter()
+        for codepoint, char in mapping.items():
+            if len(codepoint) <= _MAX_CODEPOINT_LENGTH:
+                groups.update(self._find(codepoint, char))
+        groups.pop(None, None)
+        # add up shared codepoints and matching pairs per charmap, in packed fields
+        total = sum(
+            _count * self._get_counter(_group)
+            for _group, _count in groups.items()
+        )
+        shared = self._get_fields(total)
+        size = len(mapping)
+        distances = (
+            (size + _size - _shared, _index)
+            for _index, (_size, _shared) in enumerate(zip(self._sizes, shared))
+        )
+        return tuple(
+            (self._names[_index], _dist)
+            for _dist, _index in heapq.nsmallest(count, distances)
+        )
+
+    def write(self, path, registered, stamps):
+        """
+        Write index to file.
+
+        path: location of the index file
+        registered: names of all registered encoders the index was built from
+        stamps: stamps of the charmap table files, by filename
+        """
+        blocks = (
+            *(getattr(self, _name).tobytes() for _name in self._arrays),
+            self._chars.encode('utf-32-le'),
+        )
+        header = json.dumps(dict(
+            version=STORE_VERSION,
+            byteorder=sys.byteorder,
+            registered=list(registered),
+            stamps=stamps,
+            names=self._names,
+            sizes=self._sizes,
+            groups=self._groups,
+            blocks=list(map(len, blocks)),
+        )).encode('utf-8')
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to temporary file first, so that readers never see a partial index
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as outstream:
+            outstream.write(_MAGIC)
+            outstream.write(len(header).to_bytes(_HEADER_SIZE_LENGTH, 'little'))
+            outstream.write(header)
+            outstream.writelines(blocks)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, registered):
+        """
+        Read index from file; None if not available or out of date.
+
+        path: location of the index file
+        registered: names of all currently registered encoders
+        """
+        if path is None:
+            return None
+        try:
+            data = Path(path).read_bytes()
+        except EnvironmentError as e:
+            logging.debug('Fit index not available: %s', e)
+            return None
+        start = len(_MAGIC) + _HEADER_SIZE_LENGTH
+        if data[:len(_MAGIC)] != _MAGIC:
+            logging.warning('Ignoring invalid fit index `%s`.', path)
+            return None
+        header_size = int.from_bytes(data[len(_MAGIC):start], 'little')
+        try:
+            header = json.loads(data[start:start+header_size])
+            if (
+                    header['version'] != STORE_VERSION
+                    or header['byteorder'] != sys.byteorder
+                    or header['registered'] != list(registered)
+                    or header['stamps'] != get_table_stamps(header['stamps'])
+                ):
+                logging.debug('Fit index `%s` is out of date.', path)
+                return None
+            ends = tuple(accumulate(header['blocks'], initial=start+header_size))
+            *blocks, chars = (
+                data[_start:_end] for _start, _end in zip(ends, ends[1:])
+            )
+            arrays = {
+                _name[1:]: array(_typecode, _block)
+                for (_name, _typecode), _block in zip(cls._arrays.items(), blocks)
+            }
+            return cls(
+                header['names'], header['sizes'], header['groups'],
+                str(chars, 'utf-32-le'), **arrays
+            )
+        except (KeyError, TypeError, ValueError, EnvironmentError) as e:
+            logging.warning('Ignoring invalid fit index `%s`: %s', path, e)
+            return None
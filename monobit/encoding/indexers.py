@@ -5,8 +5,10 @@ monobit.encoding.indexers - codepoint indexers
 licence: https://opensource.org/licenses/MIT
 """
 import logging
+from functools import lru_cache
 
 from .base import Encoder
+from .store import get_stamp
 from ..core.labels import to_labels
 
 
@@ -36,10 +38,16 @@ class Indexer(Encoder):
     @classmethod
     def load(cls, tbl_file):
         """Load indexer from FONTCONV .tbl file"""
-        with open(tbl_file) as f:
-            tbl = f.read()
-        rangestr = '0x' + ',0x'.join(('-0x'.join(tbl.split('-'))).split())
-        return cls(code_range=rangestr)
+        # indexers are stateful, so we create a new one but reuse the parsed ranges
+        return cls(code_range=_read_tbl(str(tbl_file), *get_stamp(tbl_file)))
+
+
+@lru_cache(maxsize=32)
+def _read_tbl(tbl_file, size, mtime):
+    """Read code ranges from FONTCONV .tbl file; size and mtime key the cache."""
+    with open(tbl_file) as f:
+        tbl = f.read()
+    return '0x' + ',0x'.join(('-0x'.join(tbl.split('-'))).split())
 
 
 def find_ranges(cps, indexgen=None):
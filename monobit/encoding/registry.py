@@ -10,6 +10,7 @@ from functools import partial
 
 from .base import Encoder, EncodingName, NotFoundError
 from .charmaps import Charmap, Unicode
+from .detect import FitIndex, get_index_path
 
 
 class EncodingRegistry:
@@ -18,6 +19,9 @@ class EncodingRegistry:
     def __init__(self):
         self._index = {}
         self._encoders = []
+        self._fit_index = None
+        # index by name as requested, to avoid normalising names on every lookup
+        self._lookup = {}
 
     def __setitem__(self, names, encoder_or_callable):
         """Register an encoder to one or more aliases."""
@@ -31,16 +35,25 @@ class EncodingRegistry:
                 logging.warning(f"Redefining encoder '{normname}'")
             self._index[normname] = len(self._encoders)
         self._encoders.append(encoder_or_callable)
+        # registrations change the best fits and may redefine names
+        self._fit_index = None
+        self._lookup = {}
 
     def _get_index(self, name):
         """Get index from registry by name; raise NotFoundError if not found."""
+        try:
+            return self._lookup[str(name)]
+        except KeyError:
+            pass
         normname = EncodingName(name)
         try:
-            return self._index[normname]
+            index = self._index[normname]
         except KeyError as exc:
             raise NotFoundError(
                 f"No registered character map matches '{name}' ['{normname}']."
             ) from exc
+        self._lookup[str(name)] = index
+        return index
 
     def getter(self, name):
         """Get charmap or builder from registry by name; raise NotFoundError if not found."""
@@ -70,18 +83,37 @@ class EncodingRegistry:
         """Iterate over names of registered charmaps."""
         return iter(self._index.keys())
 
+    def get_names(self):
+        """Get the first registered name for each encoder, in order of registration."""
+        names = [''] * len(self._encoders)
+        for name, index in reversed(self._index.items()):
+            names[index] = name
+        return tuple(names)
+
+    def get_fit_index(self):
+        """Get index of registered charmaps; use the precompiled index if up to date."""
+        if self._fit_index is None:
+            self._fit_index = FitIndex.load(get_index_path(), self.get_names())
+            if self._fit_index is None:
+                self._fit_index = self.build_fit_index()
+        return self._fit_index
+
+    def build_fit_index(self):
+        """Build index of registered charmaps; this loads all charmaps."""
+        # skip encoders that have been redefined under all their names
+        names = (_name for _name in self.get_names() if _name)
+        return FitIndex.from_charmaps(
+            (_name, self[_name]) for _name in names
+            if isinstance(self[_name], Charmap)
+        )
+
+    def match(self, charmap, count=5):
+        """Return names and distances of the best-fit registered charmaps, closest first."""
+        return self.get_fit_index().match(charmap, count)
+
     def fit(self, charmap):
         """Return best-fit registered charmap."""
-        min_dist = len(charmap)
-        fit = Charmap()
-        for registered in self:
-            registered_map = self[registered]
-            if not isinstance(registered_map, Charmap):
-                continue
-            dist = charmap.distance(registered_map)
-            if dist == 0:
-                return registered_map
-            elif dist < min_dist:
-                min_dist = dist
-                fit = registered_map
-        return fit
+        for name, distance in self.match(charmap, count=1):
+            if distance < len(charmap) or not distance:
+                return self[name]
+        return Charmap()
@@ -0,0 +1,166 @@
+"""
+monobit.encoding.store - precompiled binary store of charmap tables
+
+(c) 2026 Rob Hagemans
+licence: https://opensource.org/licenses/MIT
+"""
+
+import os
+import json
+import mmap
+import logging
+from pathlib import Path
+from itertools import accumulate
+from importlib.resources import files
+
+from ..base import safe_import
+from ..constants import VERSION
+from . import tables
+
+platformdirs = safe_import('platformdirs')
+
+
+# format version of the charmap store
+STORE_VERSION = 1
+
+# file signature
+_MAGIC = b'monobit charmaps\x1a'
+# size of index length field
+_INDEX_SIZE_LENGTH = 4
+
+
+def get_store_path():
+    """Default location of the charmap store in the user cache; None if not available."""
+    if not platformdirs:
+        return None
+    return (
+        platformdirs.user_cache_path('monobit')
+        / f'charmaps-{VERSION}-v{STORE_VERSION}.bin'
+    )
+
+
+def get_store_key(path, reader_name, kwargs):
+    """Store key for a charmap table; None if the file is not a packaged table."""
+    try:
+        relpath = Path(str(path)).relative_to(Path(str(files(tables))))
+    except ValueError:
+        return None
+    return f'{relpath.as_posix()}:{reader_name}:{json.dumps(kwargs, sort_keys=True)}'
+
+
+def get_stamp(path):
+    """Size and modification time of a charmap table file."""
+    stat = os.stat(str(path))
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class CharmapStore:
+    """Memory-mapped store of compiled charmap tables."""
+
+    def __init__(self, path):
+        """Set up store at given location; the file is opened on first use."""
+        self._path = path
+        self._index = None
+        self._data = None
+
+    def _open(self):
+        """Map the store file and read its index."""
+        self._index = {}
+        if self._path is None:
+            return
+        try:
+            with open(self._path, 'rb') as instream:
+                data = mmap.mmap(instream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (EnvironmentError, ValueError) as e:
+            logging.debug('Charmap store not available: %s', e)
+            return
+        start = len(_MAGIC) + _INDEX_SIZE_LENGTH
+        if data[:len(_MAGIC)] != _MAGIC:
+            logging.warning('Ignoring invalid charmap store `%s`.', self._path)
+            return
+        index_size = int.from_bytes(data[len(_MAGIC):start], 'little')
+        try:
+            self._index = json.loads(data[start:start+index_size])
+        except ValueError as e:
+            logging.warning('Ignoring invalid charmap store `%s`: %s', self._path, e)
+            return
+        self._data = memoryview(data)[start+index_size:]
+
+    def __contains__(self, key):
+        """Table is in the store."""
+        if self._index is None:
+            self._open()
+        return key in self._index
+
+    def get(self, key, path):
+        """Get mapping for table if stored and up to date; None otherwise."""
+        if key is None or key not in self:
+            return None
+        stamp, offset, count, codepoint_size, size = self._index[key]
+        if stamp != get_stamp(path):
+            logging.debug('Stored charmap `%s` is out of date.', key)
+            return None
+        return _decode(self._data[offset:offset+size], count, codepoint_size)
+
+
+def _encode(mapping):
+    """Convert mapping to lengths and data of codepoints and chars."""
+    return b''.join((
+        bytes(map(len, mapping.keys())),
+        b''.join(mapping.keys()),
+        bytes(map(len, mapping.values())),
+        ''.join(mapping.values()).encode('utf-32-le'),
+    ))
+
+
+def _decode(data, count, codepoint_size):
+    """Convert stored lengths and data to mapping."""
+    chars_start = count + codepoint_size
+    codepoints = bytes(data[count:chars_start])
+    chars = str(data[chars_start+count:], 'utf-32-le')
+    return dict(zip(
+        _split(codepoints, data[:count]),
+        _split(chars, data[chars_start:chars_start+count]),
+    ))
+
+
+def _split(sequence, lengths):
+    """Split sequence into consecutive pieces of given lengths."""
+    ends = tuple(accumulate(lengths))
+    return map(sequence.__getitem__, map(slice, (0, *ends), ends))
+
+
+def write_store(path, entries):
+    """
+    Write charmap store.
+
+    path: location of the store file
+    entries: dict of store key to pair of source file stamp and mapping
+    """
+    index, blocks, offset = {}, [], 0
+    for key, (stamp, mapping) in entries.items():
+        block = _encode(mapping)
+        codepoint_size = sum(map(len, mapping.keys()))
+        index[key] = [stamp, offset, len(mapping), codepoint_size, len(block)]
+        blocks.append(block)
+        offset += len(block)
+    index_data = json.dumps(index).encode('utf-8')
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to temporary file first, so that readers never see a partial store
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as outstream:
+        outstream.write(_MAGIC)
+        outstream.write(len(index_data).to_bytes(_INDEX_SIZE_LENGTH, 'little'))
+        outstream.write(index_data)
+        outstream.writelines(blocks)
+    os.replace(temp_path, path)
+
+
+charmap_store = CharmapStore(get_store_path())
+
+
+if __name__ == '__main__':
+    import sys
+    from .definitions import compile_charmaps
+    print(compile_charmaps(*sys.argv[1:2]))
@@ -43,6 +43,13 @@ class UnicodeNameTagger(Encoder):
             return Tag()
         return Tag(unicode_name(char.value))
 
+    def tag_all(self, chars):
+        """Get unicode glyph names for a sequence of chars."""
+        return tuple(
+            Tag(unicode_name(_c.value)) if _c else Tag()
+            for _c in map(Char, chars)
+        )
+
     def char(self, *labels):
         """Get char from unicode glyph name."""
         tag = _get_tag(labels)
@@ -67,14 +74,25 @@ class DescriptionTagger(Encoder):
         char = _get_char(labels)
         if not char:
             return Tag()
-        char = char.value
-        name = unicode_name(char)
-        if is_showable(char):
-            if is_other_symbol(char):
-                # request text presentation
-                char = '\ufe0e' + char
-            return Tag('[{}] {}'.format(char, name))
-        return Tag(name)
+        return Tag(_describe(char.value))
+
+    def tag_all(self, chars):
+        """Get unicode descriptions for a sequence of chars."""
+        return tuple(
+            Tag(_describe(_c.value)) if _c else Tag()
+            for _c in map(Char, chars)
+        )
+
+
+def _describe(char):
+    """Unicode name of a char, preceded by the char itself if showable."""
+    name = unicode_name(char)
+    if is_showable(char):
+        if is_other_symbol(char):
+            # request text presentation
+            char = '\ufe0e' + char
+        return '[{}] {}'.format(char, name)
+    return name
 
 
 class CharTagger(Encoder):
@@ -85,10 +103,18 @@ class CharTagger(Encoder):
 
     def tag(self, *labels):
         """Get showable char."""
-        char = _get_char(labels).value
-        if is_showable(char):
-            return Tag(char)
-        return Tag()
+        return _showable_tag(_get_char(labels).value)
+
+    def tag_all(self, chars):
+        """Get showable chars for a sequence of chars."""
+        return tuple(_showable_tag(_c.value) for _c in map(Char, chars))
+
+
+def _showable_tag(char):
+    """Tag with char if showable, empty tag otherwise."""
+    if is_showable(char):
+        return Tag(char)
+    return Tag()
 
 
 class FallbackTagger(Encoder):
@@ -5,7 +5,107 @@ monobit.unicode - unicode utilities
 licence: https://opensource.org/licenses/MIT
 """
 
+import sys
 import unicodedata
+from functools import lru_cache
+
+
+###################################################################################################
+# property table
+
+# character property flags
+_FULLWIDTH = 0x01
+_GRAPHICAL = 0x02
+_SHOWABLE = 0x04
+_PRINTABLE = 0x08
+_BLANK = 0x10
+_PRIVATE_USE = 0x20
+_OTHER_SYMBOL = 0x40
+
+# general categories without a graphical representation
+# str.isprintable includes everything but Other (C) and Separator (Z), plus SPACE
+# we keep everything but
+# Other/Control (Cc), Other/Surrogate (Cs), Separator/Line (Zl), Separator/Paragraph (Zp)
+# so we keep all spaces (Zs); PUA (Co); Other/Format (Cf) which has things like SOFT HYPHEN
+# also Not Assigned (Cn) - as unicodedata is not up to date
+# anything excluded will be dropped from our charmaps
+_NON_GRAPHICAL = ('Cc', 'Cs', 'Zl', 'Zp')
+# categories not shown in yaff files and charts - subset of is_graphical
+# anything excluded will be shown as u+XXXX
+_NON_SHOWABLE = (
+    # all Separators inc space separators
+    'Zs', 'Zl', 'Zp',
+    # all Other (inc PUA, not assigned)
+    'Cc', 'Cf', 'Cs', 'Co', 'Cn',
+)
+# graphical categories not printed in charts
+# we keep everything that is_graphical except PUA, Other/Format, Not Assigned
+# anything excluded will be shown as REPLACEMENT CHARACTER in codepage charts
+_NON_PRINTABLE = ('Co', 'Cf', 'Cn')
+
+# number of bits in the codepoint offset within a block of the property table
+_BLOCK_BITS = 8
+_BLOCK_MASK = (1 << _BLOCK_BITS) - 1
+
+# property flags by block of codepoints; blocks are computed when first used
+_blocks = [None] * ((sys.maxunicode >> _BLOCK_BITS) + 1)
+# distinct blocks, so that blocks with equal flags share storage
+_distinct_blocks = {}
+
+
+def _get_char_flags(char):
+    """Compute property flags of a single character."""
+    category = unicodedata.category(char)
+    flags = 0
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        flags |= _FULLWIDTH
+    if category not in _NON_GRAPHICAL:
+        flags |= _GRAPHICAL
+    if category not in _NON_SHOWABLE:
+        flags |= _SHOWABLE
+    if category not in _NON_PRINTABLE:
+        flags |= _PRINTABLE
+    if category == 'Zs' or not flags & _GRAPHICAL:
+        flags |= _BLANK
+    if category == 'Co':
+        flags |= _PRIVATE_USE
+    if category == 'So':
+        flags |= _OTHER_SYMBOL
+    return flags
+
+
+def _build_block(index):
+    """Compute property flags of a block of the property table."""
+    start = index << _BLOCK_BITS
+    block = bytes(map(
+        _get_char_flags, map(chr, range(start, start + _BLOCK_MASK + 1))
+    ))
+    block = _distinct_blocks.setdefault(block, block)
+    _blocks[index] = block
+    return block
+
+
+def _get_flags(char):
+    """Get property flags of a single character from the property table."""
+    codepoint = ord(char)
+    try:
+        return _blocks[codepoint >> _BLOCK_BITS][codepoint & _BLOCK_MASK]
+    except TypeError:
+        return _build_block(codepoint >> _BLOCK_BITS)[codepoint & _BLOCK_MASK]
+
+
+def _any_flag(char, flag):
+    """Check if any char in a sequence has a property flag."""
+    if len(char) == 1:
+        return bool(_get_flags(char) & flag)
+    return any(_get_flags(_c) & flag for _c in char)
+
+
+def _all_flag(char, flag):
+    """Check if all chars in a sequence have a property flag."""
+    if len(char) == 1:
+        return bool(_get_flags(char) & flag)
+    return all(_get_flags(_c) & flag for _c in char)
 
 
 ###################################################################################################
@@ -13,78 +113,59 @@ import unicodedata
 
 def is_fullwidth(char):
     """Check if a character / grapheme sequence is fullwidth."""
-    return any(
-        unicodedata.east_asian_width(_c) in ('W', 'F')
-        for _c in char
-    )
+    return _any_flag(char, _FULLWIDTH)
 
 def is_graphical(char):
     """Check if a char has a graphical representation."""
-    return any(
-        # str.isprintable includes everything but Other (C) and Separator (Z), plus SPACE
-        # we keep everything but
-        # Other/Control (Cc), Other/Surrogate (Cs), Separator/Line (Zl), Separator/Paragraph (Zp)
-        # so we keep all spaces (Zs); PUA (Co); Other/Format (Cf) which has things like SOFT HYPHEN
-        # also Not Assigned (Cn) - as unicodedata is not up to date
-        # anything excluded will be dropped from our charmaps
-        unicodedata.category(_c) not in ('Cc', 'Cs', 'Zl', 'Zp')
-        for _c in char
-    )
+    return _any_flag(char, _GRAPHICAL)
 
 
 def is_showable(char):
     """Check if a char should be shown in yaff files and charts."""
-    return (not char) or char == ' ' or all(
-        # subset of is_graphical
-        # anything excluded will be shown as u+XXXX
-        unicodedata.category(_c) not in (
-            # all Separators inc space separators; u+0020 excepted above
-            'Zs', 'Zl', 'Zp',
-            # all Other (inc PUA, not assigned)
-            'Cc', 'Cf', 'Cs', 'Co', 'Cn',
-        )
-        for _c in char
-    )
+    # u+0020 is shown by itself, but not in sequences
+    return (not char) or char == ' ' or _all_flag(char, _SHOWABLE)
 
 
 def is_other_symbol(char):
     """Emoji and other symbols not shown in yaff files by default, but shown in charts."""
     # this is a very crude check, for more precision we need emoji-data.txt from unicode.org
-    return unicodedata.category(char) == 'So'
+    if len(char) != 1:
+        # as unicodedata.category
+        raise TypeError(f'need a single Unicode character as parameter, got {char!r}')
+    return bool(_get_flags(char) & _OTHER_SYMBOL)
 
 
 def is_printable(char):
     """Check if a char should be printed - nothing ambiguous or unrepresentable in there."""
-    return (not char) or is_graphical(char) and all(
-        # we keep everything that is_graphical except PUA, Other/Format, Not Assigned
-        # anything excluded will be shown as REPLACEMENT CHARACTER in codepage charts
-        unicodedata.category(_c) not in ('Co', 'Cf', 'Cn')
-        for _c in char
-    )
+    return (not char) or is_graphical(char) and _all_flag(char, _PRINTABLE)
 
 
 def is_blank(char):
     """Check if a sequence is whitespace or non-graphical."""
     if not char:
         return False
-    return all(
-        unicodedata.category(_c) == 'Zs' or not is_graphical(_c)
-        for _c in char
-    )
+    return _all_flag(char, _BLANK)
 
 def is_private_use(char):
     """Check if any char is in the private use area."""
-    return any(
-        unicodedata.category(_c) == 'Co'
-        for _c in char
-    )
+    return _any_flag(char, _PRIVATE_USE)
+
+
+###################################################################################################
+# character names
+
+@lru_cache(maxsize=0x10000)
+def _get_name(char):
+    """Unicode registered name of a single character; None if it has none."""
+    return unicodedata.name(char, None)
+
 
 def unicode_name(char, no_name=''):
     """Unicode registered name."""
-    names = []
-    for c in char:
-        try:
-            names.append(unicodedata.name(c))
-        except ValueError:
-            names.append(no_name)
-    return ', '.join(names)
+    if len(char) == 1:
+        name = _get_name(char)
+        return no_name if name is None else name
+    return ', '.join(
+        no_name if _name is None else _name
+        for _name in map(_get_name, char)
+    )
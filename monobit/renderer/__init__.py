@@ -5,11 +5,12 @@ monobit.renderer - render to bitmaps
 licence: https://opensource.org/licenses/MIT
 """
 
-from .renderer import render, render_text
+from .renderer import render, render_text, Renderer
 from .createchart import (
-    chart, create_chart, grid_map, grid_traverser, write_imagefile,
+    chart, create_chart, iter_chart_sheets, grid_map, iter_grid_maps,
+    grid_traverser, write_imagefile,
 )
-from .glyphmap import GlyphMap, glyph_to_image
+from .glyphmap import GlyphMap, GlyphMapStream, glyph_to_image, render_images
 from .rgb import RGBTable, create_image_colours, create_gradient
 from .image import write_imagefile, IMAGE_PATTERNS, IMAGE_MAGIC
 
@@ -5,13 +5,18 @@ monobit.renderer.blocks - output pixels as text using block elements
 licence: https://opensource.org/licenses/MIT
 """
 
+import re
 import logging
-from itertools import zip_longest
+from functools import cache
 
 from monobit.base.binary import bytes_to_bits
 from monobit.base import blockstr
 
 
+# runs of border in canvas mask
+_UNDRAWN = re.compile(b'\0+')
+
+
 # block elements
 
 BLOCKS = {
@@ -101,54 +106,72 @@ BLOCKS[(1, 4)] = {
 }
 
 
-def matrix_to_blocks(matrix, ncols, nrows):
-    """Convert bit matrix to a matrix of block characters."""
+def pack_rows(rows, bits=1):
+    """
+    Pack consecutive rows of small values into an integer with one byte per column.
+
+    rows: rows of values less than 2**bits
+    bits: number of bits to shift each next row by
+    """
+    # rows are added as little-endian integers, so that each byte holds a column
+    value = 0
+    for shift, row in enumerate(rows):
+        value |= int.from_bytes(row, 'little') << (shift * bits)
+    return value
+
+
+@cache
+def _get_block_table(ncols, nrows):
+    """Block characters indexed by packed bits, column by column, top to bottom."""
     try:
         blockdict = BLOCKS[(ncols, nrows)]
     except KeyError:
         raise ValueError(f'Unsupported block resolution: {ncols}x{nrows}')
-    bitblockrows = bit_block_rows(matrix, nrows, ncols)
-    block_matrix = [
-        [blockdict[_bitblock] for _bitblock in _row]
-        for _row in bitblockrows
-    ]
-    return block_matrix
-
-
-def bit_block_rows(matrix, nrows, ncols, fillvalue=0):
-    """Convert matrix into rows of blocks of pixels of given size."""
     return tuple(
-        tuple(
-            _bitblock
-            for _bitblock in zip_longest(
-                *(
-                    _bitrows[_row][_col::ncols]
-                    for _row in range(nrows)
-                    for _col in range(ncols)
-                ),
-                fillvalue=fillvalue
-            )
-        )
-        for _bitrows in zip_longest(
-            *(matrix[_ofs::nrows] for _ofs in range(nrows)), fillvalue=()
-        )
+        blockdict[tuple(
+            (_code >> (_col*nrows + _row)) & 1
+            for _row in range(nrows)
+            for _col in range(ncols)
+        )]
+        for _code in range(1 << (ncols*nrows))
     )
 
 
-def matrix_to_shades(matrix, *, inklevels, border):
-    """Convert bit matrix to a mutable matrix of block characters."""
-    return [
-        [
-            _get_shaded_block(_bitblock, inklevels, border)
-            for _bitblock in _row
-        ]
-        for _row in matrix
-    ]
+def matrix_to_blocks(matrix, ncols, nrows):
+    """Convert bit matrix to a matrix of block characters."""
+    table = _get_block_table(ncols, nrows)
+    width = max(map(len, matrix), default=0)
+    ncells = -(-width // ncols)
+    block_matrix = []
+    for top in range(0, len(matrix), nrows):
+        # bit n of each column value comes from pixel row n of the block
+        columns = pack_rows(matrix[top:top+nrows]).to_bytes(ncells*ncols, 'little')
+        cells = pack_rows(
+            (columns[_col::ncols] for _col in range(ncols)), nrows
+        ).to_bytes(ncells, 'little')
+        block_matrix.append(list(map(table.__getitem__, cells)))
+    return block_matrix
+
+
+def matrix_to_shades(matrix, mask, *, inklevels, border):
+    """
+    Convert matrix of ink levels to a mutable matrix of block characters.
+
+    mask: rows of 0 for border and 1 where drawn
+    """
+    table = tuple(_get_shaded_block(_shade) for _shade in inklevels)
+    border = _get_shaded_block(border)
+    shade_matrix = []
+    for row, mrow in zip(matrix, mask):
+        shade_row = list(map(table.__getitem__, row))
+        for match in _UNDRAWN.finditer(mrow):
+            shade_row[match.start():match.end()] = [border] * len(match[0])
+        shade_matrix.append(shade_row)
+    return shade_matrix
 
 
-def _get_shaded_block(value, inklevels, border):
+def _get_shaded_block(shade):
     """Get block with given shade."""
-    shade = inklevels[value] if value >= 0 else border
     if shade is None:
         return f'\x1b[0m '
     r, g, b = shade
@@ -19,7 +19,7 @@ from monobit.storage.magic import MagicRegistry
 from monobit.storage.fontfiles import output_pack_or_font
 from monobit.encoding.unicode import is_showable
 from monobit.storage.utils.limitations import ensure_single
-from .glyphmap import GlyphMap
+from .glyphmap import GlyphMap, render_images
 from .image import write_imagefile, IMAGE_PATTERNS, IMAGE_MAGIC
 from .rgb import default_colours
 
@@ -273,6 +273,8 @@ if Image:
             codepoint_range:tuple[Codepoint]=None,
             grid_positioning:bool=True,
             skip_empty_lines:bool=True,
+            lines_per_page:int=0,
+            processes:int=1,
         ):
         """
         Export font to chart image.
@@ -290,9 +292,11 @@ if Image:
         codepoint_range: range of codepoints to include (includes bounds and undefined codepoints; default: all codepsoints)
         grid_positioning: place codepoints on corresponding grid positions, leaving gaps if undefined (default: true)
         skip_empty_lines: if -grid-positioning is used, skip lines that have no glyphs (default: true)
+        lines_per_page: number of lines per page, with pages stored as image frames (default: all on one page)
+        processes: number of processes rendering pages in parallel; 0 for one per CPU (default: 1)
         """
         # NOTE 'chart image' and 'save image' are the same but with different defaults
-        glyph_map = create_chart(
+        glyph_maps = iter_chart_sheets(
             fonts,
             glyphs_per_line=glyphs_per_line,
             margin=margin,
@@ -302,18 +306,20 @@ if Image:
             codepoint_range=codepoint_range,
             grid_positioning=grid_positioning,
             skip_empty_lines=skip_empty_lines,
+            lines_per_page=lines_per_page or None,
         )
         paper, ink, border = default_colours(
             fonts[0], paper, ink, border,
             default_ink=RGB(0, 0, 0), default_paper=RGB(255, 255, 255),
             default_border=RGB(32, 32, 32),
         )
-        img, = glyph_map.to_images(
+        images = render_images(
+            glyph_maps, processes=processes,
             border=border, paper=paper, ink=ink,
             transparent=False,
             image_mode=image_mode,
         )
-        write_imagefile(outfile, img, image_format)
+        write_imagefile(outfile, next(images), image_format, images)
 
 
 ###############################################################################
@@ -333,6 +339,63 @@ def create_chart(
         skip_empty_lines=False,
     ):
     """Create chart glyph map of font."""
+    font, margin, padding = _prepare_chart(
+        fonts, margin=margin, padding=padding, scale=scale,
+        codepoint_range=codepoint_range, max_labels=max_labels,
+        label_height=label_height, glyphs_per_line=glyphs_per_line,
+        grid_positioning=grid_positioning, skip_empty_lines=skip_empty_lines,
+    )
+    glyph_map = grid_map(
+        font,
+        glyphs_per_line=glyphs_per_line,
+        lines_per_page=lines_per_page,
+        margin=margin, padding=padding,
+        direction=direction,
+    )
+    _append_chart_labels(glyph_map, direction, max_labels, label_height)
+    return glyph_map
+
+
+def iter_chart_sheets(
+        fonts, *,
+        glyphs_per_line,
+        margin,
+        padding,
+        scale,
+        direction,
+        codepoint_range,
+        lines_per_page=None,
+        max_labels=0,
+        label_height=1,
+        grid_positioning=False,
+        skip_empty_lines=False,
+    ):
+    """
+    Create chart glyph maps of font, one sheet at a time.
+    All sheets have the same bounds.
+    """
+    font, margin, padding = _prepare_chart(
+        fonts, margin=margin, padding=padding, scale=scale,
+        codepoint_range=codepoint_range, max_labels=max_labels,
+        label_height=label_height, glyphs_per_line=glyphs_per_line,
+        grid_positioning=grid_positioning, skip_empty_lines=skip_empty_lines,
+    )
+    for glyph_map in iter_grid_maps(
+            font,
+            glyphs_per_line=glyphs_per_line,
+            lines_per_page=lines_per_page,
+            margin=margin, padding=padding,
+            direction=direction,
+        ):
+        _append_chart_labels(glyph_map, direction, max_labels, label_height)
+        yield glyph_map
+
+
+def _prepare_chart(
+        fonts, *, margin, padding, scale, codepoint_range, max_labels,
+        label_height, glyphs_per_line, grid_positioning, skip_empty_lines,
+    ):
+    """Prepare font and grid spacing for chart."""
     font = ensure_single(fonts)
     font = font.equalise_horizontal()
     if grid_positioning:
@@ -347,13 +410,11 @@ def create_chart(
         label_padding = 0
     padding = Coord(padding.x, padding.y + label_padding)
     margin = Coord(margin.x, margin.y + label_padding)
-    glyph_map = grid_map(
-        font,
-        glyphs_per_line=glyphs_per_line,
-        lines_per_page=lines_per_page,
-        margin=margin, padding=padding,
-        direction=direction,
-    )
+    return font, margin, padding
+
+
+def _append_chart_labels(glyph_map, direction, max_labels, label_height):
+    """Add glyph labels to chart glyph map."""
     right_align = aligns_right(direction)
     for entry in glyph_map:
         for count, label in enumerate(entry.glyph.get_labels()):
@@ -370,7 +431,6 @@ def create_chart(
                 sheet=entry.sheet,
                 right_align=right_align,
             )
-    return glyph_map
 
 
 def aligns_right(direction):
@@ -438,6 +498,63 @@ def grid_map(
     """
     Create glyph grid(s) for font charts.
     """
+    extent, glyph_pages = _layout_grid(
+        font, glyphs_per_line, lines_per_page,
+        margin, padding, direction, invert_y,
+    )
+    glyph_map = GlyphMap(
+        (
+            Props(glyph=_glyph, sheet=_sheet, x=_x, y=_y)
+            for _sheet, _glyph_page in enumerate(glyph_pages)
+            for _glyph, _x, _y in _glyph_page
+        ),
+        levels=font.levels,
+        rgb_table=font.rgb_table,
+    )
+    # use blank glyphs for grid bounds
+    glyph_map.append_glyph(Glyph(), 0, 0, sheet=0)
+    glyph_map.append_glyph(Glyph(), *extent, sheet=0)
+    return glyph_map
+
+
+def iter_grid_maps(
+        font, *,
+        glyphs_per_line=None,
+        lines_per_page=None,
+        margin=(0, 0), padding=(0, 0),
+        direction=None,
+        invert_y=False,
+    ):
+    """
+    Create glyph grids for font charts, yielding a single-sheet glyph map per page.
+    """
+    extent, glyph_pages = _layout_grid(
+        font, glyphs_per_line, lines_per_page,
+        margin, padding, direction, invert_y,
+    )
+    for glyph_page in glyph_pages:
+        glyph_map = GlyphMap(
+            (
+                Props(glyph=_glyph, sheet=0, x=_x, y=_y)
+                for _glyph, _x, _y in glyph_page
+            ),
+            levels=font.levels,
+            rgb_table=font.rgb_table,
+        )
+        # use blank glyphs for grid bounds
+        glyph_map.append_glyph(Glyph(), 0, 0, sheet=0)
+        glyph_map.append_glyph(Glyph(), *extent, sheet=0)
+        yield glyph_map
+
+
+def _layout_grid(
+        font, glyphs_per_line, lines_per_page,
+        margin, padding, direction, invert_y,
+    ):
+    """
+    Work out glyph grid geometry.
+    Returns the grid extent and a lazy iterator over pages of (glyph, x, y).
+    """
     padding = Coord(*padding)
     margin = Coord(*margin)
     # work out image geometry
@@ -452,46 +569,33 @@ def grid_map(
     rows = rows or ceildiv(len(font.glyphs), columns)
     columns = columns or ceildiv(len(font.glyphs), rows)
     glyphs_per_page = rows * columns
+    extent = Coord(
+        2 * margin.x + columns*step_x - padding.x,
+        2 * margin.y + rows*step_y - padding.y,
+    )
     if not glyphs_per_page:
-        glyph_map = ()
-    else:
-        glyph_pages = tuple(
-            font.glyphs[_s : _s + glyphs_per_page]
-            for _s in range(0, len(font.glyphs), glyphs_per_page)
-        )
-        # horizontal alignment (left or right)
-        # note that we have equalised glyphs to the same height
-        # so vertical alignment is not needed
-        right_align = aligns_right(direction)
-        # output glyph maps
-        glyph_map = (
-            Props(
-                glyph=_glyph, sheet=_sheet,
-                x=(
-                    margin.x + col*step_x
-                    + (font.raster_size.x - _glyph.width if right_align else 0)
-                ),
-                y=margin.y + row*step_y,
+        return extent, ((),)
+    # horizontal alignment (left or right)
+    # note that we have equalised glyphs to the same height
+    # so vertical alignment is not needed
+    right_align = aligns_right(direction)
+    glyph_pages = (
+        (
+            (
+                _glyph,
+                margin.x + col*step_x
+                + (font.raster_size.x - _glyph.width if right_align else 0),
+                margin.y + row*step_y,
             )
-            for _sheet, _glyph_page in enumerate(glyph_pages)
             for _glyph, (row, col) in zip(
-                _glyph_page,
+                font.glyphs[_s : _s + glyphs_per_page],
                 grid_traverser(columns, rows, direction, invert_y)
             )
         )
-    glyph_map = GlyphMap(
-        glyph_map, levels=font.levels,
-        rgb_table=font.rgb_table,
-    )
-    # use blank glyphs for grid bounds
-    glyph_map.append_glyph(Glyph(), 0, 0, sheet=0)
-    glyph_map.append_glyph(
-        Glyph(),
-        2 * margin.x + columns*step_x - padding.x,
-        2 * margin.y + rows*step_y - padding.y,
-        sheet=0
+        # an empty font still gives one (empty) page
+        for _s in range(0, max(1, len(font.glyphs)), glyphs_per_page)
     )
-    return glyph_map
+    return extent, glyph_pages
 
 
 def grid_traverser(columns, rows, direction, invert_y=False):
@@ -5,16 +5,24 @@ monobit.renderer.glyphmap - glyph maps
 licence: https://opensource.org/licenses/MIT
 """
 
+import os
+import re
 import logging
+from functools import cache
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 from monobit.base import safe_import
 Image = safe_import('PIL.Image')
 
 from monobit.base import Props, Coord, RGB, blockstr
+from monobit.core import Glyph
 from monobit.core.raster import turn_method
 from monobit.plumbing import convert_arguments
 from .blocks import matrix_to_blocks, matrix_to_shades
-from .sixel import matrix_to_sixel
+from .sixel import (
+    matrix_to_sixel, matrix_to_sixel_rows, sixel_header, SIXEL_END,
+)
 from .rgb import create_image_colours
 
 _IMAGE_MODE_PIL_MAP = {
@@ -58,6 +66,7 @@ class GlyphMap:
         self._scale_y = 1
         self._levels = levels
         self._rgb_table = rgb_table
+        self._fixed_bounds = {}
 
     def __iter__(self):
         return iter(self._map)
@@ -90,6 +99,18 @@ class GlyphMap:
             for _i in range(len(self._map))
         ]
 
+    def set_bounds(self, *, min_x=None, min_y=None, max_x=None, max_y=None):
+        """
+        Fix bounds of the glyph map; glyphs outside are clipped.
+        Bounds that are not given follow the glyphs.
+        """
+        self._fixed_bounds.update(
+            (_k, _v) for _k, _v in dict(
+                min_x=min_x, min_y=min_y, max_x=max_x, max_y=max_y,
+            ).items()
+            if _v is not None
+        )
+
     def get_bounds(self):
         """Get extreme coordinates across all sheets. Bounds are inclusive."""
         last = max(_entry.sheet for _entry in self._map)
@@ -99,7 +120,9 @@ class GlyphMap:
         # e.g. if I have a 2-pixel wide glyph at x=0, I need a 2-pixel image
         max_x = max(_entry.x + _entry.glyph.width for _entry in self._map)
         max_y = max(_entry.y + _entry.glyph.height for _entry in self._map)
-        return last, min_x, min_y, max_x, max_y
+        bounds = dict(min_x=min_x, min_y=min_y, max_x=max_x, max_y=max_y)
+        bounds.update(self._fixed_bounds)
+        return last, *bounds.values()
 
     def to_canvas(self, sheet=0):
         """Convert one sheet of the glyph map to canvas."""
@@ -125,13 +148,44 @@ class GlyphMap:
         last_sheet, *_ = self.get_bounds()
         images = [
             self.as_image(
-                paper=paper, ink=ink, border=border,
+                paper=paper, ink=ink, border=border, sheet=sheet,
                 invert_y=invert_y, transparent=transparent, image_mode=image_mode,
             )
             for sheet in range(last_sheet+1)
         ]
         return images
 
+    def iter_images(self, *, processes=1, **kwargs):
+        """
+        Iterate over images of the sheets in glyph map, in order.
+
+        processes: number of worker processes; 0 for one per CPU (default: 1)
+        kwargs: arguments to as_image
+        """
+        return render_images(self.iter_sheets(), processes=processes, **kwargs)
+
+    def iter_sheets(self):
+        """Iterate over single-sheet glyph maps, keeping the bounds across all sheets."""
+        last_sheet, min_x, min_y, max_x, max_y = self.get_bounds()
+        sheets = [
+            GlyphMap(levels=self._levels, rgb_table=self._rgb_table)
+            for _ in range(last_sheet+1)
+        ]
+        for entry in self._map:
+            sheets[entry.sheet].append_glyph(entry.glyph, entry.x, entry.y)
+        for entry in self._labels:
+            sheets[entry.sheet].append_label(
+                entry.text, entry.x, entry.y, right_align=entry.right_align
+            )
+        for glyph_map in sheets:
+            # use blank glyphs for bounds
+            glyph_map.append_glyph(Glyph(), min_x, min_y)
+            glyph_map.append_glyph(Glyph(), max_x, max_y)
+            glyph_map._turns = self._turns
+            glyph_map._scale_x, glyph_map._scale_y = self._scale_x, self._scale_y
+            glyph_map._fixed_bounds = dict(self._fixed_bounds)
+        return iter(sheets)
+
     def as_image(
             self, *,
             paper=None, ink=None, border=(32, 32, 32),
@@ -144,7 +198,6 @@ class GlyphMap:
             image_mode=image_mode, rgb_table=self._rgb_table,
             levels=self._levels, ink=ink, paper=paper
         )
-        masklevels = [0] + [1] * (self._levels-1)
         # mono and greyscale images have fixed levels
         if not image_mode.lower().startswith('rgb'):
             border = 0
@@ -152,33 +205,84 @@ class GlyphMap:
         # no +1 as bounds are inclusive
         width, height = max_x - min_x, max_y - min_y
         pil_mode = _IMAGE_MODE_PIL_MAP[image_mode[:4].lower()]
-        image = Image.new(pil_mode, (width, height), border)
+        pixels, drawn = self._composite(
+            width, height, min_x, min_y,
+            sheet=sheet, invert_y=invert_y, transparent=transparent,
+        )
+        # one palette-indexed image, scaled before colours are applied
+        image = Image.frombytes('P', (width, height), bytes(pixels))
+        mask = Image.frombytes('L', (width, height), bytes(drawn))
+        size = (self._scale_x * width, self._scale_y * height)
+        image, mask = (
+            _im.resize(size, Image.NEAREST).rotate(
+                -90 * self._turns, expand=True
+            )
+            for _im in (image, mask)
+        )
+        if pil_mode in ('RGB', 'RGBA'):
+            image.putpalette(tuple(_c for _rgb in inklevels for _c in _rgb))
+            image = image.convert(pil_mode)
+        else:
+            # mono image has levels 0 and 1
+            scale = 255 if pil_mode == '1' else 1
+            lut = bytes(_v * scale for _v in inklevels).ljust(256, b'\0')
+            image = Image.frombytes(
+                'L', image.size, image.tobytes().translate(lut)
+            ).convert(pil_mode)
+        # paint border where no glyph was drawn
+        image.paste(border or 0, mask=mask.point(lambda _v: 255 - _v))
+        return image
+
+    def _composite(
+            self, width, height, min_x, min_y, *, sheet, invert_y, transparent,
+        ):
+        """
+        Composite one sheet into a buffer of ink levels.
+        Returns the buffer and a mask buffer that is 255 where glyphs were drawn.
+        """
+        pixels = bytearray(width * height)
+        drawn = bytearray(width * height)
         for entry in self._map:
             if entry.sheet != sheet:
                 continue
-            if transparent:
-                # if glyphs overlap, we need to treat the background colour as transparent
-                # create a mask to paste only non-background pixels
-                # for greyscale and colour, alpha_composite would be better
-                mask = glyph_to_image(
-                    entry.glyph, image_mode='mono', inklevels=masklevels,
-                )
-            else:
-                mask = None
-            colour = glyph_to_image(entry.glyph, image_mode, inklevels)
+            glyph = entry.glyph
             if invert_y:
-                target = (entry.x, entry.y)
+                left, top = entry.x, entry.y
             else:
-                # Image has ttb y coords, we have btt
+                # image has ttb y coords, we have btt
                 # our character origin is bottom left
-                target = (entry.x-min_x, height-entry.glyph.height+min_y-entry.y)
-            image.paste(colour, target, mask)
-        image = (
-            image.resize(
-                (self._scale_x*image.width, self._scale_y*image.height)
-            ).rotate(-90 * self._turns, expand=True)
-        )
-        return image
+                left, top = entry.x-min_x, height-glyph.height+min_y-entry.y
+            # clip horizontally
+            right = min(width, left + glyph.width)
+            src_left = max(0, -left)
+            left = max(0, left)
+            if left >= right:
+                continue
+            if transparent:
+                # if glyphs overlap, we need to treat the background colour as transparent
+                # paste only non-background pixels
+                masks = glyph.as_matrix(inklevels=_INK_MASK[:glyph.levels])
+            rows = glyph.as_matrix(inklevels=bytes(range(glyph.levels)))
+            for y, src in enumerate(rows, top):
+                if not 0 <= y < height:
+                    continue
+                start, end = y*width + left, y*width + right
+                src = src[src_left:src_left + right - left]
+                if not transparent:
+                    pixels[start:end] = src
+                    drawn[start:end] = _INK_MASK[-1:] * (end - start)
+                    continue
+                src_mask = masks[y-top][src_left:src_left + right - left]
+                if not any(drawn[start:end]):
+                    pixels[start:end] = src
+                    drawn[start:end] = src_mask
+                else:
+                    pixels[start:end] = bytes(
+                        _s if _m else _t
+                        for _t, _s, _m in zip(pixels[start:end], src, src_mask)
+                    )
+                    drawn[start:end] = bytes(map(max, drawn[start:end], src_mask))
+        return pixels, drawn
 
     def as_text(
             self, *,
@@ -238,22 +342,135 @@ class GlyphMap:
         return tuple(_e for _e in self._labels if _e.sheet == sheet)
 
 
+class GlyphMapStream:
+    """Consecutive glyph maps, output one below the other, band by band."""
+
+    def __init__(self, glyph_maps):
+        """Wrap an iterable of single-sheet glyph maps."""
+        self._glyph_maps = iter(glyph_maps)
+
+    def _iter_canvases(self, rows=1):
+        """
+        Convert glyph maps to canvases.
+        Canvas heights are multiples of `rows`, except for the last one;
+        leftover pixel rows are carried over to the next canvas.
+        """
+        carry = None
+        for glyph_map in self._glyph_maps:
+            canvas = glyph_map.to_canvas()
+            if carry is not None:
+                canvas = carry.stack(canvas)
+            canvas, carry = canvas.split(canvas.height - canvas.height % rows)
+            if canvas.height:
+                yield glyph_map, canvas
+        if carry is not None and carry.height:
+            yield glyph_map, carry
+
+    def iter_text(self, *, inklevels:str=' @', border:str=None):
+        """Convert glyph maps to text, band by band."""
+        for _, canvas in self._iter_canvases():
+            yield canvas.as_text(inklevels=inklevels, border=border)
+
+    @convert_arguments
+    def iter_blocks(self, resolution:Coord=Coord(2, 2)):
+        """Convert glyph maps to quadrant block characters, band by band."""
+        resolution = Coord(*resolution)
+        for _, canvas in self._iter_canvases(resolution.y):
+            yield canvas.as_blocks(resolution)
+
+    def iter_shades(self, *, paper:RGB=None, ink:RGB=None, border:RGB=None):
+        """Convert glyph maps to ansi coloured block characters, band by band."""
+        for glyph_map, canvas in self._iter_canvases():
+            inklevels = create_image_colours(
+                image_mode='RGB', rgb_table=glyph_map._rgb_table,
+                levels=glyph_map._levels, ink=ink, paper=paper
+            )
+            yield canvas.as_shades(inklevels=inklevels, border=border)
+
+    def iter_sixel(self, *, paper:RGB=None, ink:RGB=None, border:RGB=None):
+        """Convert glyph maps to sixel sequences, band by band."""
+        # output a single sixel sequence; sixel rows are six pixels high
+        inklevels = None
+        for glyph_map, canvas in self._iter_canvases(6):
+            if inklevels is None:
+                inklevels = create_image_colours(
+                    image_mode='RGB', rgb_table=glyph_map._rgb_table,
+                    levels=glyph_map._levels, ink=ink, paper=paper
+                )
+                yield sixel_header(inklevels=inklevels, border=border)
+            yield matrix_to_sixel_rows(
+                canvas._pixels, canvas._mask, inklevels=inklevels, border=border,
+            )
+        if inklevels is not None:
+            yield SIXEL_END
+
+
+# image mask values for ink levels: paper is transparent
+_INK_MASK = bytes((0,)) + bytes((255,)) * 255
+
+# runs of border in canvas mask
+_UNDRAWN = re.compile(b'\0+')
+
+def render_images(glyph_maps, *, processes=1, **kwargs):
+    """
+    Render an iterable of glyph maps to images, yielding them in order.
+
+    processes: number of worker processes; 0 for one per CPU (default: 1)
+    kwargs: arguments to GlyphMap.as_image
+    """
+    if processes == 1:
+        for glyph_map in glyph_maps:
+            yield glyph_map.as_image(**kwargs)
+        return
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(processes) as executor:
+        # keep a bounded number of pages in flight
+        pending = deque()
+        for glyph_map in glyph_maps:
+            pending.append(executor.submit(glyph_map.as_image, **kwargs))
+            if len(pending) > 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# per-byte repetitions for horizontal stretch
+@cache
+def _get_stretch_table(factor):
+    return tuple(bytes((_b,)) * factor for _b in range(256))
+
+
 class _Canvas:
     """Blittable raster for glyph maps."""
 
-    def __init__(self, pixels, levels=2, labels=()):
-        """Create raster from tuple of tuples of string."""
+    def __init__(self, pixels, levels=2, labels=(), mask=None):
+        """
+        Create raster from list of bytearray rows of ink levels.
+
+        mask: list of bytearray rows, 0 for border and 1 where drawn (default: all drawn)
+        """
         self._pixels = pixels
         self._labels = list(labels)
         self.height = len(pixels)
         self.width = 0 if not pixels else len(pixels[0])
         self.levels = levels
+        if mask is None:
+            mask = [bytearray(b'\1') * self.width for _ in range(self.height)]
+        self._mask = mask
 
     @classmethod
     def blank(cls, width, height, fill=-1, levels=2):
         """Create a canvas in background colour."""
-        canvas = [[fill]*width for _ in range(height)]
-        return cls(canvas, levels=levels)
+        canvas = [bytearray((max(0, fill),)) * width for _ in range(height)]
+        mask = [bytearray((fill >= 0,)) * width for _ in range(height)]
+        return cls(canvas, levels=levels, mask=mask)
+
+    def _modify(self, transform, labels):
+        """Apply a transformation on lists of rows to pixels and mask."""
+        return type(self)(
+            transform(self._pixels), levels=self.levels, labels=labels,
+            mask=transform(self._mask),
+        )
 
     def blit(self, raster, grid_x, grid_y):
         """Draw a matrix onto a canvas, leaving existing ink in place."""
@@ -261,19 +478,73 @@ class _Canvas:
             return self
         if raster.levels > self.levels:
             raise ValueError('Too many inklevels in raster.')
-        matrix = raster.as_matrix()
-        for work_y in reversed(range(raster.height)):
-            if 0 <= grid_y + work_y < self.height:
-                row = self._pixels[self.height - (grid_y + work_y) - 1]
-                for work_x, ink in enumerate(matrix[raster.height - work_y - 1]):
-                    if 0 <= grid_x + work_x < self.width:
-                        # grayscale will be additive until full-ink level
-                        row[grid_x + work_x] = min(
-                            self.levels - 1,
-                            max(0, ink) + max(0, row[grid_x + work_x]),
-                        )
+        # clip horizontally
+        left = max(0, grid_x)
+        right = min(self.width, grid_x + raster.width)
+        if left >= right:
+            return self
+        src_left, src_right = left - grid_x, right - grid_x
+        drawn = b'\1' * (right - left)
+        # canvas row of the raster's top row
+        top = self.height - grid_y - raster.height
+        rows = raster.as_matrix(inklevels=bytes(range(raster.levels)))
+        for canvas_y, src in enumerate(rows, top):
+            if not 0 <= canvas_y < self.height:
+                continue
+            src = src[src_left:src_right]
+            row = self._pixels[canvas_y]
+            target = row[left:right]
+            if not max(target):
+                # no ink underneath
+                row[left:right] = src
+            elif self.levels == 2:
+                row[left:right] = bytes(map(max, target, src))
+            else:
+                # grayscale will be additive until full-ink level
+                full = self.levels - 1
+                row[left:right] = bytes(
+                    min(full, _t + _s) for _t, _s in zip(target, src)
+                )
+            self._mask[canvas_y][left:right] = drawn
         return self
 
+    def stack(self, other):
+        """Put another canvas below this one, padding with border to equal width."""
+        width = max(self.width, other.width)
+
+        def pad(rows, row_width):
+            return [_row + bytes(width - row_width) for _row in rows]
+
+        # label y coordinates count from the bottom
+        labels = [
+            (_text, _x, _y + other.height, _ralign)
+            for _text, _x, _y, _ralign in self._labels
+        ] + other._labels
+        return type(self)(
+            pad(self._pixels, self.width) + pad(other._pixels, other.width),
+            levels=max(self.levels, other.levels), labels=labels,
+            mask=pad(self._mask, self.width) + pad(other._mask, other.width),
+        )
+
+    def split(self, height):
+        """Split canvas into the top `height` rows and the rest."""
+        rest = self.height - height
+        top = type(self)(
+            self._pixels[:height], levels=self.levels,
+            labels=[
+                (_text, _x, _y - rest, _ralign)
+                for _text, _x, _y, _ralign in self._labels
+                if _y >= rest
+            ],
+            mask=self._mask[:height],
+        )
+        bottom = type(self)(
+            self._pixels[height:], levels=self.levels,
+            labels=[_label for _label in self._labels if _label[2] < rest],
+            mask=self._mask[height:],
+        )
+        return top, bottom
+
     def write(self, text, x, y, right_align=False):
         """Add a text label onto the canvas"""
         self._labels.append((text, x, y, right_align))
@@ -311,13 +582,24 @@ class _Canvas:
         # if unspecified, border is terminal background
         if border is None:
             border = ' '
-        colourdict = {-1: border} | {
-            _i: _v for _i, _v in enumerate(inklevels)
-        }
-        matrix = [
-            [colourdict[_pix] for _pix in _row]
-            for _row in self._pixels
-        ]
+        if all(len(_c) == 1 for _c in inklevels):
+            # one char per pixel: translate whole rows
+            translator = str.maketrans(
+                ''.join(map(chr, range(len(inklevels)))), ''.join(inklevels),
+            )
+            matrix = [
+                list(_row.decode('latin-1').translate(translator))
+                for _row in self._pixels
+            ]
+        else:
+            matrix = [
+                [inklevels[_pix] for _pix in _row]
+                for _row in self._pixels
+            ]
+        # fill in border where nothing was drawn
+        for row, mrow in zip(matrix, self._mask):
+            for match in _UNDRAWN.finditer(mrow):
+                row[match.start():match.end()] = [border] * len(match[0])
         # write out labels
         self._write_labels_to_matrix(matrix)
         # join all text together
@@ -332,15 +614,8 @@ class _Canvas:
             )
         if not self.height:
             return ''
-        # replace background with paper
-        pixels = tuple(
-            tuple(
-                0 if _pix == -1 else _pix
-                for _pix in _row
-            )
-            for _row in self._pixels
-        )
-        block_matrix = matrix_to_blocks(pixels, *resolution)
+        # background is paper
+        block_matrix = matrix_to_blocks(self._pixels, *resolution)
         self._write_labels_to_matrix(block_matrix, resolution=resolution)
         blocks = '\n'.join(''.join(_row) for _row in block_matrix)
         return blockstr(blocks + '\n')
@@ -350,7 +625,7 @@ class _Canvas:
         if not self.height:
             return ''
         block_matrix = matrix_to_shades(
-            self._pixels, inklevels=inklevels, border=border,
+            self._pixels, self._mask, inklevels=inklevels, border=border,
         )
         self._write_labels_to_matrix(block_matrix)
         blocks = '\n'.join(''.join(_row) for _row in block_matrix)
@@ -361,7 +636,7 @@ class _Canvas:
         if not self.height:
             return ''
         sequence = matrix_to_sixel(
-            self._pixels, inklevels=inklevels, border=border,
+            self._pixels, self._mask, inklevels=inklevels, border=border,
         )
         #self._write_labels_to_matrix(block_matrix)
         return blockstr(sequence)
@@ -373,19 +648,21 @@ class _Canvas:
         factor_x: number of times to repeat horizontally
         factor_y: number of times to repeat vertically
         """
-        # vertical stretch
-        pixels = (_row for _row in self._pixels for _ in range(factor_y))
-        # horizontal stretch
-        pixels = [
-            [_col for _col in _row for _ in range(factor_x)]
-            for _row in pixels
-        ]
+        table = _get_stretch_table(factor_x)
+
+        def _stretch(rows):
+            # horizontal stretch
+            if factor_x != 1:
+                rows = (b''.join(map(table.__getitem__, _row)) for _row in rows)
+            # vertical stretch
+            return [bytearray(_row) for _row in rows for _ in range(factor_y)]
+
         # adjust labels
         labels = [
             (_text, _x*factor_x, _y*factor_y, _ralign)
             for _text, _x, _y, _ralign in self._labels
         ]
-        return type(self)(pixels, levels=self.levels, labels=labels)
+        return self._modify(_stretch, labels)
 
     def flip(self):
         """Reverse pixels vertically."""
@@ -394,7 +671,7 @@ class _Canvas:
             (_text, _x, self.height-_y-1, _ralign)
             for _text, _x, _y, _ralign in self._labels
         ]
-        return type(self)(self._pixels[::-1], levels=self.levels, labels=labels)
+        return self._modify(lambda _rows: _rows[::-1], labels)
 
     def mirror(self):
         """Reverse pixels horizontally."""
@@ -403,9 +680,8 @@ class _Canvas:
             (_text, self.width-_x-1, _y, not _ralign)
             for _text, _x, _y, _ralign in self._labels
         ]
-        return type(self)(
-            [_row[::-1] for _row in self._pixels],
-            levels=self.levels, labels=labels
+        return self._modify(
+            lambda _rows: [_row[::-1] for _row in _rows], labels
         )
 
     def transpose(self):
@@ -415,10 +691,12 @@ class _Canvas:
             (_text, _y, _x, _ralign)
             for _text, _x, _y, _ralign in self._labels
         ]
-        return type(self)(
-            [list(_r) for _r in zip(*self._pixels)],
-            levels=self.levels,
-            labels=labels,
-        )
+
+        def _transpose(rows):
+            # take columns as strided slices of the flat buffer
+            flat = b''.join(rows)
+            return [bytearray(flat[_x::self.width]) for _x in range(self.width)]
+
+        return self._modify(_transpose, labels)
 
     turn = turn_method
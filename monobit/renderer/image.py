@@ -40,9 +40,12 @@ IMAGE_MAGIC = (
 )
 
 
-def write_imagefile(outfile, img, image_format):
-    """Write a PIL image to file."""
+def write_imagefile(outfile, img, image_format, append_images=()):
+    """Write a PIL image to file, with further images as extra frames."""
+    # some PIL writers traverse the frames more than once
+    append_images = tuple(append_images)
+    kwargs = dict(save_all=True, append_images=append_images) if append_images else {}
     try:
-        img.save(outfile, format=image_format or None)
+        img.save(outfile, format=image_format or None, **kwargs)
     except (KeyError, ValueError, TypeError) as e:
-        img.save(outfile, format=DEFAULT_IMAGE_FORMAT)
+        img.save(outfile, format=DEFAULT_IMAGE_FORMAT, **kwargs)
@@ -6,6 +6,7 @@ licence: https://opensource.org/licenses/MIT
 """
 
 import logging
+from itertools import chain, groupby
 
 from monobit.base import safe_import
 reportlab = safe_import('reportlab')
@@ -14,7 +15,7 @@ from monobit.base import Coord, RGB
 from monobit.base.binary import ceildiv
 from monobit.core import Font, Codepoint
 from monobit.storage.utils.limitations import ensure_single
-from .createchart import create_chart, aligns_right, charters
+from .createchart import iter_chart_sheets, aligns_right, charters
 from .glyphmap import create_image_colours
 
 
@@ -61,8 +62,8 @@ if reportlab:
         title: title template, using font properties (default: '{name}')
         fill_page: fill out usable space, ignoring pixel aspect ratio (default: False)
         """
-        # construct grid pages
-        glyph_map = create_chart(
+        # construct grid pages one at a time
+        glyph_maps = iter_chart_sheets(
             fonts,
             glyphs_per_line=glyphs_per_line,
             lines_per_page=lines_per_page,
@@ -75,7 +76,9 @@ if reportlab:
             scale=Coord(1, 1),
             max_labels=max_labels,
         )
-        max_sheet, min_x, min_y, max_x, max_y = glyph_map.get_bounds()
+        # all pages have the same bounds
+        first_map = next(glyph_maps)
+        _, min_x, min_y, max_x, max_y = first_map.get_bounds()
         font, *_ = fonts
 
         # assume A4
@@ -136,37 +139,59 @@ if reportlab:
             levels=font.levels, paper=paper, ink=ink,
         )
 
+        if all(_c > 0 for _c in pixel_border):
+            stroke_rgb = tuple(_c / 255 for _c in pixel_border)
+        else:
+            stroke_rgb = None
+        # glyph drawings seen so far and names of form XObjects, by pixels
+        seen = set()
+        forms = {}
+
         # draw pages
-        for sheet in range(max_sheet+1):
+        for glyph_map in chain((first_map,), glyph_maps):
             canvas.setPageSize((page_x, page_y))
             canvas.translate(margin_x, margin_y)
-            canvas.setLineWidth(xpix / 10)
             # text is the height of one glyph pixel
             canvas.setFont('Helvetica', ypix)
 
             # output glyph grid
-            for record in glyph_map.get_sheet(sheet):
-                # draw glyph
-                pixels = record.glyph.as_matrix()
-                for y in range(len(pixels)):
-                    for x in range(len(pixels[y])):
-                        fill_rgb = inklevels[pixels[y][x]]
-                        fill_rgb = tuple(_v/255 for _v in fill_rgb)
-                        if all(_c > 0 for _c in pixel_border):
-                            stroke_rgb = tuple(_c / 255 for _c in pixel_border)
-                        else:
-                            stroke_rgb = fill_rgb
-                        canvas.setStrokeColorRGB(*stroke_rgb)
-                        canvas.setFillColorRGB(*fill_rgb)
-                        canvas.rect(
-                            (record.x + x) * xpix,
-                            (record.y + record.glyph.height - y - 1) * ypix,
-                            xpix, ypix,
-                            fill=True,
+            for record in glyph_map.get_sheet():
+                glyph = record.glyph
+                if not glyph.width or not glyph.height:
+                    continue
+                pixels = glyph.as_matrix()
+                canvas.saveState()
+                # draw in units of glyph pixels
+                canvas.translate(record.x * xpix, record.y * ypix)
+                canvas.scale(xpix, ypix)
+                # reuse the drawing for repeated glyphs
+                key = glyph.width, bytes(chain.from_iterable(pixels))
+                if key in forms:
+                    canvas.doForm(forms[key])
+                elif key in seen:
+                    forms[key] = f'glyph{len(forms)}'
+                    _define_form(
+                        canvas, forms[key], glyph.width, glyph.height,
+                        _draw_runs, pixels, inklevels, stroke_rgb,
+                    )
+                    canvas.doForm(forms[key])
+                else:
+                    seen.add(key)
+                    _draw_runs(canvas, pixels, inklevels, stroke_rgb)
+                # glyph cells have the same pixel grid
+                if stroke_rgb is not None:
+                    key = glyph.width, glyph.height
+                    if key not in forms:
+                        forms[key] = f'grid{len(forms)}'
+                        _define_form(
+                            canvas, forms[key], glyph.width, glyph.height,
+                            _draw_grid, glyph.width, glyph.height, stroke_rgb,
                         )
-                        canvas.setFillColorRGB(0, 0, 0)
+                    canvas.doForm(forms[key])
+                canvas.restoreState()
             canvas.setStrokeColorRGB(0, 0, 0)
-            for label in glyph_map.get_sheet_labels(sheet):
+            canvas.setFillColorRGB(0, 0, 0)
+            for label in glyph_map.get_sheet_labels():
                 # draw label
                 if label.right_align:
                     canvas.drawRightString(label.x*xpix, label.y*ypix, label.text)
@@ -174,3 +199,48 @@ if reportlab:
                     canvas.drawString(label.x*xpix, label.y*ypix, label.text)
             canvas.showPage()
         canvas.save()
+
+
+def _define_form(canvas, name, width, height, draw_func, *args):
+    """Define a form XObject in pixel units, origin at bottom left."""
+    # leave room for the line width
+    canvas.beginForm(name, -0.1, -0.1, width + 0.1, height + 0.1)
+    draw_func(canvas, *args)
+    canvas.endForm()
+
+
+def _draw_runs(canvas, pixels, inklevels, stroke_rgb):
+    """
+    Draw glyph pixels in pixel units.
+    Horizontal runs of equal ink level are merged into one rectangle
+    and all rectangles of a given ink level are filled as one path.
+    """
+    height = len(pixels)
+    runs = {}
+    for y, row in enumerate(pixels):
+        x = 0
+        for level, run in groupby(row):
+            run_width = len(tuple(run))
+            runs.setdefault(level, []).append((x, height - y - 1, run_width))
+            x += run_width
+    canvas.setLineWidth(0.1)
+    for level, level_runs in runs.items():
+        fill_rgb = tuple(_v/255 for _v in inklevels[level])
+        canvas.setFillColorRGB(*fill_rgb)
+        if stroke_rgb is None:
+            # without a pixel grid, stroke in the fill colour
+            canvas.setStrokeColorRGB(*fill_rgb)
+        path = canvas.beginPath()
+        for x, y, run_width in level_runs:
+            path.rect(x, y, run_width, 1)
+        canvas.drawPath(path, fill=True, stroke=stroke_rgb is None)
+
+
+def _draw_grid(canvas, width, height, stroke_rgb):
+    """Draw pixel grid of a glyph cell as a single path, in pixel units."""
+    canvas.setLineWidth(0.1)
+    canvas.setStrokeColorRGB(*stroke_rgb)
+    canvas.lines(
+        tuple((0, _y, width, _y) for _y in range(height + 1))
+        + tuple((_x, 0, _x, height) for _x in range(width + 1))
+    )
@@ -7,6 +7,9 @@ licence: https://opensource.org/licenses/MIT
 
 import logging
 import codecs
+from functools import lru_cache
+from itertools import islice, chain
+from collections import OrderedDict
 from unicodedata import bidirectional, normalize, category, combining
 
 from monobit.base import safe_import
@@ -264,49 +267,205 @@ if Image:
 ###############################################################################
 # text rendering
 
+# rendering hints used by glyph effects
+# these are calculated on the whole font so that effects do not depend on the text
+_EFFECT_HINTS = (
+    'bold_smear', 'italic_pitch', 'outline_thickness',
+    'underline_thickness', 'underline_descent',
+    'strikethrough_thickness', 'strikethrough_ascent',
+)
+
+
+class Renderer:
+    """Text renderer bound to a font, reusing prepared glyphs across calls."""
+
+    def __init__(
+            self, font, *, missing='default', transformations=(),
+            cache_size=4096,
+        ):
+        """
+        Set up renderer for a font.
+
+        font: font to render text with
+        missing: what to use for missing glyphs: 'default', 'space', 'empty' or 'raise'
+        transformations: sequence of (function, args, kwargs) to apply to the font's glyphs
+        cache_size: maximum number of prepared glyphs and kerning pairs to keep
+        """
+        self.font = font
+        self._missing = missing
+        self._transformations = tuple(transformations)
+        if self._transformations:
+            self._effect_font = font.modify(
+                glyphs=(),
+                **{_k: getattr(font, _k) for _k in _EFFECT_HINTS}
+            )
+        # prepared glyphs by label, least recently used first
+        # a per-instance dict avoids a reference cycle through a bound method
+        self._glyphs = OrderedDict()
+        self._cache_size = cache_size
+        self._get_kerning = lru_cache(maxsize=cache_size)(_get_kerning)
+
+    def _get_glyph(self, label):
+        """Get prepared glyph for label, keeping recently used glyphs."""
+        glyphs = self._glyphs
+        try:
+            glyphs.move_to_end(label)
+            return glyphs[label]
+        except KeyError:
+            pass
+        glyph = self._prepare_glyph(label)
+        glyphs[label] = glyph
+        while len(glyphs) > self._cache_size:
+            glyphs.popitem(last=False)
+        return glyph
+
+    def _prepare_glyph(self, label):
+        """Get glyph for label, transformed and reduced for rendering."""
+        glyph = self.font.get_glyph(label, missing=self._missing)
+        if self._transformations:
+            rfont = self._effect_font.modify((glyph,))
+            for func, args, kwargs in self._transformations:
+                rfont = func(rfont, *args, **kwargs)
+            glyph = rfont.glyphs[0]
+        # reduce all glyphs to avoid creating overwide margins
+        return glyph.reduce(create_vertical_metrics=True)
+
+    def render(
+            self, text, *, raw=False, margin=None, adjust_bearings=0,
+            direction='', align='',
+        ):
+        """Render text string to glyph map."""
+        font = self.font
+        if raw:
+            # convert from str to bytes if needed
+            text = as_raw_bytes(text, font.get_default_glyph())
+        direction, line_direction, base_direction, align = _get_direction(
+            font, text, direction, align
+        )
+        # get glyph rows for rendering (tuple of tuples)
+        glyphs = tuple(
+            tuple(self._get_glyph(_label) for _label in _row)
+            for _row in _get_text_labels(
+                font, text, direction, line_direction, base_direction
+            )
+        )
+        if direction in ('top-to-bottom', 'bottom-to-top'):
+            _render_func = _render_vertical
+            min_margin = 0, _adjust_margins_vertical(glyphs)
+        else:
+            _render_func = _render_horizontal
+            min_margin = _adjust_margins_horizontal(glyphs), 0
+        margin_x, margin_y = margin or min_margin
+        glyph_map = _render_func(
+            font, glyphs, margin_x, margin_y, align, adjust_bearings,
+            get_kerning=self._get_kerning,
+        )
+        return glyph_map
+
+    def iter_render(
+            self, lines, *, raw=False, margin=None, adjust_bearings=0,
+            direction='', align='', band_size=64,
+        ):
+        """
+        Render lines of text in bands, yielding a glyph map per band.
+        Each band is as wide as its own lines. Only horizontal text with
+        lines running top to bottom is rendered in bands; otherwise,
+        the whole text is rendered as one glyph map.
+
+        lines: iterable over lines of text, e.g. a text stream
+        band_size: number of lines of text per band (default: 64)
+        """
+        font = self.font
+        lines = (_line.rstrip('\r\n') for _line in lines)
+        bands = _iter_bands(lines, band_size)
+        band = next(bands, None)
+        if band is None:
+            return
+        # we need the text to determine the direction
+        text = _join_lines(band)
+        if raw:
+            text = as_raw_bytes(text, font.get_default_glyph())
+        _direction, line_direction, _, _ = _get_direction(
+            font, text, direction, align
+        )
+        if (
+                _direction in ('top-to-bottom', 'bottom-to-top')
+                or line_direction != 'top-to-bottom'
+            ):
+            yield self.render(
+                _join_lines(chain(band, *bands)),
+                raw=raw, margin=margin, adjust_bearings=adjust_bearings,
+                direction=direction, align=align,
+            )
+            return
+        margin_x, margin_y = margin or (None, 0)
+        first = True
+        while band is not None:
+            next_band = next(bands, None)
+            text = _join_lines(band)
+            if raw:
+                text = as_raw_bytes(text, font.get_default_glyph())
+            band_direction, line_direction, base_direction, band_align = (
+                _get_direction(font, text, direction, align)
+            )
+            glyphs = tuple(
+                tuple(self._get_glyph(_label) for _label in _row)
+                for _row in _get_text_labels(
+                    font, text, band_direction, line_direction, base_direction
+                )
+            )
+            if margin_x is None:
+                band_margin_x = _adjust_margins_horizontal(glyphs)
+            else:
+                band_margin_x = margin_x
+            margin_top = margin_y if first else 0
+            glyph_map = _render_horizontal(
+                font, glyphs, band_margin_x, margin_top,
+                band_align, adjust_bearings,
+                get_kerning=self._get_kerning,
+                margin_bottom=margin_y if next_band is None else 0,
+            )
+            # bands meet at the descent line of the last line of text
+            # glyphs extending beyond that line are clipped
+            if not first:
+                glyph_map.set_bounds(max_y=font.line_height - font.descent - font.ascent)
+            if next_band is not None:
+                glyph_map.set_bounds(
+                    min_y=-margin_top - font.ascent - font.descent
+                    - (len(glyphs) - 1) * font.line_height
+                )
+            yield glyph_map
+            band, first = next_band, False
+
+
 def render_text(
         font, text, *, raw=False, margin=None, adjust_bearings=0,
         direction='', align='',
         missing='default', transformations=(),
     ):
     """Render text string to bitmap."""
-    if raw:
-        # convert from str to bytes if needed
-        text = as_raw_bytes(text, font.get_default_glyph())
-    direction, line_direction, base_direction, align = _get_direction(
-        font, text, direction, align
+    renderer = Renderer(
+        font, missing=missing, transformations=transformations,
     )
-    # get glyph rows for rendering (tuple of tuples)
-    glyphs = _get_text_glyphs(
-        font, text, direction, line_direction, base_direction, missing
+    return renderer.render(
+        text, raw=raw, margin=margin, adjust_bearings=adjust_bearings,
+        direction=direction, align=align,
     )
-    # subset font to glyphs needed only
-    if transformations:
-        rfont = font.modify(_g for _row in glyphs for _g in _row)
-        # apply transformations to subsetted font
-        # note we keep the original font as implied line metrics can differ
-        for func, args, kwargs in transformations:
-            rfont = func(rfont, *args, **kwargs)
-        # get glyph rows again, from transformed font
-        glyphs = _get_text_glyphs(
-            rfont, text, direction, line_direction, base_direction, missing
-        )
-    # reduce all glyphs to avoid creating overwide margins
-    glyphs = tuple(
-        tuple(_g.reduce(create_vertical_metrics=True) for _g in _row)
-        for _row in glyphs
-    )
-    if direction in ('top-to-bottom', 'bottom-to-top'):
-        _render_func = _render_vertical
-        min_margin = 0, _adjust_margins_vertical(glyphs)
-    else:
-        _render_func = _render_horizontal
-        min_margin = _adjust_margins_horizontal(glyphs), 0
-    margin_x, margin_y = margin or min_margin
-    glyph_map = _render_func(
-        font, glyphs, margin_x, margin_y, align, adjust_bearings
-    )
-    return glyph_map
+
+def _iter_bands(lines, band_size):
+    """Group lines into bands of at most band_size lines."""
+    lines = iter(lines)
+    while True:
+        band = tuple(islice(lines, band_size))
+        if not band:
+            return
+        yield band
+
+
+def _join_lines(lines):
+    """Join lines into text, keeping empty last lines."""
+    return ''.join(f'{_line}\n' for _line in lines)
+
 
 def _adjust_margins_horizontal(glyphs):
     """Ensure margins are wide enough for any negative bearings."""
@@ -327,10 +486,21 @@ def _adjust_margins_vertical(glyphs):
     return -min(0, min_top, min_bottom)
 
 
+def _get_kerning(prev, glyph):
+    """Get pairwise kerning adjustment between two glyphs."""
+    return (
+        round(prev.right_kerning.get_for_glyph(glyph))
+        + round(glyph.left_kerning.get_for_glyph(prev))
+    )
+
+
 def _render_horizontal(
-        font, glyphs, margin_x, margin_y, align, adjust_bearings
+        font, glyphs, margin_x, margin_y, align, adjust_bearings,
+        get_kerning=_get_kerning, margin_bottom=None,
     ):
     """Render text horizontally."""
+    if margin_bottom is None:
+        margin_bottom = margin_y
     # descent-line of the bottom-most row is at bottom margin
     # if a glyph extends below the descent line or left of the origin,
     # it may draw into the margin
@@ -346,8 +516,7 @@ def _render_horizontal(
             # adjust origin for kerning
             if count:
                 x += adjust_bearings
-                x += round(prev.right_kerning.get_for_glyph(glyph))
-                x += round(glyph.left_kerning.get_for_glyph(prev))
+                x += get_kerning(prev, glyph)
             prev = glyph
             # offset + (x, y) is the coordinate of glyph matrix origin
             grid_x.append(glyph.left_bearing + x)
@@ -360,7 +529,8 @@ def _render_horizontal(
             start = margin_x
         # append empty glyph at start and end for margins
         glyph_map.append_glyph(
-            Glyph(), start+x+margin_x, baseline-font.descent-margin_y, sheet=0,
+            Glyph(), start+x+margin_x, baseline-font.descent-margin_bottom,
+            sheet=0,
         )
         for glyph, x, y in zip(glyph_row, grid_x, grid_y):
             glyph_map.append_glyph(glyph, start+x, y, sheet=0)
@@ -370,7 +540,8 @@ def _render_horizontal(
 
 
 def _render_vertical(
-        font, glyphs, margin_x, margin_y, align, adjust_bearings
+        font, glyphs, margin_x, margin_y, align, adjust_bearings,
+        get_kerning=_get_kerning,
     ):
     """Render text vertically."""
     # central axis (with leftward bias)
@@ -450,7 +621,7 @@ def _get_direction(font, text, direction, align):
             raise ValueError(
                 f'Writing direction `{direction}` only supported for Unicode text.'
             )
-        bidi_cats = {bidirectional(_c) for _c in text}
+        bidi_cats = set(map(bidirectional, set(text)))
         logging.debug('Bidirectional categories: %s', bidi_cats)
         require_bidi = {
             # strong right-to-left
@@ -490,14 +661,13 @@ def _get_direction(font, text, direction, align):
     return direction, line_direction, base_direction, align
 
 
-def _get_text_glyphs(
+def _get_text_labels(
         font, text,
         direction, line_direction, base_direction,
-        missing='raise'
     ):
     """
-    Get tuple of tuples of glyphs (by line) from str or bytes/codepoints input.
-    Glyphs are reordered so that they can be rendered ltr ttb or ttb ltr
+    Get tuple of tuples of labels (by line) from str or bytes/codepoints input.
+    Labels are reordered so that they can be rendered ltr ttb or ttb ltr
     """
     if isinstance(text, str) and direction not in ('top-to-bottom', 'bottom-to-top'):
         # check common Arabic range - is there anything to reshape?
@@ -522,65 +692,62 @@ def _get_text_glyphs(
         # reverse line order for rendering
         lines = lines[::-1]
     return tuple(
-        tuple(_iter_labels(font, _line, missing))
+        tuple(_iter_labels(font, _line))
         for _line in lines
     )
 
 
-def _iter_labels(font, text, missing='raise'):
-    """Iterate over labels in text, yielding glyphs. text may be str or bytes."""
+if graphemecluster:
+    _grapheme_clusters = graphemecluster.grapheme_clusters
+else:
+    def _grapheme_clusters(text):
+        """Use NFC as poor-man's grapheme cluster. This works... sometimes."""
+        for c in normalize('NFC', text):
+            yield c
+
+def _split_graphemes(text):
+    """Split text into standard grapheme clusters."""
+    return tuple(_grapheme_clusters(text))
+
+
+def _iter_labels(font, text):
+    """Iterate over glyph labels in text. text may be str or bytes."""
     if isinstance(text, str):
-        labelset = font.get_chars()
-        combining_classes = {combining(_c) for _c in text}
+        labeltype = Char
+        combining_classes = set(map(combining, set(text)))
         if combining_classes == {0}:
-            max_length = max((len(tuple(_c)) for _c in labelset), default=0)
+            split = tuple
         else:
-            if graphemecluster:
-                grapheme_clusters = graphemecluster.grapheme_clusters
-            else:
-                # Use NFC as poor-man's grapheme cluster. This works... sometimes.
-                def grapheme_clusters(text):
-                    for c in normalize('NFC', text):
-                        yield c
-            # split text into standard grapheme clusters
-            text = tuple(grapheme_clusters(text))
-            # find the longest *number of standard grapheme clusters* per label
+            # match labels by number of standard grapheme clusters
             # this will often be 1, except when the font has defined e.g. Zł or Ft
             # as a char label for a single glyph
-            max_length = max((len(tuple(grapheme_clusters(_c))) for _c in labelset), default=0)
-        # we need to combine multiple elements back into str to match a glyph
-        def labeltype(seq):
-            return Char(''.join(seq))
+            split = _split_graphemes
+            text = split(text)
     else:
-        labelset = font.get_codepoints()
         labeltype = Codepoint
-        max_length = max((len(_c) for _c in labelset), default=0)
-    remaining = text
-    while remaining:
+        split = tuple
+    # what about combining chars?
+    # - For str text, we iterate over grapheme clusters already,
+    #   so we really only want multi-grapheme cluster clusters
+    #   if they're actually defined in the font. Note that grapheme clusters
+    #   may well be realised through combining glyphs.
+    # - For bytes, we'll do the same. So there is no auto-combining glyphs
+    #   in bytes-based fonts, they have to be provided as MBCS in the font.
+    trie = font.get_label_trie(labeltype, split)
+    index = 0
+    while index < len(text):
         # try multibyte/multi-grapheme cluster clusters first
-        for try_len in range(max_length, 1, -1):
-            label = labeltype(remaining[:try_len])
-            # what about combining chars?
-            # - For str text, we iterate over grapheme clusters already,
-            #   so we really only want multi-grapheme cluster clusters
-            #   if they're actually defined in the font. Note that grapheme clusters
-            #   may well be realised through combining glyphs.
-            # - For bytes, we'll do the same. So there is no auto-combining glyphs
-            #   in bytes-based fonts, they have to be provided as MBCS in the font.
-            if try_len > 1 and label not in labelset:
-                continue
-            try:
-                # convert to explicit label type,
-                # avoids matching tags as well as chars
-                yield font.get_glyph(label, missing='raise')
-            except KeyError:
-                pass
+        length, label = trie.match(text, index)
+        if not length:
+            # explicit label type avoids matching tags as well as chars
+            # we need to combine multiple elements back into str to match a glyph
+            length = 1
+            if labeltype is Char:
+                label = Char(''.join(text[index:index+1]))
             else:
-                remaining = remaining[try_len:]
-                break
-        else:
-            yield font.get_glyph(labeltype(remaining[:1]), missing=missing)
-            remaining = remaining[1:]
+                label = Codepoint(text[index:index+1])
+        yield label
+        index += length
 
 
 def as_raw_bytes(text, default):
@@ -5,51 +5,84 @@ monobit.renderer.sixel - output pixels to terminal through sixel escape codes
 licence: https://opensource.org/licenses/MIT
 """
 
+import re
 import logging
-from itertools import zip_longest
 
-from .blocks import bit_block_rows
+from .blocks import pack_rows
 
 
-def bits_to_sixel(bits):
-    """Convert six bits to sixel character."""
-    bits = ''.join(str(int(_b)) for _b in bits)
-    byte = int(bits[::-1], base=2)
-    return chr(ord('?') + byte)
+# sixel characters indexed by packed bits, top to bottom
+_SIXEL_TABLE = bytes(range(ord('?'), ord('?') + 64)).ljust(256, b'?')
 
+# a run of four or more sixels is shorter as a repeat introducer
+_REPEATS = re.compile(r'(.)\1{3,}')
 
-def matrix_to_sixel(matrix, *, inklevels, border):
-    """Convert bit matrix to sixel/characters."""
-    # use fillvalue=-2, so any pixels added to fit sixel rows aren't painted
-    bitblockrows = bit_block_rows(matrix, nrows=6, ncols=1, fillvalue=-2)
-    sixel_matrices = []
-    colour_defs = []
+# end of sixel sequence
+SIXEL_END = '\x1b\\'
+
+
+def _get_colours(inklevels, border):
+    """Get pairs of matrix value and colour; border is -1."""
     # if border not specified, leave uncoloured (terminal background)
     if border is not None:
-        iterator = enumerate((border, *inklevels), -1)
-    else:
-        iterator = enumerate(inklevels)
-    for level, (r, g, b) in iterator:
-        colour_defs.append((r, g, b))
-        sixel_matrices.append([
-            ''.join(
-                bits_to_sixel(_b == level for _b in _bitblock)
-                for _bitblock in _row
-            )
-            for _row in bitblockrows
-        ])
-    # output colour definitions first
-    seq = [
-        f'#{level};2;{(r*100)//255};{(g*100)//255};{(b*100)//255};'
-        for level, (r, g, b) in enumerate(colour_defs)
-    ]
-    # then output sixel rows
-    for sixel_rows in zip(*sixel_matrices):
-        seq.append(
+        return tuple(enumerate((border, *inklevels), -1))
+    return tuple(enumerate(inklevels))
+
+
+def sixel_header(*, inklevels, border):
+    """Start of sixel sequence, with colour definitions."""
+    return '\x1bPq' + ''.join(
+        f'#{_index};2;{(r*100)//255};{(g*100)//255};{(b*100)//255};'
+        for _index, (_, (r, g, b)) in enumerate(_get_colours(inklevels, border))
+    )
+
+
+def _level_table(level):
+    """Translation table setting given ink level to 1 and all others to 0."""
+    return bytes(_v == level for _v in range(256))
+
+
+def _compress(sixels):
+    """Run-length encode a row of sixels."""
+    return _REPEATS.sub(lambda _m: f'!{len(_m[0])}{_m[1]}', sixels)
+
+
+def matrix_to_sixel_rows(matrix, mask, *, inklevels, border):
+    """
+    Convert matrix of ink levels to sixel rows, without start and end of sequence.
+
+    mask: rows of 0 for border and 1 where drawn
+    """
+    levels = tuple(_level for _level, _ in _get_colours(inklevels, border))
+    tables = {_level: _level_table(_level) for _level in levels}
+    width = max(map(len, matrix), default=0)
+    sixel_rows = []
+    for top in range(0, len(matrix), 6):
+        rows = matrix[top:top+6]
+        mrows = mask[top:top+6]
+        drawn = pack_rows(mrows)
+        colour_rows = []
+        for level in levels:
+            if level < 0:
+                # border is where nothing was drawn, i.e. the mask is 0
+                bits = pack_rows(_mrow.translate(tables[0]) for _mrow in mrows)
+            else:
+                bits = drawn & pack_rows(_row.translate(tables[level]) for _row in rows)
+            sixels = bits.to_bytes(width, 'little').translate(_SIXEL_TABLE)
+            colour_rows.append(_compress(sixels.decode('ascii')))
+        sixel_rows.append(
             '$'.join(
-                f'#{_level}'
-                + ''.join(_row) for _level, _row in enumerate(sixel_rows)
+                f'#{_index}{_row}' for _index, _row in enumerate(colour_rows)
             )
             + '-'
         )
-    return '\x1bPq' + ''.join(seq) + '\x1b\\'
+    return ''.join(sixel_rows)
+
+
+def matrix_to_sixel(matrix, mask, *, inklevels, border):
+    """Convert matrix of ink levels to a sixel sequence."""
+    return ''.join((
+        sixel_header(inklevels=inklevels, border=border),
+        matrix_to_sixel_rows(matrix, mask, inklevels=inklevels, border=border),
+        SIXEL_END,
+    ))
@@ -5,6 +5,7 @@ Print a banner using a bitmap font
 
 import sys
 import argparse
+from itertools import chain
 import logging
 import pickle
 from importlib.resources import open_text
@@ -15,7 +16,7 @@ platformdirs = safe_import('platformdirs')
 import monobit
 from monobit.plumbing import wrap_main, unescape
 from monobit.base import Coord, RGB
-from monobit.renderer import render_text
+from monobit.renderer import Renderer, GlyphMapStream
 from monobit.core import Font
 
 
@@ -26,10 +27,30 @@ else:
     CACHEPATH = ''
     DEFAULT_CACHE = ''
 
+# render standard input in bands of lines if it is at least this long
+STREAM_THRESHOLD = 1 << 16
 
-def main():
-    # parse command line
-    parser = argparse.ArgumentParser()
+# local address for the render server
+DEFAULT_ADDRESS = 'localhost:8745'
+
+
+def _iter_lines(head, stream):
+    """Iterate over lines of a stream of which the head has already been read."""
+    yield from (head + stream.readline()).splitlines()
+    yield from stream
+
+
+def _transform(glyph_maps, scale, rotate):
+    """Stretch and turn glyph maps."""
+    for glyph_map in glyph_maps:
+        glyph_map.stretch(*scale)
+        glyph_map.turn(clockwise=rotate)
+        yield glyph_map
+
+
+def _get_parser(parser_class=argparse.ArgumentParser):
+    """Build command-line parser."""
+    parser = parser_class()
     parser.add_argument(
         'text', nargs='*', type=str, action='extend',
         help=(
@@ -175,115 +196,208 @@ def main():
             'wider (positive) or tighter (negative)'
         )
     )
-    args = parser.parse_args()
+    # render server
+    parser.add_argument(
+        '--serve', nargs='?', const=DEFAULT_ADDRESS, default='', metavar='ADDRESS',
+        help=(
+            'run as a render server on the given local address '
+            f'(default: {DEFAULT_ADDRESS}), keeping fonts loaded between requests'
+        )
+    )
+    parser.add_argument(
+        '--server', default='', metavar='ADDRESS',
+        help='send the rendering request to a server started with --serve'
+    )
+    return parser
+
+
+def _unescape_args(args):
+    """Unescape text and foreground and background characters."""
+    args.ink = unescape(args.ink)
+    args.paper = unescape(args.paper)
+    args.border = unescape(args.border)
+    args.text = unescape(args.text)
+    args.inklevels = unescape(args.inklevels)
+
+
+def _is_image(args):
+    """Output is an image rather than text."""
+    return args.image or args.output and not args.output.endswith('.txt')
+
+
+def _load_font(font, format, set_default):
+    """
+    Load font file, or the default font if not given.
+    Returns the font and whether it should be stored as default.
+    """
+    if font:
+        # take first font from pack
+        font, *_ = monobit.load(font, format=format)
+        return font, set_default
+    font = None
+    if not set_default and DEFAULT_CACHE:
+        try:
+            with open(DEFAULT_CACHE, 'rb') as f:
+                font = pickle.load(f)
+        except Exception:
+            font = None
+    if font is None:
+        fontfile = open_text('monobit.resources', 'unscii-16.yaff.gz')
+        font, *_ = monobit.load(fontfile, format='yaff')
+        set_default = True
+    return font, set_default
+
+
+def _set_encoding(font, encoding, text=''):
+    """Override the font encoding if requested; returns font and encoding."""
+    # check if any characters are defined
+    if (
+            not font.get_chars()
+            and not encoding
+            and not isinstance(text, bytes)
+        ):
+        logging.info(
+            'No character mapping defined in font. '
+            'Using `--encoding=raw` as fallback.'
+        )
+        encoding = 'raw'
+    if encoding and encoding != 'raw':
+        font = font.modify(encoding=encoding).label()
+    return font, encoding
+
+
+def _create_renderer(font, *, bold, italic, underline, outline):
+    """Create renderer applying the requested effects."""
+    # these use default arguments as defined by rendering hints
+    transformations  = []
+    if bold:
+        transformations.append((Font.smear, (), {}))
+    if italic:
+        transformations.append((Font.shear, (), {}))
+    if underline:
+        transformations.append((Font.underline, (), {}))
+    if outline:
+        transformations.append((Font.outline, (), {}))
+    return Renderer(font, missing='default', transformations=transformations)
+
+
+def _render(renderer, args, lines=None):
+    """Render text or lines to glyph maps and apply transformations."""
+    render_args = dict(
+        raw=args.encoding=='raw',
+        margin=args.margin,
+        direction=args.direction, align=args.align, adjust_bearings=args.expand,
+    )
+    if lines is None:
+        glyph_maps = (renderer.render(args.text, **render_args),)
+    else:
+        glyph_maps = renderer.iter_render(lines, **render_args)
+    return _transform(glyph_maps, args.scale, args.rotate)
+
+
+def _get_image(glyph_maps, args):
+    """Convert rendered glyph map to image."""
+    glyph_map, = glyph_maps
+    ink = RGB.create(args.ink or (0, 0, 0))
+    paper = RGB.create(args.paper or (255, 255, 255))
+    border = RGB.create(args.border) if args.border else paper
+    return glyph_map.as_image(paper=paper, ink=ink, border=border)
+
+
+def _iter_output(glyph_maps, args):
+    """Convert rendered glyph maps to text output, chunk by chunk."""
+    stream = GlyphMapStream(glyph_maps)
+    if args.blocks:
+        resolution = tuple(int(_v) for _v in args.blocks.split('x'))
+        return stream.iter_blocks(resolution)
+    elif args.shades:
+        ink = RGB.create(args.ink or (255, 255, 255))
+        paper = RGB.create(args.paper or (0, 0, 0))
+        border = RGB.create(args.border) if args.border else paper
+        return stream.iter_shades(paper=paper, ink=ink, border=border)
+    elif args.sixel:
+        ink = RGB.create(args.ink or (255, 255, 255))
+        paper = RGB.create(args.paper or (0, 0, 0))
+        border = RGB.create(args.border) if args.border else paper
+        return stream.iter_sixel(paper=paper, ink=ink, border=border)
+    ink = args.ink or '#'
+    paper = args.paper or '\xa0'
+    inklevels = args.inklevels or (paper, ink)
+    border = args.border or paper
+    return chain(stream.iter_text(inklevels=inklevels, border=border), '\n')
+
+
+def main():
+    # parse command line
+    args = _get_parser().parse_args()
 
     with wrap_main(args.debug):
+        if args.serve:
+            from .banner_server import serve
+            serve(args.serve)
+            return
         #######################################################################
         # deal with inputs
+        as_image = _is_image(args)
         # read text from stdin if not supplied
+        lines = None
         if not args.text:
-            args.text = sys.stdin.read()
+            args.text = sys.stdin.read(STREAM_THRESHOLD)
+            if len(args.text) == STREAM_THRESHOLD:
+                if as_image or args.rotate % 4 or args.server:
+                    args.text += sys.stdin.read()
+                else:
+                    # render large input in bands of lines as it comes in
+                    lines = (
+                        unescape(_line)
+                        for _line in _iter_lines(args.text, sys.stdin)
+                    )
+            text = args.text
         else:
+            # text is taken from the arguments
+            text = None
             # multiple options or \n give line breaks
             args.text = '\n'.join(args.text)
-        # foreground and backgound characters
-        args.ink = unescape(args.ink)
-        args.paper = unescape(args.paper)
-        args.border = unescape(args.border)
-        args.text = unescape(args.text)
-        args.inklevels = unescape(args.inklevels)
+        if args.server:
+            # leave rendering to the server
+            from .banner_server import request_banner
+            output = request_banner(sys.argv[1:], text, address=args.server)
+            if args.output:
+                with open(args.output, 'wb') as outfile:
+                    outfile.write(output)
+            else:
+                sys.stdout.buffer.write(output)
+            return
+        _unescape_args(args)
         #######################################################################
-        if args.font:
-            # take first font from pack
-            font, *_ = monobit.load(args.font, format=args.format)
-        elif args.set_default:
-            font = None
-        elif DEFAULT_CACHE:
-            try:
-                with open(DEFAULT_CACHE, 'rb') as f:
-                    font = pickle.load(f)
-            except Exception:
-                font = None
-        if font is None:
-            fontfile = open_text('monobit.resources', 'unscii-16.yaff.gz')
-            font, *_ = monobit.load(fontfile, format='yaff')
-            args.set_default = True
+        font, args.set_default = _load_font(args.font, args.format, args.set_default)
         #######################################################################
         # encoding
-        # check if any characters are defined
-        # override encoding if requested
-        if (
-                not font.get_chars()
-                and not args.encoding
-                and not isinstance(args.text, bytes)
-            ):
-            logging.info(
-                'No character mapping defined in font. '
-                'Using `--encoding=raw` as fallback.'
-            )
-            args.encoding = 'raw'
-        if args.encoding and args.encoding != 'raw':
-            font = font.modify(encoding=args.encoding).label()
+        font, args.encoding = _set_encoding(font, args.encoding, args.text)
         #######################################################################
         # line up effects
-        # these use default arguments as defined by rendering hints
-        transformations  = []
-        if args.bold:
-            transformations.append((Font.smear, (), {}))
-        if args.italic:
-            transformations.append((Font.shear, (), {}))
-        if args.underline:
-            transformations.append((Font.underline, (), {}))
-        if args.outline:
-            transformations.append((Font.outline, (), {}))
+        renderer = _create_renderer(
+            font, bold=args.bold, italic=args.italic,
+            underline=args.underline, outline=args.outline,
+        )
         #######################################################################
         # render
-        glyph_map = render_text(
-            font, args.text, raw=args.encoding=='raw',
-            margin=args.margin,
-            direction=args.direction, align=args.align, adjust_bearings=args.expand,
-            missing='default',
-            transformations=transformations,
-        )
-        # transformations
-        glyph_map.stretch(*args.scale)
-        glyph_map.turn(clockwise=args.rotate)
+        glyph_maps = _render(renderer, args, lines)
         #######################################################################
         # output
-        if args.image or args.output and not args.output.endswith('.txt'):
-            ink = RGB.create(args.ink or (0, 0, 0))
-            paper = RGB.create(args.paper or (255, 255, 255))
-            border = RGB.create(args.border) if args.border else paper
-            image = glyph_map.as_image(paper=paper, ink=ink, border=border)
+        if as_image:
+            image = _get_image(glyph_maps, args)
             if args.output:
                 image.save(args.output)
             else:
                 image.show()
         else:
-            if args.blocks:
-                resolution = tuple(int(_v) for _v in args.blocks.split('x'))
-                text = glyph_map.as_blocks(resolution)
-            elif args.shades:
-                ink = RGB.create(args.ink or (255, 255, 255))
-                paper = RGB.create(args.paper or (0, 0, 0))
-                border = RGB.create(args.border) if args.border else paper
-                text = glyph_map.as_shades(paper=paper, ink=ink, border=border)
-            elif args.sixel:
-                ink = RGB.create(args.ink or (255, 255, 255))
-                paper = RGB.create(args.paper or (0, 0, 0))
-                border = RGB.create(args.border) if args.border else paper
-                text = glyph_map.as_sixel(paper=paper, ink=ink, border=border)
-            else:
-                ink = args.ink or '#'
-                paper = args.paper or '\xa0'
-                inklevels = args.inklevels or (paper, ink)
-                border = args.border or paper
-                text = glyph_map.as_text(inklevels=inklevels, border=border) + '\n'
+            chunks = _iter_output(glyph_maps, args)
             if not args.output:
-                sys.stdout.write(text)
+                sys.stdout.writelines(chunks)
             else:
                 with open(args.output, 'w') as outfile:
-                    outfile.write(text)
+                    outfile.writelines(chunks)
             if args.set_default and DEFAULT_CACHE:
                 try:
                     DEFAULT_CACHE.parent.mkdir(parents=True, exist_ok=True)
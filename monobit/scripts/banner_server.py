@@ -0,0 +1,192 @@
+"""
+monobit.scripts.banner_server - render banners from a long-running local process
+
+(c) 2026 Rob Hagemans
+licence: https://opensource.org/licenses/MIT
+"""
+
+import io
+import os
+import json
+import socket
+import logging
+import argparse
+import ipaddress
+from pathlib import Path
+from functools import lru_cache
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+from monobit.renderer import write_imagefile
+from .banner import (
+    DEFAULT_ADDRESS,
+    _get_parser, _unescape_args, _is_image, _load_font, _set_encoding,
+    _create_renderer, _render, _get_image, _iter_output,
+)
+
+
+# number of fonts and renderers to keep loaded
+POOL_SIZE = 16
+
+# effect options that need a separate renderer
+_EFFECTS = ('bold', 'italic', 'underline', 'outline')
+
+
+class _RequestParser(argparse.ArgumentParser):
+    """Command-line parser that raises errors rather than exiting."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+    def exit(self, status=0, message=None):
+        raise ValueError(message or 'Invalid request.')
+
+
+class RenderPool:
+    """Least-recently-used pool of loaded fonts and prepared renderers."""
+
+    def __init__(self, size=POOL_SIZE):
+        """Set up pool keeping at most `size` fonts and `size` renderers."""
+        self.get_font = lru_cache(maxsize=size)(self._load_font)
+        self.get_renderer = lru_cache(maxsize=size)(self._create_renderer)
+
+    @staticmethod
+    def _load_font(font, format, encoding):
+        """Load font and override encoding; returns font and encoding."""
+        # the server does not store the default font
+        font, _ = _load_font(font, format, set_default=False)
+        return _set_encoding(font, encoding)
+
+    def _create_renderer(self, font, format, encoding, effects):
+        """Create renderer for font and pairs of effect name and setting."""
+        font, _ = self.get_font(font, format, encoding)
+        return _create_renderer(font, **dict(effects))
+
+    def render(self, args, text=None, cwd=''):
+        """
+        Render a banner as requested through command-line arguments.
+
+        args: list of monobit-banner command-line arguments
+        text: text to render, if not included in the arguments
+        cwd: directory to resolve relative font paths against
+        returns: rendered output as bytes
+        """
+        args = _get_parser(_RequestParser).parse_args(args)
+        if args.serve or args.set_default:
+            raise ValueError(
+                'Options `--serve` and `--set-default` not allowed in request.'
+            )
+        if args.text:
+            args.text = '\n'.join(args.text)
+        else:
+            args.text = text or ''
+        _unescape_args(args)
+        if cwd and args.font and Path(cwd, args.font).exists():
+            args.font = str(Path(cwd, args.font))
+        font_key = args.font, args.format, args.encoding
+        _, args.encoding = self.get_font(*font_key)
+        renderer = self.get_renderer(
+            *font_key, tuple((_e, getattr(args, _e)) for _e in _EFFECTS)
+        )
+        glyph_maps = _render(renderer, args)
+        if _is_image(args):
+            image = _get_image(glyph_maps, args)
+            outstream = io.BytesIO()
+            write_imagefile(outstream, image, Path(args.output).suffix[1:])
+            return outstream.getvalue()
+        return ''.join(_iter_output(glyph_maps, args)).encode('utf-8')
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Handle render requests posted as JSON objects."""
+
+    def do_POST(self):
+        """Render banner; request has keys `args`, `text` and `cwd`."""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            output = self.server.pool.render(**request)
+        except Exception as e:
+            logging.error(e)
+            self._respond(400, str(e).encode('utf-8'))
+        else:
+            self._respond(200, output)
+
+    def _respond(self, status, body):
+        """Send response with body."""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Log requests at info level."""
+        logging.info(format, *args)
+
+
+def _parse_address(address):
+    """Split `host:port` address; host defaults to localhost."""
+    host, _, port = str(address).rpartition(':')
+    return host or 'localhost', int(port)
+
+
+def _check_loopback(host):
+    """Raise ValueError if host does not resolve to loopback addresses only."""
+    try:
+        addresses = {_info[4][0] for _info in socket.getaddrinfo(host, None)}
+    except socket.gaierror as e:
+        raise ValueError(f'Could not resolve server host `{host}`: {e}') from None
+    # requests can load any font file the server can read, so don't expose it
+    if not all(
+            ipaddress.ip_address(_addr.partition('%')[0]).is_loopback
+            for _addr in addresses
+        ):
+        raise ValueError(
+            f'Render server can only run on a local address, not `{host}`.'
+        )
+
+
+def create_server(address=DEFAULT_ADDRESS, pool_size=POOL_SIZE):
+    """Create render server on local address, with the default font loaded."""
+    host, port = _parse_address(address)
+    _check_loopback(host)
+    # requests are answered one at a time, as the pooled fonts and renderers
+    # fill their caches on first use and are not safe to share between threads
+    server = HTTPServer((host, port), _RequestHandler)
+    server.pool = RenderPool(pool_size)
+    server.pool.get_font('', '', '')
+    return server
+
+
+def serve(address=DEFAULT_ADDRESS, pool_size=POOL_SIZE):
+    """Answer render requests until interrupted."""
+    with create_server(address, pool_size) as server:
+        logging.info('Serving banners on %s', address)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def request_banner(args, text=None, *, address=DEFAULT_ADDRESS):
+    """
+    Request a banner from a render server.
+
+    args: list of monobit-banner command-line arguments
+    text: text to render, if not included in the arguments
+    address: local address of the server
+    returns: rendered output as bytes
+    """
+    host, port = _parse_address(address)
+    request = Request(
+        f'http://{host}:{port}/',
+        data=json.dumps(dict(args=list(args), text=text, cwd=os.getcwd())).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    try:
+        with urlopen(request) as response:
+            return response.read()
+    except HTTPError as e:
+        raise ValueError(e.read().decode('utf-8', 'replace')) from None
@@ -5,6 +5,7 @@ Apply operation to bitmap font
 
 import sys
 import logging
+from itertools import chain
 from types import SimpleNamespace as Namespace
 from pathlib import Path
 
@@ -74,24 +75,36 @@ def main():
             if not command_args[-1].func.output:
                 command_args.append(argrecord(command='save', func=operations['save']))
 
-            fonts = []
-            for args in command_args:
+            # fonts are streamed from load to save one at a time,
+            # unless an operation needs the whole pack
+            fonts = ()
+            for index, args in enumerate(command_args):
                 if not args.command:
                     continue
                 logging.debug('Executing command `%s`', args.command)
                 operation = operations[args.command]
                 if operation == monobit.load:
                     # no font/pack arg, pack return
-                    fonts += operation(*args.args, **args.kwargs)
+                    fonts = chain(fonts, monobit.iter_load(*args.args, **args.kwargs))
+                elif operation == monobit.save:
+                    if index < len(command_args) - 1:
+                        # keep the fonts for the commands that follow
+                        fonts = monobit.Pack(fonts)
+                    # font stream arg
+                    fonts = operation(fonts, *args.args, **args.kwargs)
                 elif operation.pack_operation:
                     # pack arg, pack return
-                    fonts = operation(fonts, *args.args, **args.kwargs)
+                    fonts = operation(monobit.Pack(fonts), *args.args, **args.kwargs)
                 else:
                     # font arg, font return
-                    fonts = tuple(
-                        operation(_font, *args.args, **args.kwargs)
-                        for _font in fonts
-                    )
+                    fonts = _apply(operation, args, fonts)
+
+
+def _apply(operation, args, fonts):
+    """Apply font operation lazily to a stream of fonts."""
+    for font in fonts:
+        yield operation(font, *args.args, **args.kwargs)
+
 
 if __name__ == '__main__':
     main()
@@ -6,7 +6,7 @@ licence: https://opensource.org/licenses/MIT
 """
 
 from .base import loaders, savers
-from .fontfiles import load, save, load_plugins
+from .fontfiles import load, iter_load, save, load_plugins
 from .magic import Regex, Glob, Magic
 from .streams import Stream, KeepOpen, get_stringio, get_bytesio
 from . import streams
@@ -44,6 +44,21 @@ def load(infile:Any='', *, format:str='', container_format:str='', match_case:bo
     container_format: container/wrapper formats separated by . (default: infer from magic number or filename)
     match_case: interpret path as case-sensitive (if file system supports it; default: False)
     """
+    return Pack(iter_load(
+        infile, format=format, container_format=container_format,
+        match_case=match_case, **kwargs
+    ))
+
+
+def iter_load(infile='', *, format='', container_format='', match_case=False, **kwargs):
+    """
+    Read font(s) from file, yielding fonts one at a time.
+
+    Multi-font files that can be read incrementally are not loaded into memory
+    in full. Containers are read one member file at a time, but each member is
+    loaded in full, so that a member that fails to load is skipped as a whole.
+    Arguments are as for load().
+    """
     load_plugins()
     infile = infile or sys.stdin
     with open_location(
@@ -51,17 +66,22 @@ def load(infile:Any='', *, format:str='', container_format:str='', match_case:bo
             container_format=container_format, argdict=kwargs,
         ) as location:
         if location.is_dir():
-            return _load_container(
+            yield from _iter_load_container(
                 location, format=format, **location.argdict
             )
         else:
-            return _load_stream(
+            yield from _iter_load_stream(
                 location.get_stream(), format=format, **location.argdict
             )
 
 
 def _load_stream(instream, *, format='', **kwargs):
     """Load fonts from open stream."""
+    return Pack(_iter_load_stream(instream, format=format, **kwargs))
+
+
+def _iter_load_stream(instream, *, format='', **kwargs):
+    """Load fonts from open stream, yielding fonts one at a time."""
     tried_formats = []
     for loader in iter_funcs_from_registry(loaders, instream, format):
         tried_formats.append(loader.format)
@@ -69,10 +89,13 @@ def _load_stream(instream, *, format='', **kwargs):
         logging.info("Loading '%s' as format `%s`", instream.name, loader.format)
         try:
             fonts = loader(instream, **kwargs)
+            # loaders may return a font, a sequence of fonts, or a generator
+            fonts = iter(Pack(fonts) if isinstance(fonts, Font) else fonts or ())
+            first = next(fonts, None)
         except FileFormatError as e:
             logging.debug(e)
         else:
-            if fonts:
+            if first is not None:
                 break
             logging.debug(
                 "No fonts found in '%s' as format `%s`.",
@@ -85,11 +108,20 @@ def _load_stream(instream, *, format='', **kwargs):
         else:
             message += 'tried formats: ' + ', '.join(tried_formats)
         raise FileFormatError(message)
-    # convert font or pack to pack
-    pack = _annotate_fonts_with_source(
-        fonts, instream.name, instream.where, loader.format, kwargs
+    # annotate fonts with source metadata
+    annotate = _get_source_annotator(
+        instream.name, instream.where, loader.format, kwargs
     )
-    return pack
+    yield annotate(first)
+    # errors after the first font can no longer fall back to another format
+    try:
+        for font in fonts:
+            yield annotate(font)
+    except FileFormatError as e:
+        raise FileFormatError(
+            f"Unable to read fonts from '{instream.name}' "
+            f"as format `{loader.format}`: {e}"
+        ) from e
 
 
 def _sanitise_filesystem_name(filename):
@@ -108,12 +140,8 @@ def _sanitise_filesystem_name(filename):
     return filename
 
 
-def _annotate_fonts_with_source(
-        fonts, filename, location, format, loader_kwargs
-    ):
-    """Set source metadata on font pack."""
-    # convert font or pack to pack
-    pack = Pack(fonts)
+def _get_source_annotator(filename, location, format, loader_kwargs):
+    """Create function to set source metadata on a font."""
     filename = _sanitise_filesystem_name(Path(filename).name)
     filepath = _sanitise_filesystem_name(location.relative_path)
     if filepath == '.':
@@ -124,19 +152,33 @@ def _annotate_fonts_with_source(
         for _k, _v in loader_kwargs.items()
     )
     loader_args = f' [{loader_args}]' if loader_args else ''
-    return Pack(
-        _font.modify(
+
+    def _annotate(font):
+        return font.modify(
             converter=MONOBIT,
-            source_format=_font.source_format or f'{format}{loader_args}',
-            source_name=_font.source_name or filename,
-            source_path=_font.source_path or filepath,
+            source_format=font.source_format or f'{format}{loader_args}',
+            source_name=font.source_name or filename,
+            source_path=font.source_path or filepath,
         )
-        for _font in pack
-    )
+
+    return _annotate
+
+
+def _annotate_fonts_with_source(
+        fonts, filename, location, format, loader_kwargs
+    ):
+    """Set source metadata on font pack."""
+    annotate = _get_source_annotator(filename, location, format, loader_kwargs)
+    return Pack(annotate(_font) for _font in Pack(fonts))
 
 
 def _load_container(location, *, format='', **kwargs):
     """Load from a container."""
+    return Pack(_iter_load_container(location, format=format, **kwargs))
+
+
+def _iter_load_container(location, *, format='', **kwargs):
+    """Load from a container, yielding fonts one at a time."""
     for loader in iter_funcs_from_registry(
             container_loaders, instream=None, format=format
         ):
@@ -146,40 +188,47 @@ def _load_container(location, *, format='', **kwargs):
         except FileFormatError as e:
             logging.debug(e)
             continue
-        spec_msg = f"as format {loader.format}"
         pack = _annotate_fonts_with_source(
             fonts, location.path, location, loader.format, kwargs
         )
-        break
-    else:
-        pack = load_all(location, format=format, **kwargs)
-        spec_msg = 'all'
-    if not pack:
-        raise FileFormatError(
-            f"No fonts found in '{location.path}' while loading {spec_msg}."
-        )
-    return pack
+        if not pack:
+            raise FileFormatError(
+                f"No fonts found in '{location.path}' "
+                f"while loading as format {loader.format}."
+            )
+        yield from pack
+        return
+    yield from iter_load_all(location, format=format, **kwargs)
 
 
 def load_all(root_location, *, format='', **kwargs):
     """Open container and load all fonts found in it into one pack."""
+    return Pack(iter_load_all(root_location, format=format, **kwargs))
+
+
+def iter_load_all(root_location, *, format='', **kwargs):
+    """
+    Open container and yield all fonts found in it.
+    Each file is loaded in full before its fonts are yielded.
+    """
     load_plugins()
     logging.info('Reading all from `%s`.', root_location)
-    packs = Pack()
+    found = False
     for location in root_location.walk():
         with location:
             logging.debug('Trying `%s`.', location)
             try:
-                pack = _load_stream(
+                # load all fonts in the file, so that a failing file is skipped whole
+                fonts = Pack(_iter_load_stream(
                     location.get_stream(), format=format, **kwargs
-                )
+                ))
             except (ValueError, EnvironmentError, FileFormatError, UnsupportedError) as exc:
                 logging.debug('Could not load `%s`: %s', location, exc)
-            else:
-                packs += Pack(pack)
-    if not packs:
+                continue
+            found = found or bool(fonts)
+            yield from fonts
+    if not found:
         raise FileFormatError('Unable to read fonts from container.')
-    return packs
 
 
 ##############################################################################
@@ -218,7 +267,13 @@ def output_pack_or_font(
         registry,
         **kwargs
     ):
-    pack = Pack(pack_or_font)
+    if isinstance(pack_or_font, (Font, Pack)):
+        pack = Pack(pack_or_font)
+    else:
+        # font stream e.g. from iter_load(): only materialise where needed
+        fonts = iter(pack_or_font)
+        first = next(fonts, None)
+        pack = _FontStream(first, fonts) if first is not None else Pack()
     outfile = outfile or sys.stdout
     if outfile == sys.stdout:
         # errors can occur if the strings we write contain surrogates
@@ -240,12 +295,28 @@ def output_pack_or_font(
             )
         else:
             _output_to_stream(
-                pack, location.get_stream(), format=format, registry=registry,
+                Pack(pack), location.get_stream(),
+                format=format, registry=registry,
                 **location.argdict
             )
     return pack_or_font
 
 
+class _FontStream:
+    """Iterable of fonts that is consumed only once, on demand."""
+
+    def __init__(self, first, fonts):
+        self._first = first
+        self._fonts = fonts
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        yield self._first
+        yield from self._fonts
+
+
 def _output_to_stream(pack, outstream, *, format, registry, **kwargs):
     """Save fonts to an open stream."""
     matching = registry.get_for(outstream, format=format)
@@ -278,7 +349,7 @@ def _output_to_container(pack, location, *, format, registry, **kwargs):
         logging.info(
             "Outputting %s as container format `%s`", location.path, saver.format
         )
-        saver(pack, location, **kwargs)
+        saver(Pack(pack), location, **kwargs)
         break
     else:
         _output_all(pack, location, format=format, registry=registry, **kwargs)
@@ -150,56 +150,87 @@ def format_comment(comments, comment_char):
 # common utilities and reader classes
 
 def iter_blocks(text_stream, classes):
-    block = BlockBuilder(classes)
+    """Iterate over blocks in a text stream."""
+    classify = BlockClassifier(classes)
+    block = None
     for line in text_stream:
-        while not block.append(line.rstrip('\r\n')):
-            yield block.emit()
-            block = BlockBuilder(classes)
-    if block:
-        yield block.emit()
+        line = line.rstrip('\r\n')
+        if block is not None:
+            if not block.ends(line):
+                block.append(line)
+                continue
+            yield block
+        block = classify(line)
+    if block is not None:
+        yield block
+
+
+def iter_block_ranges(binary_stream, classes):
+    """Iterate over blocks in a utf-8 stream, with their byte offset and size."""
+    classify = BlockClassifier(classes)
+    block = None
+    start = offset = 0
+    for line in binary_stream:
+        text = line.decode('utf-8', 'replace')
+        if not offset:
+            text = text.lstrip('\ufeff')
+        text = text.rstrip('\r\n')
+        if block is None or block.ends(text):
+            if block is not None:
+                yield start, offset - start, block
+            block = classify(text)
+            start = offset
+        else:
+            block.append(text)
+        offset += len(line)
+    if block is not None:
+        yield start, offset - start, block
 
 
-class BlockBuilder:
+class BlockClassifier:
+    """Find the block type for a line that starts a new block."""
 
     def __init__(self, classes):
-        self.block = None
-        self.classes = (*classes, Unparsed)
-
-    def __bool__(self):
-        return self.block is not None
-
-    def append(self, line):
-        if not self.block:
-            for blocktype in self.classes:
-                try:
-                    self.block = blocktype(line)
-                    return True
-                except ValueError:
-                    pass
-            else:
-                # this should not happen - BaseBlock absorbs
-                raise ValueError('unparsed block')
-        if self.block.ends(line):
-            return False
-        self.block.append(line)
-        return True
+        self.classes = tuple(
+            (_cls, None if _cls.first_chars is None else frozenset(_cls.first_chars))
+            for _cls in (*classes, Unparsed)
+        )
+        # dispatch table: first character of line -> candidate block types
+        self.table = {}
+
+    def get_candidates(self, first):
+        """Block types that may start with a given character."""
+        return tuple(
+            _cls for _cls, _firsts in self.classes
+            if _firsts is None or first in _firsts
+        )
 
-    def emit(self):
-        return self.block
+    def __call__(self, line):
+        first = line[:1]
+        candidates = self.table.get(first)
+        if candidates is None:
+            candidates = self.table[first] = self.get_candidates(first)
+        for blocktype in candidates:
+            if blocktype.starts(line):
+                return blocktype(line)
+        # this should not happen - Unparsed absorbs
+        raise ValueError('unparsed block')
 
 
 class BaseBlock:
 
+    # characters a starting line may begin with, '' for empty; None for any
+    first_chars = None
+
     def __init__(self, line):
-        if not self.starts(line):
-            raise ValueError(f'{line:r} cannot start a {type(self).__name__}')
         self.lines = []
         self.append(line)
 
     def __repr__(self):
         return f'{type(self).__name__}({repr(self.lines)})'
 
-    def starts(self, line):
+    @classmethod
+    def starts(cls, line):
         return True
 
     def ends(self, line):
@@ -218,7 +249,10 @@ class Unparsed(BaseBlock):
 
 class Empty(BaseBlock):
 
-    def starts(self, line):
+    first_chars = ('',)
+
+    @classmethod
+    def starts(cls, line):
         return not line
 
 
@@ -237,8 +271,9 @@ class DrawComment(NonEmptyBlock):
 
     notcomment = string.hexdigits + string.whitespace
 
-    def starts(self, line):
-        return line[:1] not in self.notcomment
+    @classmethod
+    def starts(cls, line):
+        return line[:1] not in cls.notcomment
 
     def ends(self, line):
         return not self.starts(line)
@@ -266,7 +301,10 @@ class DrawGlyph(NonEmptyBlock):
     # base for codepoint. default: hexadecimal
     base = 16
 
-    def starts(self, line):
+    first_chars = string.hexdigits
+
+    @classmethod
+    def starts(cls, line):
         return line and line[:1] in string.hexdigits
 
     def ends(self, line):
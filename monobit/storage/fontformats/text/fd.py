@@ -129,7 +129,10 @@ def _convert_mkwinfont(props, glyphs, comments):
 
 class MWFGlyph(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = '01'
+
+    @classmethod
+    def starts(cls, line):
         return line[:1] in ('0', '1')
 
     def ends(self, line):
@@ -141,7 +144,10 @@ class MWFGlyph(NonEmptyBlock):
 
 class MWFProperties(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = string.ascii_letters
+
+    @classmethod
+    def starts(cls, line):
         return line[:1] in string.ascii_letters and ' ' in line
 
     def ends(self, line):
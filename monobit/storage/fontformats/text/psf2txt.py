@@ -138,13 +138,19 @@ def _convert_psf2txt(props, glyphs, comment):
 
 class PTSeparator(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = '%'
+
+    @classmethod
+    def starts(cls, line):
         return line[:1] == '%'
 
 
 class PTComment(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = '/'
+
+    @classmethod
+    def starts(cls, line):
         return line.startswith('//')
 
     def ends(self, line):
@@ -159,7 +165,10 @@ class PTComment(NonEmptyBlock):
 
 class PTGlyph(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = 'B'
+
+    @classmethod
+    def starts(cls, line):
         return line.startswith('Bitmap:')
 
     def ends(self, line):
@@ -182,7 +191,10 @@ class PTGlyph(NonEmptyBlock):
 
 class PTProperties(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = string.ascii_letters
+
+    @classmethod
+    def starts(cls, line):
         return line[:1] in string.ascii_letters and ':' in line
 
     def ends(self, line):
@@ -194,7 +206,10 @@ class PTProperties(NonEmptyBlock):
 
 class PTLabel(NonEmptyBlock):
 
-    def starts(self, line):
+    first_chars = 'U'
+
+    @classmethod
+    def starts(cls, line):
         return line.startswith('Unicode:')
 
     def get_value(self):
@@ -5,6 +5,7 @@ monobit.storage.fontformats.text.yaff - monobit-yaff format
 licence: https://opensource.org/licenses/MIT
 """
 
+import io
 import logging
 import string
 from dataclasses import dataclass, field
@@ -15,11 +16,14 @@ from functools import cached_property, cache
 from monobit.storage import loaders, savers
 from monobit.storage.magic import Sentinel
 from monobit.core import (
-    Font, FontProperties, Glyph, Raster, Label, strip_matching, CUSTOM_NAMESPACE
+    Font, FontProperties, Glyph, Raster, Label, strip_matching, CUSTOM_NAMESPACE,
+    apply_global_metrics,
 )
 from monobit.base import Props, Coord, passthrough, FileFormatError
+from monobit.storage.utils.glyphindex import register_indexer
 
 from .draw import NonEmptyBlock, DrawComment, Empty, Unparsed, iter_blocks
+from .draw import iter_block_ranges
 from .draw import format_comment
 
 
@@ -127,15 +131,13 @@ def _set_property(propsdict, key, value):
 
 
 def _load_yaffs(text_stream, allow_empty):
-    """Parse a yaff or yaffs file."""
-    fonts = []
+    """Parse a yaff or yaffs file, yielding fonts section by section."""
     reader = SectionIterator(text_stream)
     while not reader.eof:
         font = _read_yaff(reader)
         # if no glyphs, ignore it - may not be yaff at all
         if font.glyphs or allow_empty:
-            fonts.append(font)
-    return fonts
+            yield font
 
 
 class SectionIterator:
@@ -162,17 +164,19 @@ class SectionIterator:
 
 def _read_yaff(text_stream):
     """Parse a monobit yaff file."""
-    blocktypes = (
-        YaffComment, YaffProperty, YaffGlyph, YaffPropertyOrGlyph,
-        Empty, Unparsed
-    )
+    glyphs, font_props, comment = _parse_yaff(text_stream)
+    return Font(_create_glyphs(glyphs), **font_props, comment=comment)
+
+
+def _parse_yaff(text_stream):
+    """Parse yaff file into glyph property sets, font properties and comments."""
     glyphs = []
     font_comments = []
     font_props = {}
     font_prop_comms = {}
     current_comment = []
     inklevels = YaffParams.inklevels(2)
-    for block in iter_blocks(text_stream, blocktypes):
+    for block in iter_blocks(text_stream, _BLOCKTYPES):
         if isinstance(block, (YaffGlyph, YaffPropertyOrGlyph)) and block.is_glyph():
             glyphs.append(block.get_glyph_value(inklevels) | Props(
                 comment='\n\n'.join(current_comment),
@@ -197,21 +201,26 @@ def _read_yaff(text_stream):
         elif not isinstance(block, (YaffProperty, YaffGlyph, YaffPropertyOrGlyph)):
             logging.debug('Unparsed lines: %s', block.get_value())
     font_comments.extend(current_comment)
-    # construct glyphs, including path-only glyphs
-    glyphs = (
+    return glyphs, font_props, {
+        '': '\n\n'.join(font_comments), **font_prop_comms
+    }
+
+
+def _create_glyphs(glyphs):
+    """Construct glyphs from property sets, including path-only glyphs."""
+    return (
         Glyph(**vars(_g)) if _g.pixels or not hasattr(_g, 'path')
         else Glyph.from_path(**vars(_g - 'pixels'))
         for _g in glyphs
     )
-    return Font(
-        glyphs, **font_props,
-        comment={'': '\n\n'.join(font_comments), **font_prop_comms},
-    )
 
 
 class YaffComment(DrawComment):
 
-    def starts(self, line):
+    first_chars = YaffParams.comment
+
+    @classmethod
+    def starts(cls, line):
         return line[:1] == YaffParams.comment
 
 
@@ -242,8 +251,9 @@ class YaffGlyph(YaffMultiline):
 
     label_chars = tuple('"' + "'" + string.digits)
 
-    def starts(self, line):
-        return line and (line[:1] in self.label_chars) or '+' in line
+    @classmethod
+    def starts(cls, line):
+        return line and (line[:1] in cls.label_chars) or '+' in line
 
     def get_value(self, inklevels):
         labels = tuple(_l[:-1] for _l in self.lines[:self.n_keys])
@@ -327,11 +337,12 @@ _LABEL_VALUED_KEYS = tuple(
 class YaffProperty(NonEmptyBlock, YaffParams):
     """Inline property."""
 
-    def starts(self, line):
+    @classmethod
+    def starts(cls, line):
         return (
-            line[:1] not in self.whitespace
-            and line[-1:] != self.separator
-            and self.separator in line
+            line[:1] not in cls.whitespace
+            and line[-1:] != cls.separator
+            and cls.separator in line
         )
 
     def get_value(self):
@@ -356,8 +367,9 @@ def _strip_quotes(line):
 class YaffPropertyOrGlyph(YaffMultiline):
     """Multiline properties, or monochrome glyph with pre-1.0 tag/char label."""
 
-    def starts(self, line):
-        return line[:1] not in self.whitespace and line[-1:] == self.separator
+    @classmethod
+    def starts(cls, line):
+        return line[:1] not in cls.whitespace and line[-1:] == cls.separator
 
     def get_value(self):
         return '\n'.join(_strip_quotes(_l) for _l in self.lines[1:])
@@ -383,6 +395,77 @@ class YaffPropertyOrGlyph(YaffMultiline):
         return first[:1] in self.inklevels(2) or set(first) == set(self.empty)
 
 
+_BLOCKTYPES = (
+    YaffComment, YaffProperty, YaffGlyph, YaffPropertyOrGlyph,
+    Empty, Unparsed
+)
+
+
+##############################################################################
+# glyph index
+
+def _scan_yaff(instream):
+    """Locate header ranges and glyph blocks in a single-font yaff file."""
+    header, glyphs = [], []
+    # comment ranges not yet assigned to a glyph or property
+    pending = []
+    seen_content = False
+    for offset, size, block in iter_block_ranges(instream, _BLOCKTYPES):
+        if block.lines and block.lines[0][:3] == BOUNDARY_MARKER:
+            if seen_content or pending:
+                raise FileFormatError(
+                    'Glyph index not supported for multi-font yaff files.'
+                )
+            header.append((offset, size))
+        elif isinstance(block, YaffComment):
+            pending.append((offset, size))
+        elif isinstance(block, (YaffGlyph, YaffPropertyOrGlyph)) and block.is_glyph():
+            labels = tuple(_l[:-1] for _l in block.lines[:block.n_keys])
+            start = pending[0][0] if pending else offset
+            glyphs.append((start, offset + size - start, labels))
+            pending = []
+            seen_content = True
+        elif isinstance(block, (YaffProperty, YaffPropertyOrGlyph)):
+            header.extend(pending)
+            header.append((offset, size))
+            pending = []
+            seen_content = True
+        elif isinstance(block, Empty) and not seen_content:
+            # leading comments separated by a blank line are global
+            header.extend(pending)
+            pending = []
+    header.extend(pending)
+    return header, glyphs
+
+
+def _get_yaff_reader(header):
+    """Convert yaff header; return font and function to convert a glyph block."""
+    _, font_props, comment = _parse_yaff(SectionIterator(io.StringIO(header)))
+    font = Font(**font_props, comment=comment)
+    inklevels = YaffParams.inklevels(int(font_props.get('levels', '2'), 0))
+
+    def _parse_glyph(text):
+        comments = []
+        for block in iter_blocks(io.StringIO(text), _BLOCKTYPES):
+            if isinstance(block, YaffComment):
+                comments.append(block.get_value())
+            elif isinstance(block, (YaffGlyph, YaffPropertyOrGlyph)) and block.is_glyph():
+                glyph = block.get_glyph_value(inklevels) | Props(
+                    comment='\n\n'.join(comments),
+                )
+                break
+        else:
+            raise FileFormatError('No glyph found at indexed location.')
+        # apply global glyph metrics from the header, as a full load would
+        glyphs, _ = apply_global_metrics(tuple(_create_glyphs((glyph,))), font_props)
+        return glyphs[0]
+
+    return font, _parse_glyph
+
+
+register_indexer('yaff', scanner=_scan_yaff, reader=_get_yaff_reader)
+
+
 ##############################################################################
 # write file
 
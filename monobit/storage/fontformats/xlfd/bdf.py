@@ -5,6 +5,7 @@ monobit.storage.fontformats.xlfd.bdf - Adobe Glyph Bitmap Distribution Format
 licence: https://opensource.org/licenses/MIT
 """
 
+import io
 import logging
 
 from monobit.base.binary import ceildiv
@@ -13,6 +14,7 @@ from monobit.base import Coord, FileFormatError, UnsupportedError
 from monobit.core import Font, Raster, Glyph, Char, Codepoint, Tag
 from monobit.encoding import encodings, NotFoundError
 from monobit.storage.utils.limitations import ensure_single
+from monobit.storage.utils.glyphindex import register_indexer
 
 from .xlfd import parse_xlfd_properties, create_xlfd_properties
 from .xlfd import create_xlfd_name, CUSTOM_NAMESPACE
@@ -154,14 +156,20 @@ def _bdf_ints(instr):
 
 def _convert_from_bdf(bdf_glyphs, bdf_props, x_props):
     """Convert BDF data to monobit glyphs and properties."""
-    # parse meaningful metadata
-    known, global_metrics, bdf_unparsed = _extract_known_bdf_properties(bdf_props)
-    properties = _convert_bdf_properties(known)
+    known, global_metrics, properties = _convert_bdf_header(bdf_props, x_props)
     glyphs = _convert_bdf_glyphs(bdf_glyphs, global_metrics, known)
-    xlfd_props = parse_xlfd_properties(x_props, known['FONT'])
     # consistency checks
     if known['NCHARS'] != len(bdf_glyphs):
         logging.warning('Number of characters found does not match CHARS declaration.')
+    return glyphs, properties
+
+
+def _convert_bdf_header(bdf_props, x_props):
+    """Convert BDF and XLFD global properties to monobit properties."""
+    # parse meaningful metadata
+    known, global_metrics, bdf_unparsed = _extract_known_bdf_properties(bdf_props)
+    properties = _convert_bdf_properties(known)
+    xlfd_props = parse_xlfd_properties(x_props, known['FONT'])
     for key, value in bdf_unparsed.items():
         logging.warning(f'Unrecognised BDF property {key}={value}')
         # preserve as custom property namespace, avoid clashes with yaff props
@@ -175,7 +183,7 @@ def _convert_from_bdf(bdf_glyphs, bdf_props, x_props):
             )
         else:
             properties[key] = value
-    return glyphs, properties
+    return known, global_metrics, properties
 
 
 def _extract_known_bdf_properties(bdf_props):
@@ -363,6 +371,53 @@ def swidth_to_pixel(swidth, point_size, dpi):
         return dwidth
     return round(dwidth / whole, 2) * whole
 
+
+##############################################################################
+# glyph index
+
+def _scan_bdf(instream):
+    """Locate header range and glyph blocks in a BDF file."""
+    glyphs = []
+    header_size = None
+    offset = 0
+    for line in instream:
+        keyword, _, value = line.strip().partition(b' ')
+        if keyword == b'STARTCHAR':
+            if header_size is None:
+                header_size = offset
+            start = offset
+            props = {'STARTCHAR': value.decode('utf-8', 'replace')}
+        elif keyword == b'ENCODING':
+            props['ENCODING'] = value.decode('ascii', 'replace')
+        offset += len(line)
+        if keyword == b'ENDCHAR':
+            glyphs.append((start, offset-start, _convert_bdf_labels(props)))
+    if header_size is None:
+        header_size = offset
+    return [(0, header_size)], glyphs
+
+
+def _get_bdf_reader(header):
+    """Convert BDF header; return font and function to convert a glyph block."""
+    comments, bdf_props, x_props = _read_bdf_global(io.StringIO(header))
+    known, global_metrics, properties = _convert_bdf_header(bdf_props, x_props)
+    font = Font(comment=comments, **properties)
+
+    def _parse_glyph(block):
+        bdf_glyphs = _read_bdf_glyphs(io.StringIO(block))
+        glyphs = _convert_bdf_glyphs(bdf_glyphs, global_metrics, known)
+        # label in the same way as load_bdf
+        glyph_font = font.modify(glyphs).label()
+        if encodings.is_unicode(glyph_font.encoding):
+            glyph_font = glyph_font.label(codepoint_from=None)
+        return glyph_font.glyphs[0]
+
+    return font, _parse_glyph
+
+
+register_indexer('bdf', scanner=_scan_bdf, reader=_get_bdf_reader)
+
+
 ##############################################################################
 # BDF writer
 
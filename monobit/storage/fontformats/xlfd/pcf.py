@@ -7,11 +7,13 @@ licence: https://opensource.org/licenses/MIT
 
 import logging
 from itertools import accumulate
+from functools import cached_property
 
 from monobit.base.struct import big_endian as be, little_endian as le
 from monobit.storage import loaders, savers
 from monobit.base import Props
-from monobit.core import Font, Glyph, Raster, Tag, Codepoint
+from monobit.core import Font, Glyph, Raster, Tag, Char, Codepoint
+from monobit.encoding import encoder
 from monobit.base.binary import align, ceildiv
 from monobit.storage.utils.limitations import ensure_single, ensure_levels
 
@@ -30,11 +32,7 @@ MAGIC = b'\1fcp'
 )
 def load_pcf(instream):
     """Load font from X11 Portable Compiled Format (PCF)."""
-    pcf_data = _read_pcf(instream)
-    glyphs = _convert_glyphs(pcf_data)
-    props = _convert_props(pcf_data)
-    font = Font(glyphs, **props)
-    return font.label()
+    return PcfFont(instream).to_font()
 
 @savers.register(linked=load_pcf)
 def save_pcf(
@@ -422,55 +420,72 @@ def _convert_glyphs(pcf_data):
     except AttributeError:
         pass
     # scalable width reference values
-    if hasattr(pcf_data, 'swidths'):
-        dpi_y = pcf_data.xlfd_props.get('RESOLUTION_Y', 72)
+    if getattr(pcf_data, 'swidths', None):
+        swidth_scale = _get_swidth_scale(pcf_data.xlfd_props)
+    else:
+        swidth_scale = None
+    if swidth_scale:
+        swidths = pcf_data.swidths
+    else:
+        swidths = (None,) * n_glyphs
+    glyphs = tuple(
+        _convert_glyph(
+            _gb, _met, _labs, _swidth, pcf_data.bitmap_format, swidth_scale
+        )
+        for _gb, _met, _labs, _swidth in zip(
+            pcf_data.bitmaps, pcf_data.metrics, labelsets, swidths
+        )
+    )
+    return glyphs
+
+
+def _get_swidth_scale(xlfd_props):
+    """Get point size and vertical resolution needed to convert swidths."""
+    dpi_y = xlfd_props.get('RESOLUTION_Y', 72)
+    try:
+        point_size = xlfd_props['POINT_SIZE'] / 10
+    except KeyError:
         try:
-            point_size = pcf_data.xlfd_props['POINT_SIZE'] / 10
+            point_size = xlfd_props['PIXEL_SIZE'] * dpi_y / 72 / 10
         except KeyError:
-            try:
-                point_size = pcf_data.xlfd_props['PIXEL_SIZE'] * dpi_y / 72 / 10
-            except KeyError:
-                logging.warning('No point-size information - dropping scalable width table')
-                # can't calculate swidths
-                pcf_data.swidths = None
-    if hasattr(pcf_data, 'swidths') and pcf_data.swidths:
-        pcf_data.swidths = tuple(
-            swidth_to_pixel(_swidth, point_size, dpi_y)
-            for _swidth in pcf_data.swidths
-        )
-    else:
-        pcf_data.swidths = (None,) * n_glyphs
+            logging.warning('No point-size information - dropping scalable width table')
+            # can't calculate swidths
+            return None
+    return point_size, dpi_y
+
+
+def _convert_glyph(
+        glyph_bytes, metrics, labels, swidth, bitmap_format, swidth_scale
+    ):
+    """Convert a single glyph from X11 PCF data to monobit."""
+    if swidth is not None and swidth_scale:
+        swidth = swidth_to_pixel(swidth, *swidth_scale)
     # /* how each row in each glyph's bitmap is padded (format&3) */
     # /*  0=>bytes, 1=>shorts, 2=>ints */
-    glyph_pad_length = pcf_data.bitmap_format & PCF_GLYPH_PAD_MASK
-    byte_big = pcf_data.bitmap_format & PCF_BYTE_MASK
-    bit_big = pcf_data.bitmap_format & PCF_BIT_MASK
+    glyph_pad_length = bitmap_format & PCF_GLYPH_PAD_MASK
+    byte_big = bitmap_format & PCF_BYTE_MASK
+    bit_big = bitmap_format & PCF_BIT_MASK
     # /* what the bits are stored in (bytes, shorts, ints) (format>>4)&3 */
     # /*  0=>bytes, 1=>shorts, 2=>ints */
-    scan_unit = (pcf_data.bitmap_format & PCF_SCAN_UNIT_MASK) >> 4
+    scan_unit = (bitmap_format & PCF_SCAN_UNIT_MASK) >> 4
     # metrics are as defined in XCharStruct (above)
     # https://tronche.com/gui/x/xlib/graphics/font-metrics/
     # ascent and descent determine the character height, which we instead infer
     # from bitmap and stride.
-    glyphs = tuple(
-        Glyph.from_bytes(
-            _gb,
-            width=_met.right_side_bearing-_met.left_side_bearing,
-            stride=align(_met.right_side_bearing-_met.left_side_bearing, glyph_pad_length+3),
-            height=_met.character_ascent+_met.character_descent,
-            bit_order='big' if bit_big else 'little',
-            byte_swap=0 if (bool(byte_big) == bool(bit_big)) else 2**scan_unit,
-            left_bearing=_met.left_side_bearing,
-            right_bearing=_met.character_width-_met.right_side_bearing,
-            shift_up=-_met.character_descent,
-            scalable_width=_swidth if _swidth != _met.character_width else None,
-            labels=_labs,
-        )
-        for _gb, _met, _labs, _swidth in zip(
-            pcf_data.bitmaps, pcf_data.metrics, labelsets, pcf_data.swidths
-        )
+    width = metrics.right_side_bearing - metrics.left_side_bearing
+    return Glyph.from_bytes(
+        glyph_bytes,
+        width=width,
+        stride=align(width, glyph_pad_length+3),
+        height=metrics.character_ascent+metrics.character_descent,
+        bit_order='big' if bit_big else 'little',
+        byte_swap=0 if (bool(byte_big) == bool(bit_big)) else 2**scan_unit,
+        left_bearing=metrics.left_side_bearing,
+        right_bearing=metrics.character_width-metrics.right_side_bearing,
+        shift_up=-metrics.character_descent,
+        scalable_width=swidth if swidth != metrics.character_width else None,
+        labels=labels,
     )
-    return glyphs
 
 
 def _convert_props(pcf_data):
@@ -495,6 +510,277 @@ def _convert_props(pcf_data):
     return props
 
 
+###############################################################################
+# random access
+
+class PcfFont:
+    """
+    Random-access view on an X11 PCF font file.
+
+    Only the table of contents is read on construction. Tables are read when
+    first needed; bitmaps and metrics are read per glyph on lookup.
+    """
+
+    def __init__(self, instream):
+        """Read the table of contents from a seekable PCF stream."""
+        self._stream = instream
+        header = _HEADER.read_from(instream, 0)
+        toc = (_TOC_ENTRY * header.table_count).read_from(instream)
+        self._toc = {_entry.type: _entry for _entry in toc}
+
+    def _seek_table(self, table_type):
+        """Move stream to start of a table; return False if not present."""
+        try:
+            entry = self._toc[table_type]
+        except KeyError:
+            return False
+        self._stream.seek(entry.offset)
+        return True
+
+    def to_font(self):
+        """Convert all glyphs and properties to a labelled monobit font."""
+        self._stream.seek(0)
+        pcf_data = _read_pcf(self._stream)
+        glyphs = _convert_glyphs(pcf_data)
+        props = _convert_props(pcf_data)
+        font = Font(glyphs, **props)
+        return font.label()
+
+    ##########################################################################
+    # lazily read tables
+
+    @cached_property
+    def _xlfd_props(self):
+        """XLFD properties as stored."""
+        if not self._seek_table(PCF_PROPERTIES):
+            return {}
+        return _read_properties_table(self._stream)
+
+    @cached_property
+    def properties(self):
+        """Font properties, converted to monobit."""
+        pcf_data = Props(
+            xlfd_props=dict(self._xlfd_props),
+            default_char=self._encoding_table[1].default_char,
+        )
+        if self._seek_table(PCF_BDF_ACCELERATORS):
+            pcf_data.bdf_acc_props = _read_acc_table(self._stream)
+        elif self._seek_table(PCF_ACCELERATORS):
+            pcf_data.acc_props = _read_acc_table(self._stream)
+        return _convert_props(pcf_data)
+
+    @cached_property
+    def _encoder(self):
+        """Encoder for the font's character set, if recognised."""
+        return encoder(self.properties.get('encoding', ''))
+
+    @cached_property
+    def _encoding_table(self):
+        """Encoding table header and start offset of glyph indices."""
+        if not self._seek_table(PCF_BDF_ENCODINGS):
+            return None, Props(**{_k: 0 for _k in _ENCODING_TABLE})
+        format, base = _read_format(self._stream)
+        enc = base.Struct(**_ENCODING_TABLE).read_from(self._stream)
+        return (base, self._stream.tell()), enc
+
+    @cached_property
+    def _metrics_table(self):
+        """Metrics record struct, count, start offset and compression flag."""
+        self._seek_table(PCF_METRICS)
+        format, base = _read_format(self._stream)
+        if format & PCF_COMPRESSED_METRICS:
+            record = base.Struct(**_COMPRESSED_METRICS)
+            count = base.uint16.read_from(self._stream)
+        else:
+            record = base.Struct(**_UNCOMPRESSED_METRICS)
+            count = base.uint32.read_from(self._stream)
+        compressed = bool(format & PCF_COMPRESSED_METRICS)
+        return record, int(count), self._stream.tell(), compressed
+
+    @cached_property
+    def _bitmap_table(self):
+        """Bitmap format, glyph offsets, data size and start of bitmap data."""
+        self._seek_table(PCF_BITMAPS)
+        format, base = _read_format(self._stream)
+        glyph_count = base.int32.read_from(self._stream)
+        offsets = (base.int32 * glyph_count).read_from(self._stream)
+        bitmap_sizes = (base.int32 * 4).read_from(self._stream)
+        return format, tuple(offsets), bitmap_sizes[format & 3], self._stream.tell()
+
+    @cached_property
+    def _swidths(self):
+        """Scalable widths table and conversion scale, if available."""
+        if not self._seek_table(PCF_SWIDTHS):
+            return None, None
+        return _read_swidths(self._stream), _get_swidth_scale(self._xlfd_props)
+
+    @cached_property
+    def _glyph_names(self):
+        """Glyph names table, if available."""
+        if not self._seek_table(PCF_GLYPH_NAMES):
+            return ()
+        return tuple(_read_glyph_names(self._stream))
+
+    @cached_property
+    def _codepoints(self):
+        """Map of glyph index to codepoints, read from the full encoding table."""
+        if not self._seek_table(PCF_BDF_ENCODINGS):
+            return {}
+        encodings, _ = _read_encoding(self._stream)
+        codepoints = {}
+        for _cp, _idx in encodings.items():
+            codepoints.setdefault(_idx, []).append(Codepoint(_cp))
+        return codepoints
+
+    ##########################################################################
+    # glyph access
+
+    def __len__(self):
+        """Number of glyphs in the font."""
+        _, count, _, _ = self._metrics_table
+        return count
+
+    def get_codepoints(self):
+        """Get tuple of codepoints defined in the encoding table."""
+        return tuple(sorted(
+            _cp for _cps in self._codepoints.values() for _cp in _cps
+        ))
+
+    def get_tags(self):
+        """Get tuple of glyph names."""
+        return tuple(Tag(_name) for _name in self._glyph_names)
+
+    def get_index(self, label=None, *, char=None, codepoint=None, tag=None):
+        """Get glyph index for a codepoint, char or glyph name; -1 if missing."""
+        if char is not None:
+            label = Char(char)
+        elif codepoint is not None:
+            label = Codepoint(codepoint)
+        elif tag is not None:
+            label = Tag(tag)
+        if isinstance(label, Tag):
+            try:
+                return self._glyph_names.index(label.value)
+            except ValueError:
+                return -1
+        if isinstance(label, Char):
+            if not self._encoder:
+                return -1
+            label = self._encoder.codepoint(label)
+        return self._get_encoded_index(Codepoint(label))
+
+    def _get_encoded_index(self, codepoint):
+        """Look up glyph index for a codepoint in the encoding table."""
+        location, enc = self._encoding_table
+        if not location or not codepoint or len(codepoint) > 2:
+            return -1
+        # mirror the order in which _generate_codepoints enumerates the table
+        if not enc.min_byte1 and not enc.max_byte1:
+            if len(codepoint) > 1:
+                return -1
+            first, second = codepoint[0], enc.min_byte1
+        else:
+            first, second = codepoint.rjust(2, b'\0')
+        if not (
+                enc.min_char_or_byte2 <= first <= enc.max_char_or_byte2
+                and enc.min_byte1 <= second <= enc.max_byte1
+            ):
+            return -1
+        row_length = enc.max_byte1 - enc.min_byte1 + 1
+        position = (
+            (first - enc.min_char_or_byte2) * row_length
+            + second - enc.min_byte1
+        )
+        base, start = location
+        index = base.int16.read_from(
+            self._stream, start + position * base.int16.size
+        )
+        # -1 means 'not used'
+        return max(-1, int(index))
+
+    @cached_property
+    def _encoded_indices(self):
+        """Glyph index entries of the encoding table, as raw bytes."""
+        location, enc = self._encoding_table
+        if not location:
+            return b''
+        base, start = location
+        count = (
+            (enc.max_char_or_byte2 - enc.min_char_or_byte2 + 1)
+            * (enc.max_byte1 - enc.min_byte1 + 1)
+        )
+        self._stream.seek(start)
+        return self._stream.read(count * base.int16.size)
+
+    def _get_encoded_codepoints(self, index):
+        """Look up the codepoints for a glyph index in the encoding table."""
+        location, enc = self._encoding_table
+        if not location:
+            return ()
+        base, _ = location
+        # find the glyph index entries without converting the whole table
+        entry = bytes(base.int16(index))
+        entries = self._encoded_indices
+        positions = []
+        position = entries.find(entry)
+        while position >= 0:
+            if not position % len(entry):
+                positions.append(position // len(entry))
+            position = entries.find(entry, position + 1)
+        # mirror the order in which _generate_codepoints enumerates the table
+        if not enc.min_byte1 and not enc.max_byte1:
+            return tuple(
+                Codepoint(bytes((enc.min_char_or_byte2 + _pos,)))
+                for _pos in positions
+            )
+        row_length = enc.max_byte1 - enc.min_byte1 + 1
+        return tuple(
+            Codepoint(bytes((
+                enc.min_char_or_byte2 + _pos // row_length,
+                enc.min_byte1 + _pos % row_length,
+            )))
+            for _pos in positions
+        )
+
+    def get_glyph(self, label=None, *, char=None, codepoint=None, tag=None):
+        """Read and convert a single glyph by codepoint, char or glyph name."""
+        index = self.get_index(label, char=char, codepoint=codepoint, tag=tag)
+        if index < 0:
+            raise KeyError(
+                f'No glyph found matching label={label or char or codepoint or tag}'
+            )
+        return self.get_glyph_at(index)
+
+    def get_glyph_at(self, index):
+        """Read and convert the glyph at a given index."""
+        # metrics
+        record, count, start, compressed = self._metrics_table
+        if not 0 <= index < count:
+            raise IndexError(f'Glyph index {index} out of range.')
+        metrics = record.read_from(self._stream, start + index * record.size)
+        if compressed:
+            metrics = Props(**{_k: _v-0x80 for _k, _v in vars(metrics).items()})
+        # bitmap
+        format, offsets, size, start = self._bitmap_table
+        end = offsets[index+1] if index+1 < len(offsets) else size
+        self._stream.seek(start + offsets[index])
+        glyph_bytes = self._stream.read(end - offsets[index])
+        # labels
+        labels = []
+        if index < len(self._glyph_names):
+            labels.append(Tag(self._glyph_names[index]))
+        labels.extend(self._get_encoded_codepoints(index))
+        # scalable width
+        swidths, swidth_scale = self._swidths
+        swidth = swidths[index] if swidths else None
+        glyph = _convert_glyph(
+            glyph_bytes, metrics, labels, swidth, format, swidth_scale
+        )
+        if self._encoder:
+            glyph = glyph.label(char_from=self._encoder)
+        return glyph
+
+
 ###############################################################################
 # pcf writer
 
@@ -0,0 +1,192 @@
+"""
+monobit.storage.utils.glyphindex - random-access glyph index for text formats
+
+(c) 2026 Rob Hagemans
+licence: https://opensource.org/licenses/MIT
+"""
+
+import json
+import logging
+import hashlib
+from pathlib import Path
+
+from monobit.base import FileFormatError
+from monobit.core import Char, Codepoint, Tag
+from monobit.core.labels import to_label
+from monobit.encoding import encoder
+from monobit.storage.fontfiles import load_plugins
+
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+# format name -> (scanner, reader)
+_indexers = {}
+
+
+def register_indexer(name, *, scanner, reader):
+    """
+    Register glyph block indexer for a text format.
+
+    scanner: callable on binary stream, returning a pair of
+             list of (offset, size) header ranges and
+             list of (offset, size, labels) glyph blocks
+    reader: callable on header text, returning a pair of
+            a font without glyphs and a callable converting block text to glyph
+    """
+    _indexers[name] = scanner, reader
+
+
+def _hash_file(path):
+    """Calculate sha256 hash of file contents."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as instream:
+        for chunk in iter(lambda: instream.read(1 << 16), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def build_index(path, format=''):
+    """Scan a font file and write its glyph index next to it."""
+    load_plugins()
+    path = Path(path)
+    format = format or path.suffix[1:].lower()
+    try:
+        scanner, _ = _indexers[format]
+    except KeyError:
+        raise FileFormatError(
+            f'Glyph index not supported for format `{format}`.'
+        ) from None
+    with open(path, 'rb') as instream:
+        header, blocks = scanner(instream)
+    stat = path.stat()
+    index = dict(
+        version=INDEX_VERSION,
+        format=format,
+        size=stat.st_size,
+        mtime=stat.st_mtime_ns,
+        sha256=_hash_file(path),
+        header=header,
+        glyphs=[
+            (_offset, _size, [str(_l) for _l in _labels])
+            for _offset, _size, _labels in blocks
+        ],
+    )
+    with open(_get_index_path(path), 'w') as outstream:
+        json.dump(index, outstream)
+    return index
+
+
+def _get_index_path(path):
+    """Location of sidecar index file."""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def read_index(path):
+    """Read the glyph index for a font file; None if missing or stale."""
+    path = Path(path)
+    try:
+        with open(_get_index_path(path)) as instream:
+            index = json.load(instream)
+    except (EnvironmentError, ValueError) as e:
+        logging.debug('Could not read glyph index for `%s`: %s', path, e)
+        return None
+    stat = path.stat()
+    if (
+            index.get('version') != INDEX_VERSION
+            or index.get('size') != stat.st_size
+            # only read the whole file if it may have changed
+            or index.get('mtime') != stat.st_mtime_ns
+            and index.get('sha256') != _hash_file(path)
+        ):
+        logging.debug('Glyph index for `%s` is stale.', path)
+        return None
+    return index
+
+
+class IndexedFont:
+    """Font file with lazily loaded glyphs, using a glyph index."""
+
+    def __init__(self, path, *, format='', rebuild=False):
+        """
+        Open font file with glyph index; build the index if needed.
+
+        format: text format of the font file (default: infer from suffix)
+        rebuild: rebuild the index even if it is up to date
+        """
+        self._path = Path(path)
+        load_plugins()
+        index = None if rebuild else read_index(self._path)
+        if index is None or format and index['format'] != format:
+            index = build_index(self._path, format)
+        _, reader = _indexers[index['format']]
+        self._blocks = tuple(
+            (_offset, _size) for _offset, _size, _ in index['glyphs']
+        )
+        self._labels = {}
+        for _i, (_, _, _labels) in enumerate(index['glyphs']):
+            for _label in _labels:
+                self._labels.setdefault(to_label(_label), _i)
+        header = b''.join(
+            self._read_range(_offset, _size)
+            for _offset, _size in index['header']
+        )
+        self.font, self._parse_glyph = reader(
+            header.decode('utf-8-sig', 'replace')
+        )
+        self._encoder = encoder(self.font.encoding)
+
+    def __len__(self):
+        """Number of glyphs in the font file."""
+        return len(self._blocks)
+
+    def _read_range(self, offset, size):
+        """Read byte range from font file."""
+        with open(self._path, 'rb') as instream:
+            instream.seek(offset)
+            return instream.read(size)
+
+    def get_labels(self):
+        """Get tuple of labels stored in the glyph index."""
+        return tuple(self._labels)
+
+    def get_index(self, label):
+        """Get index of glyph block for a given label; -1 if not found."""
+        label = to_label(label)
+        try:
+            return self._labels[label]
+        except KeyError:
+            pass
+        # chars and codepoints may be defined through the font encoding
+        if self._encoder:
+            if isinstance(label, Char):
+                label = self._encoder.codepoint(label)
+            elif isinstance(label, Codepoint):
+                label = self._encoder.char(label)
+            else:
+                return -1
+            return self._labels.get(label, -1)
+        return -1
+
+    def get_glyph(
+            self, label=None, *, char=None, codepoint=None, tag=None,
+            missing='raise',
+        ):
+        """Get glyph by char, codepoint or tag, reading only its block."""
+        if char is not None:
+            label = Char(char)
+        elif codepoint is not None:
+            label = Codepoint(codepoint)
+        elif tag is not None:
+            label = Tag(tag)
+        index = self.get_index(label)
+        if index < 0:
+            if missing == 'raise':
+                raise KeyError(f'No glyph found matching label={label}')
+            return self.font.get_glyph(label, missing=missing)
+        return self.get_glyph_at(index)
+
+    def get_glyph_at(self, index):
+        """Parse glyph at given position in the glyph index."""
+        block = self._read_range(*self._blocks[index])
+        return self._parse_glyph(block.decode('utf-8-sig', 'replace'))
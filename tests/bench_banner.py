@@ -0,0 +1,64 @@
+"""
+monobit test suite
+throughput benchmark for the banner render server
+
+run as: python -m tests.bench_banner [NUMBER]
+"""
+
+import sys
+import time
+import subprocess
+from threading import Thread
+
+from monobit.scripts.banner_server import create_server, request_banner
+
+
+# address for the benchmark server
+address = 'localhost:8746'
+
+# label texts and command-line options, as posted by a build
+labels = tuple(f'build {_i:04d}' for _i in range(100))
+requests = (
+    ('text', ()),
+    ('blocks', ('--blocks',)),
+    ('png', ('--image', '--output', 'label.png')),
+    ('4x6 blocks', ('--blocks', '--font', 'tests/fonts/4x6.yaff')),
+)
+
+
+def bench_server(args, number):
+    """Time requests to a running render server; returns labels per second."""
+    start = time.perf_counter()
+    for label in labels[:number]:
+        request_banner((label, *args), address=address)
+    return number / (time.perf_counter() - start)
+
+
+def bench_script(args, number):
+    """Time separate monobit-banner invocations; returns labels per second."""
+    # don't write image files; text output is representative of start-up cost
+    args = tuple(_a for _a in args if _a not in ('--image', '--output', 'label.png'))
+    start = time.perf_counter()
+    for label in labels[:number]:
+        subprocess.run(
+            (sys.executable, '-m', 'monobit.scripts.banner', label, *args),
+            check=True, capture_output=True,
+        )
+    return number / (time.perf_counter() - start)
+
+
+def main(number=20):
+    number = min(number, len(labels))
+    with create_server(address) as server:
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        print(f'{"request":12}{"server (/s)":>14}{"script (/s)":>14}')
+        for name, args in requests:
+            served = bench_server(args, number)
+            scripted = bench_script(args, max(1, number // 4))
+            print(f'{name:12}{served:14.1f}{scripted:14.1f}')
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*(int(_arg) for _arg in sys.argv[1:2]))
@@ -0,0 +1,73 @@
+"""
+monobit test suite
+microbenchmarks for label conversion
+
+run as: python -m tests.bench_labels [--number N] [--save FILE] [--compare FILE]
+"""
+
+import sys
+import timeit
+
+from monobit.core.labels import to_label, to_labels, Char, Codepoint, Tag
+from monobit.core import Glyph
+from .benchtools import get_parser, load_baseline, get_ratio, save_results
+
+
+# label values as they occur in yaff files and in code, by case name
+values = {
+    'hex codepoint': '0x41',
+    'decimal codepoint': '65',
+    'mbcs codepoint': '0x81,0x40',
+    'quoted char': "'A'",
+    'unicode char': 'u+0041',
+    'char sequence': "u+0041, u+0301",
+    'bare char': 'é',
+    'quoted tag': '"LATIN CAPITAL LETTER A"',
+    'bare tag': 'space',
+    'int codepoint': 65,
+    'bytes codepoint': b'\x81\x40',
+    'label': Char('A'),
+}
+
+# number of conversions per timed run
+batch = 10_000
+
+
+def _label_cases():
+    """Conversion calls to benchmark, by name."""
+    for name, value in values.items():
+        yield f'to_label {name}', lambda value=value: tuple(map(to_label, (value,)*batch))
+    chars = tuple(chr(_i) for _i in range(0x20, 0x20+batch))
+    yield 'Char single', lambda: tuple(map(Char, chars))
+    yield 'Codepoint int', lambda: tuple(map(Codepoint, range(batch)))
+    codepoints = tuple(_i.to_bytes(2, 'big') for _i in range(0x8140, 0x8140+batch))
+    yield 'Codepoint bytes', lambda: tuple(map(Codepoint, codepoints))
+    yield 'to_labels range', lambda: tuple(to_labels(f'0x00-0x{batch-1:x}'))
+    glyph = Glyph(labels=(Codepoint(0x41), Char('A'), Tag('A')))
+    yield 'Glyph labels', lambda: tuple(
+        glyph.modify(labels=('0x41', "'A'", '"A"')) for _ in range(batch // 10)
+    )
+
+
+def run(number=5):
+    """Run all benchmarks; yields case name and best time per conversion."""
+    for case, func in _label_cases():
+        elapsed = min(timeit.repeat(func, number=1, repeat=number))
+        count = batch // 10 if case.startswith('Glyph') else batch
+        yield case, elapsed / count
+
+
+def main():
+    args = get_parser(number=5).parse_args()
+    baseline = load_baseline(args)
+    results = {}
+    print(f'{"case":36}{"time (ns)":>12}{"vs base":>10}')
+    for case, elapsed in run(args.number):
+        results[case] = dict(time=elapsed)
+        ratio = get_ratio(baseline, case, elapsed)
+        print(f'{case:36}{1e9*elapsed:12.0f}{ratio:>10}')
+        sys.stdout.flush()
+    save_results(args, results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+monobit test suite
+throughput and memory benchmarks for the renderer
+
+run as: python -m tests.bench_render [--sizes N ...] [--number N] [--save FILE] [--compare FILE]
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from itertools import cycle, islice
+
+import monobit
+from monobit.storage import load_plugins
+from .benchtools import get_parser, load_baseline, get_ratio, save_results
+
+
+font_path = Path('tests/fonts/')
+
+# font name, font file, sample text, rendering arguments, inklevels for text output
+fonts = (
+    ('small', font_path / '4x6.yaff', 'The quick brown fox jumps over the lazy dog. ', {}, ' @'),
+    ('proportional', font_path / 'wbfont.amiga/wbfont_prop.font', 'Sphinx of black quartz, judge my vow! ', {}, ' @'),
+    ('kerning', font_path / 'webby-small-kerned.yaff', 'fifjffig ijfi fjord figs ', {}, ' @'),
+    ('greyscale', font_path / 'konatu-ascii.yaff', 'Greyscale glyphs, 16 levels. ', {}, ' .,:;-=+*o#%&@$B'),
+    ('vertical', font_path / 'vertical.otb', "'", dict(direction='t r'), ' @'),
+    ('rtl', font_path / '4x6.yaff', 'אבג דהוז חט ', {}, ' @'),
+)
+
+# text sizes, in characters
+sizes = (10, 1000, 100_000)
+
+# characters per line of sample text
+line_length = 80
+
+render_formats = ('text', 'blocks', 'shades', 'sixel', 'image')
+chart_formats = ('text', 'blocks', 'shades', 'sixel', 'image', 'pdf')
+
+
+def make_text(sample, size):
+    """Repeat sample to given number of characters, broken into lines."""
+    chars = ''.join(islice(cycle(sample), size))
+    return '\n'.join(
+        chars[_i:_i+line_length] for _i in range(0, len(chars), line_length)
+    )
+
+
+def measure(func, number):
+    """Measure peak memory use of a function and its best time over `number` runs."""
+    # the traced run also warms up caches for the timed runs
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    elapsed = min(_timed(func) for _ in range(number))
+    return elapsed, peak
+
+
+def _timed(func):
+    """Time a single call."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _render_cases(font, inklevels, text, render_args):
+    """Rendering calls to benchmark, by name."""
+    yield 'render_text', lambda: monobit.render_text(font, text, **render_args)
+    for format in render_formats:
+        kwargs = dict(inklevels=inklevels) if format == 'text' else {}
+        yield f'render {format}', lambda format=format, kwargs=kwargs: monobit.render(
+            font, io.BytesIO(), text=text, format=format, **render_args, **kwargs
+        )
+
+
+def _chart_cases(font, inklevels):
+    """Chart calls to benchmark, by name."""
+    for format in chart_formats:
+        kwargs = dict(inklevels=inklevels) if format == 'text' else {}
+        yield f'chart {format}', lambda format=format, kwargs=kwargs: monobit.chart(
+            font, io.BytesIO(), format=format, **kwargs
+        )
+
+
+def run(sizes=sizes, number=3):
+    """Run all benchmarks; yields case name, glyph count, time and peak memory."""
+    charted = set()
+    for name, path, sample, render_args, inklevels in fonts:
+        font, *_ = monobit.load(path)
+        for size in sizes:
+            text = make_text(sample, size)
+            for case, func in _render_cases(font, inklevels, text, render_args):
+                yield _measure_case(f'{name} {size} {case}', size, func, number)
+        # charts do not depend on the rendering arguments
+        if path in charted:
+            continue
+        charted.add(path)
+        for case, func in _chart_cases(font, inklevels):
+            yield _measure_case(f'{name} {case}', len(font.glyphs), func, number)
+
+
+def _measure_case(case, glyphs, func, number):
+    """Measure benchmark case; peak is the error if the case is not supported."""
+    try:
+        elapsed, peak = measure(func, number)
+    except ValueError as e:
+        # e.g. greyscale in block output
+        return case, glyphs, None, e
+    return case, glyphs, elapsed, peak
+
+
+def main():
+    parser = get_parser(number=3)
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=sizes,
+        help='text sizes in characters (default: %(default)s)'
+    )
+    args = parser.parse_args()
+    load_plugins()
+    baseline = load_baseline(args)
+    results = {}
+    print(f'{"case":36}{"time (ms)":>12}{"glyphs/s":>12}{"peak (MiB)":>12}{"vs base":>10}')
+    for case, glyphs, elapsed, peak in run(args.sizes, args.number):
+        if elapsed is None:
+            print(f'{case:36}{"n/a":>12}  {peak}')
+            continue
+        results[case] = dict(time=elapsed, peak=peak)
+        ratio = get_ratio(baseline, case, elapsed)
+        print(
+            f'{case:36}{1000*elapsed:12.2f}{glyphs/elapsed:12.0f}'
+            f'{peak / 2**20:12.2f}{ratio:>10}'
+        )
+        sys.stdout.flush()
+    save_results(args, results)
+
+if __name__ == '__main__':
+    main()
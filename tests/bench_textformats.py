@@ -0,0 +1,84 @@
+"""
+monobit test suite
+micro-benchmarks for text font formats
+
+run as: python -m tests.bench_textformats [NUMBER]
+
+Block splitting is timed for the formats read through the block framework in
+text/draw.py. The consoleet, dosstart, edwin and figlet readers parse their
+files in their own way, so they are timed for loading only. There is no
+dosstart file in the test fonts; one is exported from 4x6.yaff for the run.
+"""
+
+import io
+import sys
+import timeit
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import monobit
+from monobit.storage import load_plugins
+from monobit.storage.fontformats.text import draw, hex, psf2txt, fd, yaff
+
+
+font_path = Path('tests/fonts/')
+
+# format name, file name, block types used by the format's block reader
+text_formats = (
+    ('yaff', '4x6.yaff', yaff._BLOCKTYPES),
+    ('hexdraw', '8x16.draw', (draw.DrawGlyph, draw.DrawComment, draw.Empty)),
+    ('unifont', '8x16.hex', (hex.HexGlyph, draw.DrawComment, draw.Empty)),
+    ('psf2txt', '4x6.txt', (
+        psf2txt.PTSeparator, psf2txt.PTComment, psf2txt.PTGlyph,
+        psf2txt.PTLabel, psf2txt.PTProperties, draw.Empty,
+    )),
+    ('mkwinfont', '6x13.fd', (fd.MWFGlyph, fd.MWFProperties, fd.MWFComment, draw.Empty)),
+    ('consoleet', '4x6.clt', None),
+    ('dosstart', None, None),
+    ('edwin', '4x6.edwin.fnt', None),
+    ('figlet', '4x6.flf', None),
+)
+
+
+def bench_blocks(text, blocktypes, number):
+    """Time splitting a text into blocks."""
+    return timeit.timeit(
+        lambda: sum(1 for _ in draw.iter_blocks(io.StringIO(text), blocktypes)),
+        number=number,
+    ) / number
+
+
+def bench_load(path, format, number):
+    """Time loading a font file."""
+    return timeit.timeit(
+        lambda: monobit.load(path, format=format),
+        number=number,
+    ) / number
+
+
+def main(number=10):
+    load_plugins()
+    with TemporaryDirectory() as temp_dir:
+        _run(Path(temp_dir), number)
+
+
+def _run(temp_path, number):
+    """Run benchmarks; fonts without a test file are exported to temp_path."""
+    print(f'{"format":12}{"blocks (ms)":>14}{"load (ms)":>14}')
+    for format, filename, blocktypes in text_formats:
+        if filename is None:
+            path = temp_path / f'4x6.{format}'
+            monobit.save(monobit.load(font_path / '4x6.yaff'), path, format=format)
+        else:
+            path = font_path / filename
+        if blocktypes is None:
+            blocks = ''
+        else:
+            text = path.read_text(encoding='utf-8-sig', errors='replace')
+            blocks = f'{1000 * bench_blocks(text, blocktypes, number):14.2f}'
+        load = 1000 * bench_load(path, format, number)
+        print(f'{format:12}{blocks:>14}{load:14.2f}')
+
+
+if __name__ == '__main__':
+    main(*(int(_arg) for _arg in sys.argv[1:2]))
@@ -0,0 +1,41 @@
+"""
+monobit test suite
+command-line options and stored baselines shared by the benchmarks
+"""
+
+import json
+import argparse
+
+
+def get_parser(number):
+    """Argument parser with the options all benchmarks take."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--number', type=int, default=number,
+        help=f'number of timed runs per case; the best is reported (default: {number})'
+    )
+    parser.add_argument('--save', help='store results as baseline in JSON file')
+    parser.add_argument('--compare', help='compare times with baseline in JSON file')
+    return parser
+
+
+def load_baseline(args):
+    """Read baseline results given with --compare; empty if not given."""
+    if not args.compare:
+        return {}
+    with open(args.compare) as infile:
+        return json.load(infile)
+
+
+def get_ratio(baseline, case, elapsed):
+    """Time relative to the baseline, formatted for a 10-wide column."""
+    if case not in baseline:
+        return ''
+    return f'{elapsed / baseline[case]["time"]:10.2f}'
+
+
+def save_results(args, results):
+    """Store results as baseline if requested with --save."""
+    if args.save:
+        with open(args.save, 'w') as outfile:
+            json.dump(results, outfile, indent=1)
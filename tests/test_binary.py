@@ -0,0 +1,142 @@
+"""
+monobit test suite
+bit and byte order tests
+"""
+
+import unittest
+
+from monobit.base.binary import reverse_pixels, swap_bytes
+from monobit.core import Raster
+
+
+def _reverse_bits(byteseq, bits_per_pixel):
+    """Reference per-byte pixel reversal, through the binary representation."""
+    pixels_per_byte = 8 // bits_per_pixel
+    reversed_bytes = []
+    for byte in byteseq:
+        bits = f'{byte:08b}'
+        pixels = [
+            bits[_i*bits_per_pixel:(_i+1)*bits_per_pixel]
+            for _i in range(pixels_per_byte)
+        ]
+        reversed_bytes.append(int(''.join(reversed(pixels)), 2))
+    return bytes(reversed_bytes)
+
+
+def _swap_bytes(byteseq, group_size):
+    """Reference byte swap, group by group, padding the last group."""
+    if group_size <= 1:
+        return bytes(byteseq)
+    groups = (
+        bytes(byteseq[_i:_i+group_size]).ljust(group_size, b'\0')
+        for _i in range(0, len(byteseq), group_size)
+    )
+    return b''.join(_group[::-1] for _group in groups)
+
+
+class TestBinary(unittest.TestCase):
+    """Test bit reversal and byte swap kernels."""
+
+    all_bytes = bytes(range(256))
+
+    # raster with 5 pixels per row, asymmetric in every direction
+    raster = Raster.from_matrix(
+        ('@..@@', '.@...', '@@@.@'), inklevels='.@'
+    )
+
+    # alignment and stride in pixels; the byte-aligned strides of 1 and 3
+    # bytes and the bit-aligned totals of 2 and 3 bytes are not a multiple
+    # of the swap size
+    layouts = (
+        ('left', 8), ('right', 16), ('left', 24), ('bit', 5), ('bit', 7),
+    )
+
+    def test_reverse_pixels(self):
+        for bits_per_pixel in (1, 2, 4, 8):
+            with self.subTest(bits_per_pixel=bits_per_pixel):
+                assert (
+                    reverse_pixels(self.all_bytes, bits_per_pixel)
+                    == _reverse_bits(self.all_bytes, bits_per_pixel)
+                )
+
+    def test_reverse_pixels_twice(self):
+        for bits_per_pixel in (1, 2, 4):
+            with self.subTest(bits_per_pixel=bits_per_pixel):
+                reversed_bytes = reverse_pixels(self.all_bytes, bits_per_pixel)
+                assert reversed_bytes != self.all_bytes
+                assert reverse_pixels(reversed_bytes, bits_per_pixel) == self.all_bytes
+
+    def test_swap_bytes(self):
+        # lengths that are and are not a multiple of the group size
+        for length in (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 12, 13):
+            byteseq = self.all_bytes[1:length+1]
+            for group_size in (0, 1, 2, 3, 4, 8):
+                with self.subTest(length=length, group_size=group_size):
+                    assert (
+                        swap_bytes(byteseq, group_size)
+                        == _swap_bytes(byteseq, group_size)
+                    )
+
+    def test_raster_as_bytes(self):
+        for align, stride in self.layouts:
+            plain = self.raster.as_bytes(align=align, stride=stride)
+            for byte_swap in (0, 2, 4):
+                for bit_order in ('big', 'little'):
+                    with self.subTest(
+                            align=align, stride=stride, byte_swap=byte_swap,
+                            bit_order=bit_order
+                        ):
+                        model = plain
+                        if bit_order == 'little':
+                            model = _reverse_bits(model, 1)
+                        model = _swap_bytes(model, byte_swap)
+                        byteseq = self.raster.as_bytes(
+                            align=align, stride=stride, byte_swap=byte_swap,
+                            bit_order=bit_order,
+                        )
+                        assert byteseq == model, f'{byteseq} != {model}'
+
+    def test_raster_round_trip(self):
+        for align, stride in self.layouts:
+            for byte_swap in (0, 2, 4):
+                for bit_order in ('big', 'little'):
+                    with self.subTest(
+                            align=align, stride=stride, byte_swap=byte_swap,
+                            bit_order=bit_order
+                        ):
+                        byteseq = self.raster.as_bytes(
+                            align=align, stride=stride, byte_swap=byte_swap,
+                            bit_order=bit_order,
+                        )
+                        raster = Raster.from_bytes(
+                            byteseq, width=5, height=3, stride=stride,
+                            align=align, byte_swap=byte_swap,
+                            bit_order=bit_order,
+                        )
+                        assert raster == self.raster, (
+                            f'\n{raster.as_text()}\n!=\n{self.raster.as_text()}'
+                        )
+
+    def test_raster_bits_per_pixel(self):
+        for bits_per_pixel in (2, 4):
+            for byte_swap in (0, 2, 4):
+                for bit_order in ('big', 'little'):
+                    with self.subTest(
+                            bits_per_pixel=bits_per_pixel,
+                            byte_swap=byte_swap, bit_order=bit_order
+                        ):
+                        byteseq = self.raster.as_bytes(
+                            bits_per_pixel=bits_per_pixel,
+                            byte_swap=byte_swap, bit_order=bit_order,
+                        )
+                        model = self.raster.as_bytes(
+                            bits_per_pixel=bits_per_pixel
+                        )
+                        if bit_order == 'little':
+                            model = _reverse_bits(model, bits_per_pixel)
+                        model = _swap_bytes(model, byte_swap)
+                        assert byteseq == model, f'{byteseq} != {model}'
+
+
+if __name__ == '__main__':
+    unittest.main()
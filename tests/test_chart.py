@@ -25,6 +25,19 @@ class TestChart(BaseTester):
             magic = pdf.readline()
         self.assertEqual(magic, b'%PDF-1.3\n')
 
+    def test_export_pdf_no_grid(self):
+        """Test exporting pdf files with repeated glyphs and no pixel grid."""
+        pdf_file = self.temp_path / 'chart.pdf'
+        monobit.chart(
+            self.fixed4x6, pdf_file, format='pdf',
+            grid_positioning=True, pixel_border=(-1, -1, -1),
+        )
+        with open(pdf_file, 'rb') as pdf:
+            data = pdf.read()
+        self.assertTrue(data.startswith(b'%PDF-1.3\n'))
+        # empty grid positions are drawn through a shared form
+        self.assertIn(b'/Subtype /Form', data)
+
     def test_export_chart(self):
         """Test exporting text chart."""
         txt_file = self.temp_path / 'chart.txt'
@@ -54,6 +67,33 @@ class TestChart(BaseTester):
         with open(txt_file) as output, open(self.font_path / 'sixels.txt') as model:
             self.assertListEqual(list(output), list(model))
 
+    def test_export_image_pages(self):
+        """Test exporting multi-page chart image, rendered in parallel."""
+        from PIL import Image
+        tif_file = self.temp_path / 'chart.tif'
+        monobit.chart(
+            self.fixed4x6, tif_file, format='image', image_format='tiff',
+            lines_per_page=4, processes=2, grid_positioning=False,
+        )
+        with Image.open(tif_file) as img:
+            frames = img.n_frames
+        self.assertEqual(frames, -(-len(self.fixed4x6.glyphs) // 64))
+
+    def test_iter_images(self):
+        """Test rendering glyph map sheets one at a time."""
+        glyph_map = monobit.renderer.create_chart(
+            (self.fixed4x6,), glyphs_per_line=16, lines_per_page=4,
+            margin=monobit.base.Coord(0, 0), padding=monobit.base.Coord(1, 1),
+            scale=monobit.base.Coord(1, 1), direction=None,
+            codepoint_range=None, max_labels=1,
+        )
+        images = glyph_map.to_images()
+        self.assertEqual(len(images), -(-len(self.fixed4x6.glyphs) // 64))
+        self.assertNotEqual(images[0].tobytes(), images[1].tobytes())
+        for image, sheet_image in zip(images, glyph_map.iter_images(processes=2)):
+            self.assertEqual(image.tobytes(), sheet_image.tobytes())
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,9 +5,12 @@ tests for encoding-related features
 
 import os
 import io
+import pickle
 import unittest
 
 import monobit
+from monobit import Glyph, Char, Codepoint, Tag
+from monobit.encoding import encodings, encoder, Charmap
 from .base import BaseTester, get_stringio, assert_text_eq
 
 
@@ -227,6 +230,195 @@ class TestEncoding(BaseTester):
         font = self.fixed4x6.label(comment_from='desc')
         assert_text_eq(font.get_glyph('A').comment, '[A] LATIN CAPITAL LETTER A')
 
+    def test_label_bulk(self):
+        """Labelling a font with a charmap gives the same labels as labelling each glyph."""
+        font = self.fixed4x6.label(codepoint_from='cp437')
+        for kwargs in (
+                dict(char_from=encodings['koi8-r'], overwrite=True),
+                dict(char_from=encodings['unicode'], overwrite=True),
+                dict(char_from=encodings['cp437'], match_whitespace=False),
+                dict(codepoint_from=encodings['mac-roman'], overwrite=True),
+                dict(codepoint_from=Charmap(), overwrite=True),
+            ):
+            labelled = font.label(**kwargs)
+            expected = tuple(_g.label(**kwargs) for _g in font.glyphs)
+            assert tuple(_g.get_labels() for _g in labelled.glyphs) == tuple(
+                tuple(_g.get_labels()) for _g in expected
+            ), kwargs
+
+    def test_tag_bulk(self):
+        """Tagging a font in bulk gives the same labels as tagging each glyph."""
+        font = self.fixed4x6.label(tag_from='name')
+        font = font.modify(glyphs=(
+            *font.glyphs, Glyph(), Glyph(tag='tag'),
+            Glyph(char='\u263a'), Glyph(char='\ue000\u0301'),
+        ))
+        for kwargs in (
+                dict(tag_from=encoder('name'), overwrite=True),
+                dict(tag_from=encoder('desc')),
+                dict(tag_from=encoder('char'), overwrite=True),
+                dict(comment_from=encoder('name')),
+            ):
+            labelled = font.label(**kwargs)
+            expected = tuple(_g.label(**kwargs) for _g in font.glyphs)
+            assert tuple(
+                (_g.get_labels(), _g.comment) for _g in labelled.glyphs
+            ) == tuple(
+                (tuple(_g.get_labels()), _g.comment) for _g in expected
+            ), kwargs
+
+    def test_transcode(self):
+        """Transcoding gives the glyphs that labelling and resampling give."""
+        font = self.fixed4x6.label(codepoint_from='cp437', overwrite=True)
+        # glyphs without chars are converted through the font encoding
+        charless = font.subset(codepoints=range(256)).label(
+            char_from=None, overwrite=True
+        ).modify(encoding='cp437')
+        for source in (font, charless):
+            for target in ('cp850', 'mac-roman', 'koi8-r'):
+                transcoded = source.transcode(encoding=target)
+                expected = source.label(char_from=source.encoding).resample(
+                    encoding=target
+                )
+                assert transcoded.encoding == target
+                assert tuple(_g.char for _g in transcoded.glyphs) == tuple(
+                    _g.char for _g in expected.glyphs
+                )
+                # labels are ordered as for resampling, but tags are kept and
+                # chars that occur twice in the target get both codepoints
+                assert tuple(
+                    tuple(_g.get_labels())[:2] for _g in transcoded.glyphs
+                ) == tuple(
+                    (Char(_c), Codepoint(_cp))
+                    for _cp, _c in encodings[target].mapping.items()
+                )
+                assert tuple(_g.pixels for _g in transcoded.glyphs) == tuple(
+                    _g.pixels for _g in expected.glyphs
+                )
+        # tags are kept for glyphs found in the font only
+        transcoded = font.transcode(encoding='cp850')
+        assert transcoded.get_glyph(b'\x03').tags == (Tag('heart'),)
+        assert transcoded.get_glyph(b'\x01').tags == ()
+        # target codepoints not in the font are left out
+        ascii = font.subset(codepoints=range(0x20, 0x7f))
+        transcoded = ascii.transcode(encoding='koi8-r', missing=None)
+        assert len(transcoded.glyphs) == len(ascii.glyphs)
+        assert_text_eq(
+            transcoded.get_glyph(b'A').reduce().as_text(), self.fixed4x6_A
+        )
+
+    def test_label_index(self):
+        """Labels converted through the font encoding are found by lookup."""
+        font = self.fixed4x6.label(codepoint_from='cp437', overwrite=True)
+        font = font.label(char_from=None, overwrite=True).modify(encoding='koi8-r')
+        # codepoint labels are found directly, chars through the encoding
+        assert font.get_index(b'\xc1') == font.get_index(Char('а'))
+        assert_text_eq(font.get_glyph(b'A').reduce().as_text(), self.fixed4x6_A)
+        assert_text_eq(font.get_glyph('A').reduce().as_text(), self.fixed4x6_A)
+        assert font.get_index(Char('\u263a'), raise_missing=False) == -1
+        # converted chars are listed in glyph order
+        koi8 = encodings['koi8-r']
+        chars = (koi8.char(_g.codepoint) for _g in font.glyphs)
+        assert font.get_chars() == tuple(dict.fromkeys(_c for _c in chars if _c))
+        # default char is a label even if the replacement char is not defined
+        assert font.default_char == Char('')
+        assert isinstance(font.default_char, Char)
+
+    def test_pickle_label_index(self):
+        """Pickled fonts leave out their lookup tables and rebuild them."""
+        font = self.fixed4x6.modify(encoding='koi8-r')
+        font.get_glyph('A')
+        state = font.__getstate__()
+        assert '_labels' not in state and '_cache' not in state
+        font = pickle.loads(pickle.dumps(font))
+        assert font.get_index(b'A') == font.get_index(Char('A'))
+
+    def test_charmap_store(self):
+        """Charmaps loaded from the compiled store equal those parsed from text."""
+        from monobit.encoding import store, compile_charmaps
+        from monobit.encoding.definitions import create_encoding_registry
+        path = compile_charmaps(self.temp_path / 'charmaps.bin')
+        text_store = store.charmap_store
+        try:
+            store.charmap_store = store.CharmapStore(None)
+            parsed = create_encoding_registry()
+            store.charmap_store = store.CharmapStore(path)
+            compiled = create_encoding_registry()
+            for name in ('cp437', 'windows-950', 'mac-roman', 'koi8-r'):
+                self.assertEqual(
+                    tuple(compiled[name].mapping.items()),
+                    tuple(parsed[name].mapping.items()),
+                )
+        finally:
+            store.charmap_store = text_store
+
+
+    def test_fit_index(self):
+        """Best fits from the index agree with charmap distances, also when stored."""
+        from monobit.encoding.detect import FitIndex
+        charmaps = {
+            _name: encodings[_name]
+            for _name in ('cp437', 'cp850', 'koi8-r', 'mac-roman', 'windows-1252')
+        }
+        index = FitIndex.from_charmaps(charmaps.items())
+        path = self.temp_path / 'charmaps.fit'
+        index.write(path, tuple(charmaps), {})
+        stored = FitIndex.load(path, tuple(charmaps))
+        assert FitIndex.load(path, ('cp437',)) is None
+        query = Charmap(dict(tuple(encodings['cp858'].mapping.items())[100:200]))
+        # ties go to the first indexed
+        expected = sorted(
+            (_cm.distance(query), _i, _name)
+            for _i, (_name, _cm) in enumerate(charmaps.items())
+        )
+        expected = tuple((_name, _dist) for _dist, _, _name in expected)
+        assert index.match(query, count=5) == expected, index.match(query, count=5)
+        assert stored.match(query, count=5) == expected
+
+    def test_detect_encoding(self):
+        """Detect the encoding of a font from its labels."""
+        font = self.fixed4x6.resample(encoding='koi8-r').modify(encoding=None)
+        assert not font.encoding
+        font = font.detect_encoding()
+        assert font.encoding == 'koi8-r', font.encoding
+        assert encodings.fit(font.get_charmap()) == encodings['koi8-r']
+
+    def test_encoder_cache(self):
+        """File encoders are reused until the file changes; indexers are not shared."""
+        from monobit.encoding import encoder
+        path = self.temp_path / 'custom.ucm'
+        path.write_text('CHARMAP\n<U0041> \\x41 |0\nEND CHARMAP\n')
+        charmap = encoder(str(path))
+        assert encoder(str(path)) is charmap
+        path.write_text('CHARMAP\n<U0042> \\x41 |0\nEND CHARMAP\n')
+        # make sure the stamp differs even if the clock is coarse
+        os.utime(path, ns=(0, 0))
+        assert encoder(str(path)).char(b'A') == 'B'
+        path = self.temp_path / 'custom.tbl'
+        path.write_text('41-42\n')
+        first, second = encoder(str(path)), encoder(str(path))
+        assert first is not second
+        assert tuple(first.codepoint() for _ in range(2)) == (b'A', b'B')
+        assert second.codepoint() == b'A'
+        assert encoder('cp437') is encoder('IBM-437')
+
+    def test_dense_charmap(self):
+        """Single- and double-byte charmaps give the same results as dict-backed ones."""
+        from monobit.encoding.charmaps import _DenseMapping
+        for name in ('cp437', 'windows-936'):
+            charmap = encodings[name]
+            assert isinstance(charmap._ord2chr, _DenseMapping)
+            mapping = charmap.mapping
+            chars = (*mapping.values(), 'x\u0301', '\U0001f600', '')
+            codepoints = (*mapping.keys(), b'', b'\1\2\3', b'\x81\x30')
+            plain = Charmap({})
+            plain._ord2chr = mapping
+            assert charmap.decode_all(codepoints) == plain.decode_all(codepoints)
+            assert charmap.encode_all(chars) == plain.encode_all(chars)
+            assert tuple(map(charmap.char, codepoints)) == tuple(map(plain.char, codepoints))
+            assert tuple(map(charmap.codepoint, chars)) == tuple(map(plain.codepoint, chars))
+            assert tuple(charmap.mapping.items()) == tuple(mapping.items())
+            assert charmap == Charmap(mapping)
 
 
 if __name__ == '__main__':
@@ -1384,6 +1384,24 @@ class TestImport(BaseTester):
             self.assertEqual(len(font.glyphs), 919)
             assert_text_eq(font.get_glyph('A').reduce().as_text(), self.fixed4x6_A)
 
+    def test_import_pcf_random_access(self):
+        """Test reading single glyphs from PCF files."""
+        from monobit.storage.fontformats.xlfd.pcf import PcfFont
+        for pcf_file in ('4x6_Bbu1p1.pcf', '4x6_Llu4p4.pcf'):
+            file = self.font_path / 'pcf' / pcf_file
+            font, *_ = monobit.load(file)
+            with open(file, 'rb') as instream:
+                pcf = PcfFont(instream)
+                self.assertEqual(len(pcf), 919)
+                assert_text_eq(pcf.get_glyph(char='A').reduce().as_text(), self.fixed4x6_A)
+                self.assertEqual(pcf.get_glyph(codepoint=0x41), font.get_glyph(codepoint=0x41))
+                # single glyph lookup does not convert the whole encoding table
+                self.assertNotIn('_codepoints', vars(pcf))
+                self.assertEqual(pcf.get_glyph(tag='A').char, 'A')
+                with self.assertRaises(KeyError):
+                    pcf.get_glyph(codepoint=0x10000)
+                self.assertEqual(pcf.to_font().glyphs, font.glyphs)
+
     # EDWIN
 
     def test_import_edwin(self):
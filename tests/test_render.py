@@ -5,9 +5,16 @@ rendering tests
 
 import os
 import io
+import gc
+import sys
 import unittest
+import weakref
+import threading
+import subprocess
 
 import monobit
+from monobit.core import Char, Codepoint
+from monobit.renderer import GlyphMap, GlyphMapStream
 from .base import BaseTester, get_stringio, assert_text_eq
 
 
@@ -187,6 +194,109 @@ class TestRender(BaseTester):
         ).as_text(inklevels='.@', border='.')
         assert_text_eq(text, self.composed)
 
+    def test_compose_glyphs(self):
+        file = get_stringio(self.unscii8_sample)
+        f,  *_ = monobit.load(file, format='unifont')
+        composed = f.compose_glyphs(('u\u0305\u0327', 'u', 'x\u0305'))
+        # glyphs in the font and chars with missing components are left out
+        assert tuple(composed) == ('u\u0305\u0327',)
+        glyph = composed['u\u0305\u0327']
+        assert f.get_glyph('u\u0305\u0327') is glyph
+        assert_text_eq(
+            glyph.as_text(inklevels='.@'), '\n'.join(
+                _row[:8] for _row in self.composed.splitlines()
+            ) + '\n'
+        )
+        # least recently used glyphs are dropped from the cache
+        f.compose_cache_size = 1
+        f.get_glyph(' \u0305')
+        assert f.get_glyph('u\u0305\u0327') is not glyph
+
+    def test_rendered_font_is_freed(self):
+        file = get_stringio(self.unscii8_sample)
+        f,  *_ = monobit.load(file, format='unifont')
+        # font is freed without the cyclic garbage collector
+        gc.disable()
+        try:
+            monobit.render_text(f, 'u\u0305\u0327u')
+            ref = weakref.ref(f)
+            del f
+            assert ref() is None
+        finally:
+            gc.enable()
+
+    # multi-element labels
+
+    def test_render_multichar_label(self):
+        """Longest matching multi-character label is used."""
+        glyph = self.fixed4x6.get_glyph(char='1').modify(labels=(Char('tt'), Codepoint(b'\x81\x40')))
+        font = self.fixed4x6.modify(self.fixed4x6.glyphs + (glyph,))
+        for text, model in (('ttt', '1t'), (b'\x81\x40\x81', b'1\x81')):
+            assert_text_eq(
+                monobit.render_text(font, text).as_text(inklevels='.@', border='.'),
+                monobit.render_text(font, model).as_text(inklevels='.@', border='.'),
+            )
+
+    # renderer object
+
+    def test_renderer_reuse(self):
+        """Renderer gives the same result as render_text across calls."""
+        renderer = monobit.Renderer(self.fixed4x6)
+        for text in ('t\n12', '1', 't\n12'):
+            assert_text_eq(
+                renderer.render(text).as_text(inklevels='.@', border='.'),
+                monobit.render_text(self.fixed4x6, text).as_text(inklevels='.@', border='.'),
+            )
+
+    def test_renderer_transformations(self):
+        """Renderer applies transformations to glyphs once."""
+        transformations = ((monobit.Font.underline, (), {}),)
+        renderer = monobit.Renderer(self.fixed4x6, transformations=transformations)
+        first = renderer.render('11').as_text(inklevels='.@', border='.')
+        second = renderer.render('1').as_text(inklevels='.@', border='.')
+        self.assertEqual(tuple(renderer._glyphs), (Char('1'),))
+        assert_text_eq(second, """\
+.@..
+@@..
+.@..
+.@..
+@@@.
+....
+@@@@
+""")
+        assert_text_eq(first, '\n'.join(_l*2 for _l in second.splitlines()) + '\n')
+
+    def test_iter_render(self):
+        """Rendering in bands of lines gives the same result as a whole render."""
+        renderer = monobit.Renderer(self.fixed4x6)
+        lines = ('t1t', '1t1', 't11', '11t', 'ttt')
+        whole = renderer.render('\n'.join(lines), margin=(1, 2))
+        for band_size in (1, 2, 64):
+            stream = GlyphMapStream(
+                renderer.iter_render(lines, margin=(1, 2), band_size=band_size)
+            )
+            assert_text_eq(
+                ''.join(stream.iter_text(inklevels='.@', border='-')),
+                whole.as_text(inklevels='.@', border='-'),
+            )
+            stream = GlyphMapStream(
+                renderer.iter_render(lines, margin=(1, 2), band_size=band_size)
+            )
+            self.assertEqual(
+                ''.join(stream.iter_blocks((2, 3))), whole.as_blocks((2, 3))
+            )
+
+    def test_iter_sheets_bounds(self):
+        """Sheets keep the fixed bounds of the glyph map."""
+        glyph_map = GlyphMap(levels=2)
+        glyph_map.append_glyph(self.fixed4x6.get_glyph('A'), 0, 0)
+        glyph_map.set_bounds(max_x=3, max_y=4)
+        sheet, = glyph_map.iter_sheets()
+        self.assertEqual(sheet.get_bounds(), glyph_map.get_bounds())
+        assert_text_eq(
+            sheet.as_text(inklevels='.@'), glyph_map.as_text(inklevels='.@')
+        )
+
     # rendering output formats
 
     def test_render_text(self):
@@ -376,6 +486,13 @@ levels: 256
             text = output.read()
         assert_text_eq(text, '\x1bPq#0;2;0;0;0;#1;2;0;0;0;#2;2;100;100;100;#0___~___~$#1L?N?LEH?$#2Q^O?QXU?-\x1b\\')
 
+    def test_render_sixel_repeats(self):
+        """Runs of four or more equal sixels are run-length encoded."""
+        text = monobit.render_text(self.fixed4x6, '____').as_sixel(
+            paper=(0, 0, 0), ink=(255, 255, 255), border=(0, 0, 0),
+        )
+        assert_text_eq(text, '\x1bPq#0;2;0;0;0;#1;2;0;0;0;#2;2;100;100;100;#0^^^~^^^~^^^~^^^~$#1!16?$#2___?___?___?___?-\x1b\\')
+
     def test_render_command_image(self):
         file = self.temp_path / 'rendered.png'
         monobit.render(self.fixed4x6, file, text='12', format='image')
@@ -390,5 +507,39 @@ levels: 256
         )
 
 
+
+class TestBannerServer(BaseTester):
+    """Test the monobit-banner render server."""
+
+    def test_server_round_trip(self):
+        """Served banner equals the output of monobit-banner."""
+        from monobit.scripts.banner_server import create_server, request_banner
+        args = ('hello', '--font', str(self.font_path / '4x6.yaff'), '--blocks')
+        with create_server('localhost:0') as server:
+            _, port = server.server_address
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                served = request_banner(args, address=f'localhost:{port}')
+                with self.assertRaises(ValueError):
+                    request_banner(
+                        ('--font', 'missing.yaff', 'hello'),
+                        address=f'localhost:{port}'
+                    )
+            finally:
+                server.shutdown()
+        scripted = subprocess.run(
+            (sys.executable, '-m', 'monobit.scripts.banner', *args),
+            check=True, capture_output=True,
+        ).stdout
+        self.assertEqual(served, scripted)
+
+    def test_server_local_only(self):
+        """Render server does not bind to non-local addresses."""
+        from monobit.scripts.banner_server import create_server
+        with self.assertRaises(ValueError):
+            create_server('0.0.0.0:0')
+
+
 if __name__ == '__main__':
     unittest.main()
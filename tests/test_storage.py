@@ -9,6 +9,7 @@ import unittest
 import logging
 import glob
 from pathlib import Path
+from unittest import mock
 
 import monobit
 from .base import BaseTester, ensure_asset
@@ -536,5 +537,117 @@ class TestStreams(BaseTester):
             self.assertTrue(stream.getvalue().startswith(b'---'))
 
 
+class TestGlyphIndex(BaseTester):
+    """Test random access through glyph index files."""
+
+    def _test_indexed(self, filename):
+        """Test reading glyphs through a glyph index."""
+        from monobit.storage.utils.glyphindex import IndexedFont
+        file = self.temp_path / filename
+        file.write_bytes((self.font_path / filename).read_bytes())
+        font, *_ = monobit.load(file)
+        indexed = IndexedFont(file)
+        self.assertTrue(Path(f'{file}.idx').is_file())
+        self.assertEqual(len(indexed), 919)
+        self.assertEqual(indexed.get_glyph('A'), font.get_glyph('A'))
+        self.assertEqual(indexed.get_glyph(codepoint=0x41).char, 'A')
+        self.assertIsNone(indexed.get_glyph('\uffff', missing=None))
+        for index, glyph in enumerate(font.glyphs):
+            self.assertEqual(indexed.get_glyph_at(index), glyph)
+            self.assertEqual(indexed.get_glyph_at(index).comment, glyph.comment)
+        # index is kept if the file is touched but not changed
+        index_path = Path(f'{file}.idx')
+        index_path.write_text(index_path.read_text().replace('"format"', '"kept": 1, "format"'))
+        os.utime(file)
+        IndexedFont(file)
+        self.assertIn('"kept"', index_path.read_text())
+        # stale index is rebuilt
+        with open(file, 'a') as f:
+            f.write('\n')
+        self.assertEqual(IndexedFont(file).get_glyph('A'), font.get_glyph('A'))
+
+    def test_yaff_index(self):
+        """Test random access to yaff file."""
+        self._test_indexed('4x6.yaff')
+
+    def test_yaff_index_changed(self):
+        """Test reading a yaff glyph that is no longer where it was indexed."""
+        from monobit.base import FileFormatError
+        from monobit.storage.utils.glyphindex import IndexedFont
+        file = self.temp_path / '4x6.yaff'
+        file.write_bytes((self.font_path / '4x6.yaff').read_bytes())
+        indexed = IndexedFont(file)
+        file.write_text('# comment\n' * 1000)
+        with self.assertRaises(FileFormatError):
+            indexed.get_glyph('A')
+
+    def test_bdf_index(self):
+        """Test random access to bdf file."""
+        self._test_indexed('4x6.bdf')
+
+
+
+class TestStreaming(BaseTester):
+    """Test streaming load and save."""
+
+    def test_iter_load_yaffs(self):
+        """Test streaming fonts from a multi-section yaff file."""
+        file = self.temp_path / 'two.yaff'
+        monobit.save((self.fixed4x6, self.fixed8x16), file)
+        fonts = monobit.iter_load(file)
+        self.assertNotIsInstance(fonts, monobit.Pack)
+        fonts = tuple(fonts)
+        self.assertEqual(len(fonts), 2)
+        pack = monobit.load(file)
+        self.assertEqual(
+            [len(_f.glyphs) for _f in fonts], [len(_f.glyphs) for _f in pack]
+        )
+
+    def test_iter_load_save_dir(self):
+        """Test saving a font stream to a directory."""
+        file = self.temp_path / 'two.yaff'
+        monobit.save((self.fixed4x6, self.fixed8x16), file)
+        dir = self.temp_path / 'stream'
+        monobit.save(monobit.iter_load(file), dir, format='yaff')
+        pack = monobit.load(dir)
+        self.assertEqual(len(pack), 2)
+
+    def test_iter_load_skips_failing_file(self):
+        """Test a file that fails after its first font is skipped whole."""
+        dir = self.temp_path / 'mixed'
+        dir.mkdir()
+        monobit.save(self.fixed4x6, dir / 'good.yaff')
+        (dir / 'bad.yaff').write_text('a:\n    .@\n---\nb:\n    .@\n    @\n')
+        fonts = tuple(monobit.iter_load(dir))
+        self.assertEqual(len(fonts), 1)
+        self.assertEqual(len(fonts[0].glyphs), len(self.fixed4x6.glyphs))
+
+    def test_iter_load_error_after_first(self):
+        """Test a format error after the first font names the file and format."""
+        from monobit.base import FileFormatError
+        file = self.temp_path / 'two.yaff'
+        monobit.save((self.fixed4x6, self.fixed8x16), file)
+        fixed4x6 = self.fixed4x6
+
+        def _failing_yaffs(text_stream, allow_empty):
+            yield fixed4x6
+            raise FileFormatError('broken section')
+
+        with mock.patch(
+                'monobit.storage.fontformats.text.yaff._load_yaffs', _failing_yaffs
+            ):
+            fonts = monobit.iter_load(file)
+            next(fonts)
+            with self.assertRaises(FileFormatError) as context:
+                next(fonts)
+        self.assertIn('two.yaff', str(context.exception))
+        self.assertIn('`yaff`', str(context.exception))
+
+    def test_iter_load_save_empty(self):
+        """Test saving an empty font stream fails."""
+        with self.assertRaises(ValueError):
+            monobit.save(iter(()), self.temp_path / 'empty.yaff')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -203,6 +203,25 @@ tag3:
             Tag('tag1'), Tag('tag2'), Tag('tag3')
         )
 
+    def test_label_conversion(self):
+        from monobit.core.labels import to_label
+        assert to_label('0x41') == Codepoint(0x41)
+        assert to_label(' 65') == Codepoint(0x41)
+        assert to_label('0x81,0x40') == Codepoint(b'\x81\x40')
+        assert to_label('-1') == Tag('-1')
+        assert to_label("'1'") == Char('1')
+        assert to_label('"1"') == Tag('1')
+        assert to_label('1') == Codepoint(1)
+        assert to_label('+') == Char('+')
+        assert to_label('é') == Char('é')
+        assert to_label("U+0041, 'b'") == Char('Ab')
+        assert to_label('u+zz') == Tag('u+zz')
+        assert to_label(' space ') == Tag('space')
+        # common labels are interned
+        assert Char('a') is to_label("'a'")
+        assert Codepoint(b'\x81\x40') is Codepoint(b'\x81\x40')
+        assert Codepoint(0x41) is Codepoint(0x41)
+
     # properties
 
     props = """